@@ -0,0 +1,123 @@
+"""
+Deterministic corpus of generated source code for the benchmarks
+"""
+
+import random
+from typing import Dict, List
+
+SEED = 20230101
+# Line templates of every language, `{name}` is a generated identifier and `{i}` the line number
+TEMPLATES: Dict[str, List[str]] = {
+    "python": [
+        "def {name}(argument, *args, **kwargs):",
+        '    """Return the {name} of the argument"""',
+        "    result = [value * {i} for value in args if value is not None]",
+        "    if argument > {i}:",
+        "        return {{'{name}': result, 'total': sum(result) + {i}.5}}",
+        "    return None  # fallback {i}",
+        "",
+    ],
+    "javascript": [
+        "export async function {name}(options = {{}}) {{",
+        "  const items = await fetch(`/api/{name}/${{options.id ?? {i}}}`);",
+        "  return items.map((item) => ({{ ...item, weight: item.weight * {i} }}));",
+        "}}",
+        "// {name} handler {i}",
+        "",
+    ],
+    "c": [
+        "static int {name}(const char *buffer, size_t length) {{",
+        "    for (size_t i = 0; i < length; i++) {{",
+        "        if (buffer[i] == '\\n') return {i};",
+        "    }}",
+        '    return printf("%s %d\\n", "{name}", {i});',
+        "}}",
+        "",
+    ],
+    "rust": [
+        "pub fn {name}<T: Clone>(items: &[T]) -> Option<Vec<T>> {{",
+        "    let limit = {i}usize;",
+        "    items.iter().take(limit).cloned().collect::<Vec<_>>().into()",
+        "}}",
+        "",
+    ],
+    "go": [
+        "func {name}(ctx context.Context, id int) (*Result, error) {{",
+        "\tif id > {i} {{",
+        '\t\treturn nil, fmt.Errorf("{name}: %d out of range", id)',
+        "\t}}",
+        '\treturn &Result{{ID: id, Name: "{name}"}}, nil',
+        "}}",
+        "",
+    ],
+    "sql": [
+        "SELECT u.id, u.name, COUNT(o.id) AS {name}",
+        "FROM users u LEFT JOIN orders o ON o.user_id = u.id",
+        "WHERE u.created_at > '2023-01-01' AND o.total > {i}",
+        "GROUP BY u.id, u.name ORDER BY {name} DESC LIMIT {i};",
+        "",
+    ],
+    "json": [
+        '{{"id": {i}, "name": "{name}", "tags": ["alpha", "beta"], "ratio": 0.{i}, "active": true}}',
+    ],
+    "html": [
+        '<section class="{name}" data-id="{i}">',
+        "  <h2>{name} &amp; friends</h2>",
+        '  <a href="/{name}/{i}">Read more</a>',
+        "</section>",
+    ],
+}
+SYLLABLES = ("ka", "lo", "mi", "ren", "to", "sa", "vu", "dex", "por", "li", "an", "qu")
+
+
+def _get_name(rng: random.Random) -> str:
+    return "_".join(
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+        for _ in range(2)
+    )
+
+
+def generate(language: str, lines: int, seed: int = SEED) -> str:
+    """
+    Generate source code
+    :param language: one of the `TEMPLATES` languages
+    :type language: str
+    :param lines: number of lines
+    :type lines: int
+    :param seed: random seed, the same seed gives the same code
+    :type seed: int
+    :return: source code
+    :rtype: str
+    """
+    rng = random.Random(f"{seed}:{language}:{lines}")
+    templates = TEMPLATES[language]
+    name = _get_name(rng)
+    result = []
+    for i in range(lines):
+        template = templates[i % len(templates)]
+        if i % len(templates) == 0:
+            name = _get_name(rng)
+        result.append(template.format(name=name, i=i))
+    return "\n".join(result) + "\n"
+
+
+def generate_long_lines(lines: int, width: int, seed: int = SEED) -> str:
+    """
+    Generate Python code with very long lines
+    :param lines: number of lines
+    :type lines: int
+    :param width: approximate characters per line
+    :type width: int
+    :param seed: random seed
+    :type seed: int
+    :return: source code
+    :rtype: str
+    """
+    rng = random.Random(f"{seed}:long:{lines}:{width}")
+    result = []
+    for i in range(lines):
+        parts: List[str] = []
+        while sum(len(part) + 2 for part in parts) < width:
+            parts.append(f"{_get_name(rng)}={i + len(parts)}")
+        result.append(f"call_{i}({', '.join(parts)})")
+    return "\n".join(result) + "\n"
@@ -0,0 +1,252 @@
+"""
+Benchmarks of the render pipeline.
+
+Every case runs in a fresh process (peak RSS of a case is not mixed with the
+other cases), the first render is reported as `cold` and the stage timings
+are medians of the next ``--repeat`` renders.
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import PIL
+import pygments
+
+from corpus import TEMPLATES, generate, generate_long_lines
+from dali_renderer import Dali
+from dali_renderer.__about__ import __version__
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+STAGES = ("detect", "lex", "layout", "raster", "frame", "paste", "encode")
+FONTS = ("Hack", "Fira", "Inconsolata", "JetBrains")
+STYLES = ("one-dark", "default")
+# Benchmarks slower by more than the threshold are regressions
+DEFAULT_THRESHOLD = 0.15
+
+
+class Case(NamedTuple):
+    name: str
+    language: str
+    lines: int
+    options: Dict[str, Any]
+    # Characters per line of the long lines corpus, 0 for the language templates
+    width: int = 0
+
+
+def get_cases(quick: bool = False) -> List[Case]:
+    """
+    Benchmark matrix, every dimension is varied from the base case of
+    100 lines of Python with the default options
+    :param quick: skip the 10k lines case
+    :type quick: bool
+    :return: cases
+    :rtype: List[Case]
+    """
+    cases = [
+        Case(f"python-{lines}", "python", lines, {})
+        for lines in (5, 100, 1000) + (() if quick else (10000,))
+    ]
+    cases.append(Case("python-long-lines", "python", 50, {}, width=1000))
+    cases += [
+        Case(f"{language}-100", language, 100, {})
+        for language in TEMPLATES
+        if language != "python"
+    ]
+    cases += [Case(f"font-{font}", "python", 100, {"font": font}) for font in FONTS]
+    cases += [
+        Case(f"style-{style}", "python", 100, {"style": style}) for style in STYLES
+    ]
+    cases += [
+        Case("frame-window-controls", "python", 100, {"window_controls": True}),
+        Case("frame-background", "python", 100, {"background": "#576574"}),
+        Case(
+            "frame-both",
+            "python",
+            100,
+            {"window_controls": True, "background": "#576574"},
+        ),
+    ]
+    return cases
+
+
+def _render(code: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    _, report = Dali(**options).render_with_report(code)
+    result: Dict[str, Any] = {stage: report.stages.get(stage, 0.0) for stage in STAGES}
+    result["total"] = report.total
+    result["size"] = [report.width, report.height]
+    result["output_bytes"] = report.output_bytes
+    return result
+
+
+def run_case(case: Case, repeat: int) -> Dict[str, Any]:
+    """
+    Run a benchmark case
+    :param case: case
+    :type case: Case
+    :param repeat: measured renders after the cold render
+    :type repeat: int
+    :return: case results
+    :rtype: Dict[str, Any]
+    """
+    if case.width:
+        code = generate_long_lines(case.lines, case.width)
+    else:
+        code = generate(case.language, case.lines)
+    options = {"syntax": case.language, **case.options}
+
+    cold = _render(code, options)
+    runs = [_render(code, options) for _ in range(repeat)]
+    peak_rss = None
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == "darwin":
+            peak_rss //= 1024
+    return {
+        "name": case.name,
+        "language": case.language,
+        "lines": case.lines,
+        "chars": len(code),
+        "options": options,
+        "cold": cold["total"],
+        "stages": {
+            stage: statistics.median(run[stage] for run in runs)
+            for stage in STAGES + ("total",)
+        },
+        "peak_rss_kib": peak_rss,
+        "size": cold["size"],
+        "output_bytes": cold["output_bytes"],
+    }
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Compare the median total time of the cases with a baseline
+    :param results: current results
+    :type results: Dict[str, Any]
+    :param baseline: baseline results
+    :type baseline: Dict[str, Any]
+    :param threshold: relative slowdown to report as a regression
+    :type threshold: float
+    :return: names of the regressed cases
+    :rtype: List[str]
+    """
+    baseline_cases = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    print(f"\nCompared with {baseline['version']} ({baseline['timestamp']}):")
+    for case in results["cases"]:
+        old = baseline_cases.get(case["name"])
+        if old is None:
+            continue
+        ratio = case["stages"]["total"] / old["stages"]["total"]
+        size_ratio = case["output_bytes"] / old["output_bytes"]
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = "  REGRESSION"
+            regressions.append(case["name"])
+        print(f"{case['name']:<24} time x{ratio:5.2f}  size x{size_ratio:5.2f}{mark}")
+    return regressions
+
+
+def _print_case(case: Dict[str, Any]) -> None:
+    stages = "".join(
+        f"{case['stages'][stage] * 1000:9.1f}" for stage in STAGES + ("total",)
+    )
+    rss = (
+        f"{case['peak_rss_kib'] / 1024:8.1f}"
+        if case["peak_rss_kib"] is not None
+        else "       -"
+    )
+    print(
+        f"{case['name']:<24}{case['cold'] * 1000:9.1f}{stages}{rss}{case['output_bytes'] / 1024:10.1f}",
+        flush=True,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the render pipeline")
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="benchmark.json",
+        help="JSON results (default: benchmark.json)",
+    )
+    parser.add_argument(
+        "--compare", default="", help="JSON results of a previous run to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"relative slowdown reported as a regression (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=5,
+        help="measured renders of every case (default: 5)",
+    )
+    parser.add_argument(
+        "-k",
+        "--filter",
+        default="",
+        help="run only the cases with the substring in the name",
+    )
+    parser.add_argument("--quick", action="store_true", help="skip the 10k lines case")
+    parser.add_argument(
+        "--in-process", action="store_true", help="run all cases in this process"
+    )
+    args = parser.parse_args(argv)
+
+    cases = [case for case in get_cases(args.quick) if args.filter in case.name]
+    header = "".join(f"{stage:>9}" for stage in ("cold",) + STAGES + ("total",))
+    print(f"{'case (ms, MiB, KiB)':<24}{header}{'rss':>8}{'output':>10}")
+    results: Dict[str, Any] = {
+        "version": __version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "pygments": pygments.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "cases": [],
+    }
+    if args.in_process:
+        for case in cases:
+            results["cases"].append(run_case(case, args.repeat))
+            _print_case(results["cases"][-1])
+    else:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1, maxtasksperchild=1) as pool:
+            for case in cases:
+                results["cases"].append(pool.apply(run_case, (case, args.repeat)))
+                _print_case(results["cases"][-1])
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            if compare(results, json.load(file), args.threshold):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
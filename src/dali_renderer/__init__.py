@@ -1,6 +1,7 @@
 """
 .. include:: ../../static/doc.md
 """
+
 from typing import Sequence
 
 from dali_renderer.dali import Dali
@@ -10,7 +11,20 @@ from dali_renderer.dali import SyntaxNotFound
 from dali_renderer.dali import PaddingError
 from dali_renderer.dali import StyleNotFound
 from dali_renderer.dali import InputNotSpecified
-
+from dali_renderer.dali import FrameBackendNotFound
+from dali_renderer.renders.encoders import EncoderNotAvailable
+from dali_renderer.dali import ImageTooLarge
+from dali_renderer.dali import Measurement
+from dali_renderer.dali import EncoderOptionError
+from dali_renderer.renderer import Renderer
+from dali_renderer.renderer import IncrementalRenderer
+from dali_renderer.batch import RenderResult
+from dali_renderer.cache import RenderCache
+from dali_renderer.cache import CacheStats
+from dali_renderer.aio import AsyncRenderer
+from dali_renderer.report import RenderReport
+from dali_renderer.report import RenderHook
+from dali_renderer.aio import ConcurrencyError
 
 __all__: Sequence = [
     Dali,
@@ -20,4 +34,18 @@ __all__: Sequence = [
     PaddingError,
     StyleNotFound,
     InputNotSpecified,
+    FrameBackendNotFound,
+    EncoderNotAvailable,
+    ImageTooLarge,
+    Measurement,
+    EncoderOptionError,
+    Renderer,
+    IncrementalRenderer,
+    RenderResult,
+    RenderCache,
+    CacheStats,
+    AsyncRenderer,
+    RenderReport,
+    RenderHook,
+    ConcurrencyError,
 ]
@@ -0,0 +1,5 @@
+import sys
+
+from dali_renderer.cli import main
+
+sys.exit(main())
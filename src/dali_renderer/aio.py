@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from dali_renderer.cache import RenderCache
+from dali_renderer.config import ASYNC_MAX_CONCURRENCY
+
+if TYPE_CHECKING:
+    from dali_renderer.dali import Dali
+
+
+class ConcurrencyError(Exception):
+    pass
+
+
+def _render_bytes(
+    options: Dict[str, Any], cache: Optional[RenderCache], code: str, filename: str
+) -> bytes:
+    """
+    Executor job, renders the code into encoded bytes
+    :param options: `Dali` keyword arguments
+    :type options: Dict[str, Any]
+    :param cache: render cache or None
+    :type cache: Optional[RenderCache]
+    :param code: source code
+    :type code: str
+    :param filename: file name of the source code used to detect the syntax
+    :type filename: str
+    :return: encoded image
+    :rtype: bytes
+    """
+    from dali_renderer.dali import Dali
+
+    return Dali(cache=cache, **options).render_bytes(code, filename)
+
+
+class AsyncRenderer:
+    """
+    Runs renders on an executor without blocking the event loop.
+    At most ``max_concurrency`` renders are submitted to the executor at once,
+    the others wait on the loop and are cancelled right away; a render that
+    has already started runs to the end, but its result is dropped
+    :param executor: executor of the renders, default is the default executor
+        of the loop. Use a `ProcessPoolExecutor` to render on all CPUs.
+    :type executor: Optional[Executor]
+    :param max_concurrency: maximum number of renders on the executor
+    :type max_concurrency: int
+    """
+
+    def __init__(
+        self,
+        executor: Optional[Executor] = None,
+        max_concurrency: int = ASYNC_MAX_CONCURRENCY,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ConcurrencyError(
+                f"Concurrency must be a positive integer. Given value is {max_concurrency}"
+            )
+
+        self.executor: Optional[Executor] = executor
+        self.max_concurrency: int = max_concurrency
+        # Semaphores are bound to a loop, one is created for every loop
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+
+    async def render(self, dali: "Dali", code: str, filename: str = "") -> bytes:
+        """
+        Render the code into encoded bytes in the output format of ``dali``
+        :param dali: renderer options
+        :type dali: Dali
+        :param code: source code
+        :type code: str
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :return: encoded image
+        :rtype: bytes
+        """
+        dali._check_code_length(code)
+        dali._validate_options()
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore(loop):
+            return await loop.run_in_executor(
+                self.executor,
+                partial(_render_bytes, dali._options, dali.cache, code, filename),
+            )
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        if loop not in self._semaphores:
+            for closed in [other for other in self._semaphores if other.is_closed()]:
+                del self._semaphores[closed]
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+
+_default_renderer: AsyncRenderer = AsyncRenderer()
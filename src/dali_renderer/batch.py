@@ -0,0 +1,360 @@
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path, PurePath
+from io import BytesIO
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from PIL import Image
+from pygments.token import string_to_tokentype
+
+from dali_renderer.config import DEFAULT_FONT
+from dali_renderer.dali import Dali
+from dali_renderer.lexers import get_lexer_index
+from dali_renderer.renders.DaliFontManager import DaliFontManager
+
+# Source code string or path to the source code file
+Source = Union[str, PurePath]
+# Path to save the image, or None to return the encoded bytes
+Output = Optional[str]
+Job = Tuple[Source, Output, Dict[str, Any]]
+
+# Warmed up pools of the parallel renders by the number of workers and the font,
+# created on first use and kept for the lifetime of the process
+_pools: Dict[Tuple[int, str], ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+class RenderResult(NamedTuple):
+    """
+    Result of a single batch job
+    :param position: position of the job in the input iterable
+    :param output: path of the saved image or encoded bytes
+    :param error: exception raised by the job or None
+    """
+
+    position: int
+    output: Union[str, bytes, None]
+    error: Optional[BaseException]
+
+
+def _warm_up(fonts: Tuple[str, ...]) -> None:
+    """
+    Worker initializer, loads fonts and the lexer index once per worker process
+    :param fonts: font names to preload
+    :type fonts: Tuple[str, ...]
+    :return: None
+    """
+    for font in fonts:
+        DaliFontManager(font, 21)
+    get_lexer_index()
+
+
+def _render_job(
+    position: int, source: Source, output: Output, options: Dict[str, Any]
+) -> RenderResult:
+    """
+    Render a single job, errors are returned instead of raised
+    :param position: position of the job
+    :type position: int
+    :param source: source code string or path
+    :type source: Source
+    :param output: path to save the image or None
+    :type output: Output
+    :param options: `Dali` keyword arguments
+    :type options: Dict[str, Any]
+    :return: job result
+    :rtype: RenderResult
+    """
+    try:
+        dali = Dali(output or "", **options)
+        if isinstance(source, PurePath):
+            if output:
+                dali.from_file(str(source))
+                return RenderResult(position, output, None)
+            return RenderResult(
+                position, dali.render_bytes(Path(source).read_text(), str(source)), None
+            )
+        if output:
+            dali.from_string(source)
+            return RenderResult(position, output, None)
+        return RenderResult(position, dali.render_bytes(source), None)
+    except Exception as error:
+        return RenderResult(position, None, error)
+
+
+def render_many(
+    jobs: Iterable[Job],
+    workers: Optional[int] = None,
+    fonts: Tuple[str, ...] = (DEFAULT_FONT,),
+) -> Iterator[RenderResult]:
+    """
+    Render the jobs in a pool of worker processes and yield the results as they finish
+    :param jobs: iterable of `(source, output, options)` tuples
+    :type jobs: Iterable[Job]
+    :param workers: number of worker processes, default is the number of CPUs,
+        `1` renders in the current process
+    :type workers: Optional[int]
+    :param fonts: fonts to preload in every worker
+    :type fonts: Tuple[str, ...]
+    :return: results in the order of completion
+    :rtype: Iterator[RenderResult]
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for position, (source, output, options) in enumerate(jobs):
+            yield _render_job(position, source, output, options)
+        return
+
+    # Only a bounded window of jobs is in flight, so lazy iterables stay lazy
+    max_pending = workers * 4
+    executor = _create_executor(workers, fonts)
+    pending: Dict[Future, int] = {}
+    try:
+        for position, (source, output, options) in enumerate(jobs):
+            try:
+                future = executor.submit(_render_job, position, source, output, options)
+            except BrokenProcessPool:
+                # A worker died, the jobs in flight fail and the rest run in a new pool
+                executor.shutdown(wait=False)
+                executor = _create_executor(workers, fonts)
+                future = executor.submit(_render_job, position, source, output, options)
+            pending[future] = position
+            if len(pending) >= max_pending:
+                yield from _wait_results(pending)
+        while pending:
+            yield from _wait_results(pending)
+    finally:
+        executor.shutdown()
+
+
+def _create_executor(workers: int, fonts: Tuple[str, ...]) -> ProcessPoolExecutor:
+    """
+    Create a pool of warmed up worker processes
+    :param workers: number of worker processes
+    :type workers: int
+    :param fonts: fonts to preload in every worker
+    :type fonts: Tuple[str, ...]
+    :return: process pool
+    :rtype: ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(workers, initializer=_warm_up, initargs=(fonts,))
+
+
+def _wait_results(pending: Dict[Future, int]) -> Iterator[RenderResult]:
+    """
+    Wait for the first finished jobs and remove them from the pending jobs.
+    A crashed worker or an error that can't be sent back to the parent
+    process is returned as the error of its job
+    :param pending: futures of the jobs in flight and the positions of the jobs
+    :type pending: Dict[Future, int]
+    :return: results of the finished jobs
+    :rtype: Iterator[RenderResult]
+    """
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        position = pending.pop(future)
+        try:
+            yield future.result()
+        except Exception as error:
+            yield RenderResult(position, None, error)
+
+
+def get_pool(workers: int, font: str = DEFAULT_FONT) -> ProcessPoolExecutor:
+    """
+    Get the shared pool of the parallel renders, the worker processes are
+    started and warmed up once and reused by the following renders
+    :param workers: number of worker processes
+    :type workers: int
+    :param font: font to preload in every worker
+    :type font: str
+    :return: process pool
+    :rtype: ProcessPoolExecutor
+    """
+    with _pools_lock:
+        executor = _pools.get((workers, font))
+        if executor is None:
+            executor = _pools[(workers, font)] = _create_executor(workers, (font,))
+        return executor
+
+
+def shutdown_pools() -> None:
+    """
+    Stop the worker processes of the shared pools
+    :return: None
+    """
+    with _pools_lock:
+        executors = list(_pools.values())
+        _pools.clear()
+    for executor in executors:
+        executor.shutdown()
+
+
+def _discard_pool(workers: int, font: str, executor: ProcessPoolExecutor) -> None:
+    """
+    Remove a broken pool, the next render creates a new one
+    :param workers: number of worker processes
+    :type workers: int
+    :param font: font of the pool
+    :type font: str
+    :param executor: broken pool
+    :type executor: ProcessPoolExecutor
+    :return: None
+    """
+    with _pools_lock:
+        if _pools.get((workers, font)) is executor:
+            del _pools[(workers, font)]
+    executor.shutdown(wait=False)
+
+
+def _render_page(
+    options: Dict[str, Any],
+    tokens: List[Tuple[str, str]],
+    line_number_start: int,
+    image_width: int,
+) -> bytes:
+    """
+    Render a single page of tokens
+    :param options: `Dali` keyword arguments
+    :type options: Dict[str, Any]
+    :param tokens: `(token type name, value)` tuples of the page
+    :type tokens: List[Tuple[str, str]]
+    :param line_number_start: line number of the first line of the page
+    :type line_number_start: int
+    :param image_width: width of the highlighted image
+    :type image_width: int
+    :return: encoded page
+    :rtype: bytes
+    """
+    dali = Dali(**options)
+    formatter = dali._get_formatter(
+        line_number_start=line_number_start, image_width=image_width
+    )
+    image = dali._compose(
+        formatter.render((string_to_tokentype(ttype), value) for ttype, value in tokens)
+    )
+    buffer = BytesIO()
+    dali._save(image, buffer)
+    return buffer.getvalue()
+
+
+def render_pages(
+    options: Dict[str, Any],
+    pages: List[List[Tuple[str, str]]],
+    lines_per_page: int,
+    image_width: int,
+    workers: Optional[int] = None,
+) -> List[bytes]:
+    """
+    Render the pages of a lexed source in the shared pool of worker processes
+    :param options: `Dali` keyword arguments
+    :type options: Dict[str, Any]
+    :param pages: `(token type name, value)` tuples of every page
+    :type pages: List[List[Tuple[str, str]]]
+    :param lines_per_page: lines on every page, used to continue the line numbering
+    :type lines_per_page: int
+    :param image_width: width of the highlighted image of every page
+    :type image_width: int
+    :param workers: number of worker processes, default is the number of CPUs,
+        `1` renders in the current process
+    :type workers: Optional[int]
+    :return: encoded pages in order
+    :rtype: List[bytes]
+    """
+    workers = min(workers or os.cpu_count() or 1, len(pages))
+    starts = [1 + index * lines_per_page for index in range(len(pages))]
+    options_list = [options] * len(pages)
+    widths = [image_width] * len(pages)
+    if workers <= 1:
+        return list(map(_render_page, options_list, pages, starts, widths))
+
+    font = options.get("font", DEFAULT_FONT)
+    executor = get_pool(workers, font)
+    try:
+        return list(executor.map(_render_page, options_list, pages, starts, widths))
+    except BrokenProcessPool:
+        _discard_pool(workers, font, executor)
+        raise
+
+
+def _render_band(
+    options: Dict[str, Any],
+    lines: List[Tuple[int, List[Tuple[str, str]]]],
+    size: Tuple[int, int],
+    top: int,
+    bottom: int,
+) -> Image.Image:
+    """
+    Render the rows ``top`` to ``bottom`` of a highlighted image
+    :param options: `Dali` keyword arguments
+    :type options: Dict[str, Any]
+    :param lines: `(lineno, [(token type name, value), ...])` of the lines drawn into the rows
+    :type lines: List[Tuple[int, List[Tuple[str, str]]]]
+    :param size: size of the whole highlighted image
+    :type size: Tuple[int, int]
+    :param top: first row
+    :type top: int
+    :param bottom: row after the last row
+    :type bottom: int
+    :return: band
+    :rtype: Image.Image
+    """
+    formatter = Dali(**options)._get_formatter()
+    return formatter.render_rows(
+        (
+            (lineno, [(string_to_tokentype(ttype), value) for ttype, value in tokens])
+            for lineno, tokens in lines
+        ),
+        size,
+        top,
+        bottom,
+    )
+
+
+def render_bands(
+    options: Dict[str, Any],
+    bands: List[Tuple[List[Tuple[int, List[Tuple[str, str]]]], int, int]],
+    size: Tuple[int, int],
+    workers: int,
+) -> List[Image.Image]:
+    """
+    Render bands of a highlighted image in the shared pool of worker processes
+    :param options: `Dali` keyword arguments
+    :type options: Dict[str, Any]
+    :param bands: `(lines, top, bottom)` of every band, see `_render_band`
+    :type bands: List[Tuple[List[Tuple[int, List[Tuple[str, str]]]], int, int]]
+    :param size: size of the whole highlighted image
+    :type size: Tuple[int, int]
+    :param workers: number of worker processes
+    :type workers: int
+    :return: bands in order
+    :rtype: List[Image.Image]
+    """
+    band_lines, tops, bottoms = zip(*bands)
+    font = options.get("font", DEFAULT_FONT)
+    executor = get_pool(workers, font)
+    try:
+        return list(
+            executor.map(
+                _render_band,
+                [options] * len(bands),
+                band_lines,
+                [size] * len(bands),
+                tops,
+                bottoms,
+            )
+        )
+    except BrokenProcessPool:
+        _discard_pool(workers, font, executor)
+        raise
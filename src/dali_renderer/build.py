@@ -0,0 +1,301 @@
+import codecs
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import PurePath
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from dali_renderer.__about__ import __version__
+from dali_renderer.batch import render_many
+from dali_renderer.config import DETECTION_PREFIX_SIZE
+from dali_renderer.lexers import get_lexer_index
+from dali_renderer.renders.encoders import FORMAT_EXTENSIONS
+
+MANIFEST_NAME = ".dali-manifest.json"
+MANIFEST_VERSION = 1
+# Sources up to this size are rejected with `CodeLength`
+MIN_SOURCE_SIZE = 10
+
+
+class BuildReport(NamedTuple):
+    """
+    Result of a build
+    :param rendered: rendered sources
+    :param skipped: unchanged sources
+    :param removed: removed orphaned outputs
+    :param failed: `(source, error message)` of the sources that failed to render
+    """
+
+    rendered: int
+    skipped: int
+    removed: int
+    failed: List[Tuple[str, str]]
+
+
+def _get_options_key(options: Dict[str, Any]) -> str:
+    return hashlib.sha256(
+        json.dumps([__version__, options], sort_keys=True).encode()
+    ).hexdigest()
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _get_extension(options: Dict[str, Any]) -> str:
+    image_format = (options.get("output_format") or "png").lower()
+    for extension, extension_format in FORMAT_EXTENSIONS.items():
+        if extension_format == image_format:
+            return extension
+    return ".png"
+
+
+def is_source(path: str) -> bool:
+    """
+    Check that a found file can be rendered: a lexer claims its file name,
+    it's longer than `MIN_SOURCE_SIZE` bytes and it starts with UTF-8 text
+    :param path: file path
+    :type path: str
+    :return: True if the file is a source file
+    :rtype: bool
+    """
+    if not get_lexer_index().get_candidates(path):
+        return False
+    try:
+        if os.path.getsize(path) <= MIN_SOURCE_SIZE:
+            return False
+        with open(path, "rb") as file:
+            prefix = file.read(DETECTION_PREFIX_SIZE)
+    except OSError:
+        return False
+    if b"\0" in prefix:
+        return False
+    try:
+        # The prefix can end inside of a multibyte character
+        codecs.getincrementaldecoder("utf-8")().decode(prefix)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def iter_sources(inputs: Sequence[str], exclude: str = "") -> Iterator[Tuple[str, str]]:
+    """
+    Find the source files of the inputs
+    :param inputs: files, glob patterns or directories
+    :type inputs: Sequence[str]
+    :param exclude: directory to skip, ex. the output directory inside of a source tree
+    :type exclude: str
+    :return: `(path, path relative to the input)` of every source file,
+        hidden files and directories and the found files which aren't
+        source files (see `is_source`) are skipped, given files are kept
+    :rtype: Iterator[Tuple[str, str]]
+    """
+    exclude = os.path.abspath(exclude) if exclude else ""
+    for source in inputs:
+        if os.path.isdir(source):
+            for root, directories, files in os.walk(source):
+                directories[:] = sorted(
+                    name
+                    for name in directories
+                    if not name.startswith(".")
+                    and os.path.abspath(os.path.join(root, name)) != exclude
+                )
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    if not name.startswith(".") and is_source(path):
+                        yield path, os.path.relpath(path, source)
+        elif glob.has_magic(source):
+            # Paths are relative to the part of the pattern without wildcards
+            parts = PurePath(source).parts
+            base_parts = []
+            for part in parts:
+                if glob.has_magic(part):
+                    break
+                base_parts.append(part)
+            base = os.path.join(*base_parts) if base_parts else "."
+            for path in sorted(glob.glob(source, recursive=True)):
+                if (
+                    os.path.isfile(path)
+                    and not (
+                        exclude and os.path.abspath(path).startswith(exclude + os.sep)
+                    )
+                    and is_source(path)
+                ):
+                    yield path, os.path.relpath(path, base)
+        else:
+            yield source, os.path.basename(source)
+
+
+def load_manifest(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Load the manifest of the output directory
+    :param output_dir: output directory
+    :type output_dir: str
+    :return: entries by the relative source path, empty if the manifest is missing or outdated
+    :rtype: Dict[str, Dict[str, Any]]
+    """
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME)) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("entries", {})
+
+
+def save_manifest(output_dir: str, entries: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Atomically replace the manifest of the output directory
+    :param output_dir: output directory
+    :type output_dir: str
+    :param entries: entries by the relative source path
+    :type entries: Dict[str, Dict[str, Any]]
+    :return: None
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(
+                {"version": MANIFEST_VERSION, "entries": entries},
+                file,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, os.path.join(output_dir, MANIFEST_NAME))
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def build(
+    inputs: Sequence[str],
+    output_dir: str,
+    options: Optional[Dict[str, Any]] = None,
+    workers: Optional[int] = None,
+    force: bool = False,
+) -> BuildReport:
+    """
+    Render source files into a mirrored tree of images. The manifest in the
+    output directory maps every source to its size, modification time, content
+    hash, options and output, so unchanged sources are skipped and the outputs
+    of deleted sources are removed
+    :param inputs: files, glob patterns or directories
+    :type inputs: Sequence[str]
+    :param output_dir: output directory
+    :type output_dir: str
+    :param options: `Dali` keyword arguments
+    :type options: Optional[Dict[str, Any]]
+    :param workers: number of worker processes, default is the number of CPUs
+    :type workers: Optional[int]
+    :param force: render all sources
+    :type force: bool
+    :return: build report
+    :rtype: BuildReport
+    """
+    options = dict(options or {})
+    options_key = _get_options_key(options)
+    extension = _get_extension(options)
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir)
+    entries: Dict[str, Dict[str, Any]] = {}
+    jobs: List[Tuple[PurePath, str, Dict[str, Any]]] = []
+    pending: List[Tuple[str, Dict[str, Any]]] = []
+    # Output of every current source by the relative source path
+    outputs: Dict[str, str] = {}
+    # Source of every current output, to find sources with the same output
+    sources: Dict[str, str] = {}
+    failed: List[Tuple[str, str]] = []
+    skipped = 0
+
+    for path, relative in iter_sources(inputs, exclude=output_dir):
+        output = os.path.join(output_dir, relative + extension)
+        if relative in sources:
+            failed.append(
+                (path, f"Conflict: {sources[relative]} has the same output {output}")
+            )
+            continue
+        sources[relative] = path
+        outputs[relative] = relative + extension
+        stat = os.stat(path)
+        entry: Dict[str, Any] = {
+            "source": path,
+            "output": relative + extension,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "options": options_key,
+        }
+        old = previous.get(relative)
+        if (
+            not force
+            and old
+            and old["options"] == options_key
+            and os.path.exists(output)
+        ):
+            # The content is hashed only if the size or the modification time changed
+            if (old["size"], old["mtime_ns"]) == (entry["size"], entry["mtime_ns"]):
+                entries[relative] = old
+                skipped += 1
+                continue
+            entry["hash"] = _hash_file(path)
+            if entry["hash"] == old.get("hash"):
+                entries[relative] = entry
+                skipped += 1
+                continue
+
+        entry.setdefault("hash", _hash_file(path))
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        jobs.append((PurePath(path), output, options))
+        pending.append((relative, entry))
+
+    for result in render_many(jobs, workers):
+        relative, entry = pending[result.position]
+        if result.error is None:
+            entries[relative] = entry
+        else:
+            failed.append(
+                (entry["source"], f"{type(result.error).__name__}: {result.error}")
+            )
+
+    removed = 0
+    for relative, old in previous.items():
+        # Outputs of deleted sources and of the previous output format
+        if outputs.get(relative) != old["output"] and _remove_output(
+            output_dir, old["output"]
+        ):
+            removed += 1
+
+    save_manifest(output_dir, entries)
+    rendered = sum(relative in entries for relative, _ in pending)
+    return BuildReport(rendered, skipped, removed, failed)
+
+
+def _remove_output(output_dir: str, output: str) -> bool:
+    """
+    Remove an output and its parent directories left empty inside of the output directory
+    :param output_dir: output directory
+    :type output_dir: str
+    :param output: output path relative to the output directory
+    :type output: str
+    :return: True if the output existed
+    :rtype: bool
+    """
+    path = os.path.join(output_dir, output)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+    parent = os.path.dirname(output)
+    while parent:
+        try:
+            os.rmdir(os.path.join(output_dir, parent))
+        except OSError:
+            break
+        parent = os.path.dirname(parent)
+    return True
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from dali_renderer.__about__ import __version__
+from dali_renderer.config import RENDER_CACHE_MAX_ENTRIES
+from dali_renderer.config import RENDER_CACHE_MAX_SIZE
+
+# Suffix of the files which are being written
+TMP_SUFFIX = ".tmp"
+
+
+class CacheStats(NamedTuple):
+    """
+    Render cache statistics
+    :param hits: lookups of this cache instance that found an image
+    :param misses: lookups of this cache instance that didn't find an image
+    :param entries: images in the cache directory
+    :param size: total size of the images in bytes
+    """
+
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+
+class RenderCache:
+    """
+    Content-addressed on-disk cache of encoded images with LRU eviction.
+    Files are written atomically, so one directory can be shared by many
+    processes; the access time of an entry is its modification time.
+    The size of the cache is counted by one scan of the directory and then
+    updated by `put`, the directory is scanned again only when the count
+    exceeds the limits, so images written by other processes are counted
+    at the next eviction
+    :param directory: cache directory, created if it doesn't exist
+    :type directory: str
+    :param max_size: maximum total size of the images in bytes
+    :type max_size: int
+    :param max_entries: maximum number of images
+    :type max_entries: int
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = RENDER_CACHE_MAX_SIZE,
+        max_entries: int = RENDER_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.directory: str = directory
+        self.max_size: int = max_size
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        # Total size and number of the images, None until the first scan
+        self._size: Optional[int] = None
+        self._entries: int = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def get_key(code: str, options: Dict[str, Any]) -> str:
+        """
+        Stable key of a render
+        :param code: source code
+        :type code: str
+        :param options: every option that affects the encoded image
+        :type options: Dict[str, Any]
+        :return: hex digest
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([__version__, options], sort_keys=True).encode())
+        digest.update(b"\0")
+        digest.update(code.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get the encoded image and mark it as recently used
+        :param key: render key
+        :type key: str
+        :return: encoded image or None
+        :rtype: Optional[bytes]
+        """
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Missing or evicted by another process in between
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store the encoded image and evict the least recently used images
+        over the limits
+        :param key: render key
+        :type key: str
+        :param data: encoded image
+        :type data: bytes
+        :return: None
+        """
+        if self._size is None:
+            self.evict()
+        path = self._get_path(key)
+        try:
+            replaced: Optional[int] = os.stat(path).st_size
+        except FileNotFoundError:
+            replaced = None
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=TMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        if replaced is None:
+            self._entries += 1
+            self._size = (self._size or 0) + len(data)
+        else:
+            self._size = (self._size or 0) + len(data) - replaced
+        if self._size > self.max_size or self._entries > self.max_entries:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used images until the cache fits the limits
+        :return: None
+        """
+        entries = self._scan()
+        size = sum(entry_size for _, _, entry_size in entries)
+        count = len(entries)
+        for _, path, entry_size in sorted(entries):
+            if size <= self.max_size and count <= self.max_entries:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+            count -= 1
+        self._size, self._entries = size, count
+
+    def clear(self) -> None:
+        """
+        Remove all images and reset the statistics
+        :return: None
+        """
+        for _, path, _ in self._scan():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        self._size, self._entries = 0, 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        Get the cache statistics
+        :return: statistics
+        :rtype: CacheStats
+        """
+        entries = self._scan()
+        return CacheStats(
+            self.hits, self.misses, len(entries), sum(size for _, _, size in entries)
+        )
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """
+        List the stored images
+        :return: `(mtime, path, size)` of every image
+        :rtype: List[Tuple[float, str, int]]
+        """
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(TMP_SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, os.path.join(root, name), stat.st_size))
+        return entries
@@ -0,0 +1,195 @@
+import argparse
+import logging
+import sys
+from typing import List, Optional
+
+from dali_renderer.__about__ import __version__
+from dali_renderer.config import DEFAULT_FONT
+from dali_renderer.config import SERVER_HOST
+from dali_renderer.config import SERVER_MAX_LINES
+from dali_renderer.config import SERVER_MAX_PIXELS
+from dali_renderer.config import SERVER_PORT
+from dali_renderer.config import SERVER_QUEUE_SIZE
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from dali_renderer.server import serve
+
+    port = args.port
+    if port is None and not args.unix_socket:
+        port = SERVER_PORT
+    serve(
+        args.host,
+        port,
+        args.unix_socket,
+        args.workers,
+        args.queue_size,
+        args.max_pixels,
+        args.max_lines,
+    )
+    return 0
+
+
+def _render(args: argparse.Namespace) -> int:
+    from dali_renderer.build import build
+
+    options = {
+        "syntax": args.syntax,
+        "style": args.style,
+        "font": args.font,
+        "font_size": args.font_size,
+        "padding": args.padding,
+        "border_radius": args.border_radius,
+        "window_controls": args.window_controls,
+        "background": args.background,
+        "output_format": args.format,
+        "png_profile": args.png_profile,
+        "quality": args.quality,
+    }
+    report = build(args.inputs, args.output, options, args.jobs, args.force)
+    for source, error in report.failed:
+        print(f"{source}: {error}", file=sys.stderr)
+    print(
+        f"{report.rendered} rendered, {report.skipped} unchanged, "
+        f"{report.removed} removed, {len(report.failed)} failed"
+    )
+    return 1 if report.failed else 0
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Build the command line parser
+    :return: parser
+    :rtype: argparse.ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog="dali", description="Powerful rendering of your source code."
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="log debug messages"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser(
+        "serve", help="run the render server with a warm worker pool"
+    )
+    serve.add_argument(
+        "--host", default=SERVER_HOST, help=f"HTTP host (default: {SERVER_HOST})"
+    )
+    serve.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help=f"HTTP port (default: {SERVER_PORT}, HTTP is off if only --unix-socket is set)",
+    )
+    serve.add_argument(
+        "--unix-socket", default="", help="path of the Unix socket to listen on"
+    )
+    serve.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="worker processes (default: CPU count)",
+    )
+    serve.add_argument(
+        "--queue-size",
+        type=int,
+        default=SERVER_QUEUE_SIZE,
+        help=f"requests accepted before rejecting with 503 (default: {SERVER_QUEUE_SIZE})",
+    )
+    serve.add_argument(
+        "--max-pixels",
+        type=int,
+        default=SERVER_MAX_PIXELS,
+        help=f"largest image of a request in pixels (default: {SERVER_MAX_PIXELS})",
+    )
+    serve.add_argument(
+        "--max-lines",
+        type=int,
+        default=SERVER_MAX_LINES,
+        help=f"longest source code of a request in lines (default: {SERVER_MAX_LINES})",
+    )
+    serve.set_defaults(handler=_serve)
+
+    render = commands.add_parser(
+        "render",
+        help="render files, glob patterns or directory trees into a mirrored tree of images, "
+        "unchanged sources are skipped on reruns",
+    )
+    render.add_argument(
+        "inputs", nargs="+", help="source files, glob patterns or directories"
+    )
+    render.add_argument("-o", "--output", required=True, help="output directory")
+    render.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="worker processes (default: CPU count)",
+    )
+    render.add_argument(
+        "--force", action="store_true", help="render unchanged sources too"
+    )
+    render.add_argument(
+        "--syntax", default="", help="lexer name (default: detected for every file)"
+    )
+    render.add_argument(
+        "--style", default="one-dark", help="highlight style (default: one-dark)"
+    )
+    render.add_argument(
+        "--font", default=DEFAULT_FONT, help=f"font name (default: {DEFAULT_FONT})"
+    )
+    render.add_argument(
+        "--font-size", type=int, default=21, help="font size in pixels (default: 21)"
+    )
+    render.add_argument(
+        "--padding", type=int, default=50, help="image padding (default: 50)"
+    )
+    render.add_argument(
+        "--border-radius", type=int, default=10, help="border radius (default: 10)"
+    )
+    render.add_argument(
+        "--window-controls", action="store_true", help="draw window controls"
+    )
+    render.add_argument(
+        "--background", default="", help="additional background color in hex format"
+    )
+    render.add_argument(
+        "--format",
+        default="png",
+        choices=["png", "webp", "jpeg", "avif"],
+        help="output format (default: png)",
+    )
+    render.add_argument(
+        "--png-profile",
+        default="fast",
+        choices=["fast", "balanced", "smallest"],
+        help="PNG profile (default: fast)",
+    )
+    render.add_argument(
+        "--quality",
+        type=int,
+        default=None,
+        help="quality of the lossy formats from 1 to 100",
+    )
+    render.set_defaults(handler=_render)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    `dali` command line entry point
+    :param argv: command line arguments, default is `sys.argv`
+    :type argv: Optional[List[str]]
+    :return: exit code
+    :rtype: int
+    """
+    args = get_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(name)s: %(message)s",
+    )
+    return args.handler(args)
@@ -0,0 +1,108 @@
+import json
+import socket
+from http.client import HTTPConnection
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from dali_renderer.config import SERVER_HOST
+from dali_renderer.config import SERVER_PORT
+
+
+class RenderServerError(Exception):
+    pass
+
+
+class RenderServerBusy(RenderServerError):
+    pass
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """
+    HTTP connection over a Unix socket
+    :param path: path of the Unix socket
+    :type path: str
+    :param timeout: socket timeout in seconds
+    :type timeout: Optional[float]
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = None) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.path: str = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class RenderClient:
+    """
+    Client of the `dali serve` render server
+    :param url: server URL, ignored if the Unix socket is set
+    :type url: str
+    :param unix_socket: path of the server Unix socket
+    :type unix_socket: str
+    :param timeout: socket timeout in seconds
+    :type timeout: Optional[float]
+    """
+
+    def __init__(
+        self,
+        url: str = f"http://{SERVER_HOST}:{SERVER_PORT}",
+        unix_socket: str = "",
+        timeout: Optional[float] = 60.0,
+    ) -> None:
+        self.url: str = url
+        self.unix_socket: str = unix_socket
+        self.timeout: Optional[float] = timeout
+
+    def render(self, code: str, filename: str = "", **options: Any) -> bytes:
+        """
+        Render the code on the server
+        :param code: string of source code
+        :type code: str
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :param options: `Dali` keyword arguments, except the output path
+        :type options: Any
+        :return: encoded image
+        :rtype: bytes
+
+        :raises: :class:`RenderServerError`, :class:`RenderServerBusy`: the queue of the server is full
+        """
+        body = json.dumps(
+            {"code": code, "filename": filename, "options": options}
+        ).encode()
+        return self._request("POST", "/render", body)
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Get the server statistics
+        :return: statistics
+        :rtype: Dict[str, Any]
+        """
+        return json.loads(self._request("GET", "/health"))
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None) -> bytes:
+        connection = self._connect()
+        try:
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            data = response.read()
+        finally:
+            connection.close()
+
+        if response.status == 503:
+            raise RenderServerBusy(json.loads(data)["error"])
+        if response.status != 200:
+            raise RenderServerError(f"{response.status}: {json.loads(data)['error']}")
+        return data
+
+    def _connect(self) -> HTTPConnection:
+        if self.unix_socket:
+            return UnixHTTPConnection(self.unix_socket, self.timeout)
+        url = urlsplit(self.url)
+        return HTTPConnection(
+            url.hostname or SERVER_HOST, url.port or SERVER_PORT, timeout=self.timeout
+        )
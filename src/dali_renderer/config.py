@@ -2,11 +2,35 @@ import os
 
 SOURCE_DIR = os.path.dirname(__file__)
 DEFAULT_FONT = "Hack"
-TMP_SVG_WRAPPER_NAME = "dali_wrapper.svg"
-TMP_PNG_WRAPPER_NAME = "dali_wrapper.png"
-TMP_IMAGE_NAME = "dali_renderer.png"
+FONT_CACHE_SIZE = 64
+LEXER_CACHE_SIZE = 128
+# Compiled token styles by (style, font, font size)
+TOKEN_STYLES_CACHE_SIZE = 64
+# Language detection guesses only on the first characters of the source code
+DETECTION_PREFIX_SIZE = 4096
+DETECTION_CACHE_SIZE = 256
+# Rows rasterised and encoded at once by the streaming render
+STREAM_BAND_HEIGHT = 256
+# Smaller images are not worth to rasterise in parallel
+PARALLEL_MIN_LINES = 1000
+# Renders submitted to the executor at once by the asyncio API
+ASYNC_MAX_CONCURRENCY = os.cpu_count() or 1
+# Render server defaults, the queue holds the requests waiting for a worker
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8733
+SERVER_QUEUE_SIZE = 64
+SERVER_MAX_REQUEST_SIZE = 16 * 1024 * 1024
+# Image size limits of a render request, requests can only lower them
+SERVER_MAX_PIXELS = 16_000_000
+SERVER_MAX_LINES = 20_000
+# Limits of the on-disk render cache
+RENDER_CACHE_MAX_SIZE = 512 * 1024 * 1024
+RENDER_CACHE_MAX_ENTRIES = 10_000
+# Larger frames are not cached to keep the memory of the cache bounded
+FRAME_CACHE_MAX_PIXELS = 4_000_000
+# Least recently used frames are dropped above this total size of the pixels in bytes
+FRAME_CACHE_MAX_SIZE = 64 * 1024 * 1024
 ASSETS_DIR = os.path.join(SOURCE_DIR, "assets")
-CONTENT_FILE_NAME = "content"
 
 FONTS_PATH = os.path.join(ASSETS_DIR, "fonts")
 BACKGROUND_WRAPPER = os.path.join(ASSETS_DIR, "background_wrapper.svg")
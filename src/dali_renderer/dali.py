@@ -1,26 +1,176 @@
 import os
-import tempfile
-import shutil
+import threading
+from collections import OrderedDict
+from io import BytesIO
 from os import PathLike
-from pathlib import Path
-from typing import KeysView, Union
+from pathlib import Path, PurePath
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    KeysView,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from pygments.lexers import guess_lexer, get_all_lexers, get_lexer_by_name
 from pygments.lexer import Lexer
-from pygments import highlight
+from pygments import lex
 from pygments.styles import STYLE_MAP, get_style_by_name
 from PIL import Image
-from cairosvg import svg2png
 
-from dali_renderer.renders.svg import SVGUtils
+from dali_renderer.cache import CacheStats, RenderCache
+from dali_renderer.report import Instrumentation, RenderHook, RenderReport
+from dali_renderer.lexers import detect_lexer_name, get_lexer, get_lexer_index
 from dali_renderer.renders.DaliImageFormatter import ImageFormatter
+from dali_renderer.renders.frame import FrameCompositor
+from dali_renderer.renders.frame import BACKGROUND_PADDING
+from dali_renderer.renders.png import PNGStreamWriter
+from dali_renderer.renders.encoders import EncoderOptionError, ImageEncoder
+from dali_renderer.renders.encoders import FORMAT_EXTENSIONS
+from dali_renderer.renders.encoders import get_format_for_path
+
+if TYPE_CHECKING:
+    from dali_renderer.aio import AsyncRenderer
+    from dali_renderer.batch import RenderResult
+
+try:
+    from dali_renderer.renders.svg import SVGUtils
+
+    svg_available = True
+except ImportError:
+    svg_available = False
 
 from dali_renderer.config import BACKGROUND_WRAPPER
-from dali_renderer.config import TMP_PNG_WRAPPER_NAME
-from dali_renderer.config import TMP_SVG_WRAPPER_NAME
-from dali_renderer.config import TMP_IMAGE_NAME
-from dali_renderer.config import CONTENT_FILE_NAME
 from dali_renderer.config import DEFAULT_FONT
+from dali_renderer.config import FRAME_CACHE_MAX_SIZE
+from dali_renderer.config import FRAME_CACHE_MAX_PIXELS
+from dali_renderer.config import STREAM_BAND_HEIGHT
+from dali_renderer.config import PARALLEL_MIN_LINES
+
+
+def _render_frame(
+    frame_backend: str,
+    background: str,
+    border_radius: int,
+    window_controls: bool,
+    additional_background: str,
+    width: int,
+    height: int,
+) -> Image.Image:
+    """
+    Rasterise the wrapper
+    :param frame_backend: `pillow` or `svg`
+    :type frame_backend: str
+    :param background: color of the main rectangle
+    :type background: str
+    :param border_radius: border radius in pixels
+    :type border_radius: int
+    :param window_controls: draw window controls
+    :type window_controls: bool
+    :param additional_background: color of the additional background or empty string
+    :type additional_background: str
+    :param width: width of the main rectangle
+    :type width: int
+    :param height: height of the main rectangle
+    :type height: int
+    :return: wrapper image
+    :rtype: Image.Image
+    """
+    if frame_backend == "svg":
+        svg: SVGUtils = SVGUtils(BACKGROUND_WRAPPER, background)
+        svg.set_width(width)
+        svg.set_height(height)
+        if border_radius:
+            svg.set_rounded_corners(border_radius)
+        if additional_background:
+            svg.set_additional_background(additional_background)
+        if window_controls:
+            svg.draw_controls()
+        image = Image.open(BytesIO(svg.to_png()))
+        image.load()
+        return image
+
+    frame: FrameCompositor = FrameCompositor(
+        background,
+        border_radius=border_radius,
+        window_controls=window_controls,
+        additional_background=additional_background,
+    )
+    return frame.render(width, height)
+
+
+class _FrameCache:
+    """
+    In-memory LRU cache of rasterised frames bounded by the total size of
+    their pixels, a frame is rasterised outside of the lock, so threads can
+    rasterise the same frame at once
+    :param max_size: maximum total size of the frames in bytes
+    :type max_size: int
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._frames: "OrderedDict[Tuple[Any, ...], Image.Image]" = OrderedDict()
+        self._size: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, *frame_options: Any) -> Image.Image:
+        """
+        Get the cached frame or rasterise it with `_render_frame`
+        :param frame_options: arguments of `_render_frame`
+        :type frame_options: Any
+        :return: shared wrapper image, it must not be modified
+        :rtype: Image.Image
+        """
+        with self._lock:
+            image = self._frames.get(frame_options)
+            if image is not None:
+                self._frames.move_to_end(frame_options)
+                self.hits += 1
+                return image
+            self.misses += 1
+        image = _render_frame(*frame_options)
+        with self._lock:
+            if frame_options not in self._frames:
+                self._frames[frame_options] = image
+                self._size += self._get_size(image)
+            while self._size > self.max_size and self._frames:
+                self._size -= self._get_size(self._frames.popitem(last=False)[1])
+        return image
+
+    def clear(self) -> None:
+        """
+        Drop every frame and reset the statistics
+        :return: None
+        """
+        with self._lock:
+            self._frames.clear()
+            self._size = self.hits = self.misses = 0
+
+    def stats(self) -> CacheStats:
+        """
+        Get the cache statistics
+        :return: statistics
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(self.hits, self.misses, len(self._frames), self._size)
+
+    @staticmethod
+    def _get_size(image: Image.Image) -> int:
+        return image.width * image.height * len(image.getbands())
+
+
+_frame_cache = _FrameCache(FRAME_CACHE_MAX_SIZE)
 
 
 class ExistingPath(Exception):
@@ -47,10 +197,38 @@ class StyleNotFound(Exception):
     pass
 
 
+class FrameBackendNotFound(Exception):
+    pass
+
+
+class ImageTooLarge(Exception):
+    pass
+
+
+class Measurement(NamedTuple):
+    """
+    Predicted size of a render
+    :param width: width of the final image
+    :param height: height of the final image
+    :param lines: number of lines of the source code
+    :param code_width: width of the highlighted code
+    :param code_height: height of the highlighted code
+    :param memory: estimated peak size of the image buffers in bytes
+    """
+
+    width: int
+    height: int
+    lines: int
+    code_width: int
+    code_height: int
+    memory: int
+
+
 class Dali:
     """
     Main `Dali` class
-    :param output_path: Path to save the renderer image
+    :param output_path: Path to save the renderer image, can be omitted if you only
+        use the in-memory `render_*` methods
     :type output_path: str
     :param syntax: Language lexer ex. `python`
     :type syntax: str
@@ -69,13 +247,38 @@ class Dali:
     :type window_controls: bool
     :param background: Set if you need to set additional background around of the image
     :type background: str
+    :param frame_backend: Frame renderer `pillow` or `svg` (requires CairoSVG), default `pillow`
+    :type frame_backend: str
+    :param output_format: Output format `png`, `webp`, `jpeg` or `avif` (if Pillow supports it),
+        default is chosen by the extension of the output path or `png`, it must match the
+        extension of the output path
+    :type output_format: str
+    :param png_profile: PNG speed/size profile `fast`, `balanced` or `smallest`, default `fast`
+    :type png_profile: str
+    :param quality: Quality of the lossy formats from 1 to 100, WebP is lossless if it's not set
+    :type quality: Optional[int]
+    :param cache: On-disk cache of encoded images, used by `from_string`, `from_file`,
+        `render_bytes` and `render_to`
+    :type cache: Optional[RenderCache]
+    :param max_pixels: Raise `ImageTooLarge` before rasterising an image with more pixels
+    :type max_pixels: Optional[int]
+    :param max_lines: Raise `ImageTooLarge` before rasterising source code with more lines
+    :type max_lines: Optional[int]
+    :param max_width: Raise `ImageTooLarge` before rasterising a wider image
+    :type max_width: Optional[int]
+    :param hooks: Callbacks of the render stages, see `RenderHook` and `last_report`
+    :type hooks: Sequence[RenderHook]
+    :param workers: Number of processes to rasterise horizontal bands of large images
+        (`PARALLEL_MIN_LINES` lines or more) in parallel, default `1`
+    :type workers: int
     """
 
-    output_extension = [".png"]
+    output_extension = list(FORMAT_EXTENSIONS)
+    frame_backends = ["pillow", "svg"]
 
     def __init__(
         self,
-        output_path: str,
+        output_path: str = "",
         syntax: str = "",
         style: str = "one-dark",
         font: str = DEFAULT_FONT,
@@ -84,6 +287,16 @@ class Dali:
         border_radius: int = 10,  # set 0 to disable,
         window_controls: bool = False,
         background: str = "",
+        frame_backend: str = "pillow",
+        workers: int = 1,
+        output_format: str = "",
+        png_profile: str = "fast",
+        quality: Optional[int] = None,
+        cache: Optional[RenderCache] = None,
+        max_pixels: Optional[int] = None,
+        max_lines: Optional[int] = None,
+        max_width: Optional[int] = None,
+        hooks: Sequence[RenderHook] = (),
     ):
         self._input_file: Union[PathLike, str] = Path()
         self.output_path: str = output_path
@@ -95,19 +308,39 @@ class Dali:
         self.border_radius: int = border_radius
         self.window_controls: bool = window_controls
         self.background: str = background
+        self.frame_backend: str = frame_backend
+        self.workers: int = workers
+        self.cache: Optional[RenderCache] = cache
+        self.max_pixels: Optional[int] = max_pixels
+        self.max_lines: Optional[int] = max_lines
+        self.max_width: Optional[int] = max_width
+        self._instrumentation: Instrumentation = Instrumentation(hooks)
+        self.output_format: str = (
+            output_format or get_format_for_path(output_path) or "png"
+        ).lower()
 
         # If we are drawing window controls, we should use padding equal to 50 or more
         if self.window_controls and self.padding < 50:
             self.padding = 50
 
-        self._tmp_dir = tempfile.mkdtemp()
-        self._tmp_svg_wrapper = os.path.join(self._tmp_dir, TMP_SVG_WRAPPER_NAME)
-        self._tmp_output_png_wrapper = os.path.join(self._tmp_dir, TMP_PNG_WRAPPER_NAME)
-        self._tmp_output_image = os.path.join(self._tmp_dir, TMP_IMAGE_NAME)
-        self._tmp_content_file = os.path.join(self._tmp_dir, CONTENT_FILE_NAME)
-
-        self._height: int = 0
-        self._width: int = 0
+        # Options to create the same renderer in a worker process
+        self._options: Dict[str, Any] = {
+            "syntax": syntax,
+            "style": style,
+            "font": font,
+            "padding": self.padding,
+            "font_size": font_size,
+            "border_radius": border_radius,
+            "window_controls": window_controls,
+            "background": background,
+            "frame_backend": frame_backend,
+            "output_format": self.output_format,
+            "png_profile": png_profile,
+            "quality": quality,
+            "max_pixels": max_pixels,
+            "max_lines": max_lines,
+            "max_width": max_width,
+        }
 
         if self.padding < 10:
             raise PaddingError(
@@ -118,10 +351,48 @@ class Dali:
                 f"Padding cannot be more than 10. Given value is {self.padding}"
             )
 
-        if not self._check_output_extension():
+        if self.frame_backend not in self.frame_backends:
+            raise FrameBackendNotFound(
+                f"`{self.frame_backend}` frame backend is not supported"
+            )
+        elif self.frame_backend == "svg" and not svg_available:
+            raise FrameBackendNotFound(
+                "`svg` frame backend requires the `svg` extra: pip install dali_renderer[svg]"
+            )
+
+        if self.output_path and not self._check_output_extension():
             raise InputNotSpecified(
                 f"The given output filename `{self.output_path}` doesn't have a valid extension"
             )
+        if (
+            self.output_path
+            and get_format_for_path(self.output_path) != self.output_format
+        ):
+            raise EncoderOptionError(
+                f"The output filename `{self.output_path}` doesn't match the `{self.output_format}` output format"
+            )
+
+        self._encoder: ImageEncoder = ImageEncoder(
+            self.output_format, png_profile, quality
+        )
+
+    @property
+    def last_report(self) -> RenderReport:
+        """
+        Get the stage timings and sizes of the last render
+        :return: report
+        :rtype: RenderReport
+        """
+        return self._instrumentation.report
+
+    @property
+    def encode_time(self) -> float:
+        """
+        Get the duration of the last image encoding
+        :return: duration in seconds
+        :rtype: float
+        """
+        return self._encoder.encode_time
 
     @property
     def styles(self) -> KeysView[str]:
@@ -137,11 +408,34 @@ class Dali:
         :rtype: list
         """
         lexers = [
-            lexer[0].lower() if only_name else lexer for lexer in get_all_lexers()
+            lexer[0].lower() if only_name else lexer
+            for lexer in get_lexer_index().lexers
         ]
 
         return lexers
 
+    @staticmethod
+    def render_many(
+        jobs: Iterable[Tuple[Union[str, PurePath], Optional[str], Dict[str, Any]]],
+        workers: Optional[int] = None,
+    ) -> Iterator["RenderResult"]:
+        """
+        Render many snippets in a pool of worker processes that keep fonts
+        and lexers loaded between jobs
+        :param jobs: iterable of `(source, output, options)` tuples, where the source
+            is a code string or a `pathlib` path to the source code file, the output
+            is a path to save the image or None to get the encoded bytes, and the options
+            are `Dali` keyword arguments
+        :type jobs: Iterable[Tuple[Union[str, PurePath], Optional[str], Dict[str, Any]]]
+        :param workers: number of worker processes, default is the number of CPUs
+        :type workers: Optional[int]
+        :return: `RenderResult` items with a per-job error, in the order of completion
+        :rtype: Iterator[RenderResult]
+        """
+        from dali_renderer.batch import render_many
+
+        return render_many(jobs, workers)
+
     def from_string(self, code: str) -> None:
         """
         Generation an image from a string of source code
@@ -149,20 +443,17 @@ class Dali:
         :type code: str
         :return: None
         """
-        if len(code) <= 10:
-            raise CodeLength(
-                "Code length must be a positive integer and greater than 10"
-            )
+        self._check_code_length(code)
+        self._write(code, self._get_output_path())
 
-        self._set_file_content(code)
-        self._input_file = self._tmp_content_file
-        self._generate()
-
-    def from_file(self, file_path: str) -> None:
+    def from_file(self, file_path: str, stream: bool = False) -> None:
         """
         Generation an image from a source code file
         :param file_path: the path to the source code file
         :type file_path: str
+        :param stream: Render and encode the image in bands of rows to keep
+            the memory usage bounded for very large files, see `render_stream`
+        :type stream: bool
         :return: None
         """
         if not os.path.exists(file_path):
@@ -174,13 +465,498 @@ class Dali:
             )
 
         self._input_file = file_path
-        self._generate()
+        with open(file_path, "r") as file_input:
+            content = file_input.read()
+        if stream:
+            self._stream(content, self._get_output_path(), file_path)
+        else:
+            self._write(content, self._get_output_path(), file_path)
+
+    def measure(self, code: str, filename: str = "") -> Measurement:
+        """
+        Predict the size of the image without rasterising it, only the code
+        is lexed and laid out
+        :param code: string of source code
+        :type code: str
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :return: predicted size
+        :rtype: Measurement
+
+        :raises: :class:`ImageTooLarge`: the image exceeds the limits
+        """
+        self._check_code_length(code)
+        self._validate_options()
+        lexer: Lexer = self._get_lexer(code, filename)
+        measurement = self._get_measurement(
+            self._get_formatter().measure(lex(code, lexer)), code
+        )
+        self._check_limits(measurement)
+        return measurement
+
+    def render_image(self, code: str, filename: str = "") -> Image.Image:
+        """
+        Generation an in-memory image from a string of source code
+        :param code: string of source code
+        :type code: str
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :return: rendered image
+        :rtype: Image.Image
+        """
+        self._check_code_length(code)
+        self._instrumentation.start()
+        image = self._generate(code, filename)
+        self._instrumentation.finish()
+        return image
+
+    def render_bytes(self, code: str, filename: str = "") -> bytes:
+        """
+        Generation encoded image bytes in the output format from a string of source code
+        :param code: string of source code
+        :type code: str
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :return: encoded image
+        :rtype: bytes
+        """
+        buffer = BytesIO()
+        self.render_to(code, buffer, filename)
+        return buffer.getvalue()
+
+    def render_with_report(
+        self, code: str, filename: str = ""
+    ) -> Tuple[bytes, RenderReport]:
+        """
+        Generation encoded image bytes with the report of the render
+        :param code: string of source code
+        :type code: str
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :return: encoded image and the stage timings and sizes of the render
+        :rtype: Tuple[bytes, RenderReport]
+        """
+        data = self.render_bytes(code, filename)
+        return data, self.last_report
 
-    def _generate(self) -> str:
+    def render_to(self, code: str, file_object: BinaryIO, filename: str = "") -> None:
+        """
+        Generation an image from a string of source code and writing it
+        to a binary file-like object
+        :param code: string of source code
+        :type code: str
+        :param file_object: writable binary file-like object
+        :type file_object: BinaryIO
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :return: None
+        """
+        self._check_code_length(code)
+        self._write(code, file_object, filename)
+
+    async def render_async(
+        self, code: str, filename: str = "", renderer: Optional["AsyncRenderer"] = None
+    ) -> bytes:
+        """
+        Asyncio counterpart of `render_bytes`, lexing, rasterising and encoding
+        run on an executor and don't block the event loop
+        :param code: string of source code
+        :type code: str
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :param renderer: executor and concurrency limit of the renders, default is a
+            shared `AsyncRenderer` on the default executor of the loop
+        :type renderer: Optional[AsyncRenderer]
+        :return: encoded image
+        :rtype: bytes
+        """
+        from dali_renderer.aio import _default_renderer
+
+        return await (renderer or _default_renderer).render(self, code, filename)
+
+    def render_pages(
+        self,
+        code: str,
+        lines_per_page: int = 50,
+        filename: str = "",
+        workers: Optional[int] = None,
+    ) -> List[bytes]:
+        """
+        Generation encoded pages of ``lines_per_page`` lines from a string of source code.
+        The code is lexed once, the pages continue the line numbering, have the
+        same width and are rasterised and encoded in parallel worker processes
+        :param code: string of source code
+        :type code: str
+        :param lines_per_page: lines on every page
+        :type lines_per_page: int
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :param workers: number of worker processes, default is the number of CPUs,
+            `1` renders in the current process
+        :type workers: Optional[int]
+        :return: encoded pages
+        :rtype: List[bytes]
+        """
+        from dali_renderer.batch import render_pages
+
+        self._check_code_length(code)
+        if lines_per_page <= 0:
+            raise CodeLength("Lines per page must be a positive integer")
+        self._validate_options()
+        formatter: ImageFormatter = self._get_formatter()
+        lexer: Lexer = self._get_lexer(code, filename)
+
+        tokens = list(lex(code, lexer))
+        width, _ = formatter.measure(tokens)
+        lines = list(formatter.iter_lines(tokens))
+        # The first page is the largest one, the line limit applies to the whole code
+        _, page_height = formatter.measure(
+            token for line in lines[:lines_per_page] for token in line
+        )
+        self._check_limits(self._get_measurement((width, page_height), code))
+        pages = [
+            [
+                (str(ttype), value)
+                for line in lines[start : start + lines_per_page]
+                for ttype, value in line
+            ]
+            for start in range(0, len(lines), lines_per_page)
+        ]
+        return render_pages(self._options, pages, lines_per_page, width, workers)
+
+    def render_stream(
+        self,
+        code: str,
+        file_object: BinaryIO,
+        filename: str = "",
+        band_height: int = STREAM_BAND_HEIGHT,
+    ) -> None:
+        """
+        Generation a PNG image from a string of source code with bounded memory.
+        Only the PNG output format can be streamed.
+        The tokens are consumed line by line, the image is rasterised in bands
+        of ``band_height`` rows and every band is encoded right away, so the
+        peak memory depends on the band size and not on the length of the code
+        :param code: string of source code
+        :type code: str
+        :param file_object: writable binary file-like object
+        :type file_object: BinaryIO
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :param band_height: rows per band
+        :type band_height: int
+        :return: None
+        """
+        self._check_code_length(code)
+        self._stream(code, file_object, filename, band_height)
+
+    def _stream(
+        self,
+        content: str,
+        output: Union[str, BinaryIO],
+        filename: str = "",
+        band_height: int = STREAM_BAND_HEIGHT,
+    ) -> None:
+        """
+        Streaming counterpart of `_generate`, the content is lexed twice: once
+        to measure the image and once to draw it. An output path is opened
+        only after the checks, a partially written file is removed on errors
+        :param content: source code content
+        :type content: str
+        :param output: path or binary file-like object
+        :type output: Union[str, BinaryIO]
+        :param filename: source code file name used to detect the syntax
+        :type filename: str
+        :param band_height: rows per band
+        :type band_height: int
+        :return: None
+
+        :raises: :class:`EncoderOptionError`: the output format is not PNG
+        """
+        if self.output_format != "png":
+            raise EncoderOptionError(
+                f"Only PNG images can be streamed, the output format is `{self.output_format}`"
+            )
+        self._validate_options()
+        instrumentation = self._instrumentation
+        report = instrumentation.start()
+        formatter: ImageFormatter = self._get_formatter()
+        with instrumentation.stage("detect"):
+            lexer: Lexer = self._get_lexer(content, filename)
+            report.syntax = lexer.name
+
+        with instrumentation.stage("layout"):
+            code_size = formatter.measure(lex(content, lexer))
+        self._check_limits(self._get_measurement(code_size, content))
+        width = code_size[0] + (self.padding * 2)
+        height = code_size[1] + (self.padding * 2)
+        offset = self._get_code_offset()
+        frame_bands: Iterator[Image.Image] = self._iter_frame_bands(
+            width, height, band_height
+        )
+        code_bands = formatter.iter_bands(
+            lex(content, lexer), code_size, band_height, -offset
+        )
+        total_height = height + (BACKGROUND_PADDING if self.background else 0)
+
+        with instrumentation.stage("stream"):
+            if isinstance(output, str):
+                try:
+                    with open(output, "wb") as file_output:
+                        writer = self._write_bands(
+                            file_output, frame_bands, code_bands, offset, total_height
+                        )
+                except BaseException:
+                    os.unlink(output)
+                    raise
+            else:
+                writer = self._write_bands(
+                    output, frame_bands, code_bands, offset, total_height
+                )
+        report.width, report.height = writer.width, writer.height
+        report.output_bytes = writer.bytes_written
+        instrumentation.finish()
+
+    def _write_bands(
+        self,
+        file_object: BinaryIO,
+        frame_bands: Iterator[Image.Image],
+        code_bands: Iterator[Image.Image],
+        offset: int,
+        total_height: int,
+    ) -> PNGStreamWriter:
+        """
+        Paste the code bands onto the wrapper bands and encode them
+        :param file_object: writable binary file-like object
+        :type file_object: BinaryIO
+        :param frame_bands: `RGBA` bands of the wrapper image
+        :type frame_bands: Iterator[Image.Image]
+        :param code_bands: bands of the highlighted code
+        :type code_bands: Iterator[Image.Image]
+        :param offset: offset of the code in the wrapper image
+        :type offset: int
+        :param total_height: height of the wrapper image
+        :type total_height: int
+        :return: closed PNG writer
+        :rtype: PNGStreamWriter
+        """
+        writer: Optional[PNGStreamWriter] = None
+        for band in frame_bands:
+            if writer is None:
+                writer = PNGStreamWriter(
+                    file_object,
+                    band.width,
+                    total_height,
+                    compress_level=self._encoder.compress_level,
+                )
+            code_band = next(code_bands, None)
+            if code_band is not None:
+                band.paste(code_band, (offset, 0), code_band)
+            writer.write(band)
+        writer.close()  # type: ignore
+        return writer  # type: ignore
+
+    def _iter_frame_bands(
+        self, width: int, height: int, band_height: int
+    ) -> Iterator[Image.Image]:
+        """
+        Get the wrapper image as bands of rows
+        :param width: width of the main rectangle
+        :type width: int
+        :param height: height of the main rectangle
+        :type height: int
+        :param band_height: rows per band
+        :type band_height: int
+        :return: `RGBA` bands
+        :rtype: Iterator[Image.Image]
+        """
+        if self.frame_backend == "svg":
+            # CairoSVG rasterises the whole frame at once
+            frame = self._get_frame(width, height)
+            for top in range(0, frame.height, band_height):
+                yield frame.crop(
+                    (0, top, frame.width, min(top + band_height, frame.height))
+                )
+            return
+
+        yield from FrameCompositor(
+            get_style_by_name(self.style).background_color,
+            border_radius=self.border_radius,
+            window_controls=self.window_controls,
+            additional_background=self.background,
+        ).iter_bands(width, height, band_height)
+
+    def _generate(self, content: str, filename: str = "") -> Image.Image:
         """
         The basic method of manipulating the generated image
-        :return: absolute path to the generated image
-        :rtype: str
+        :param content: source code content
+        :type content: str
+        :param filename: source code file name used to detect the syntax
+        :type filename: str
+        :return: generated image
+        :rtype: Image.Image
+        """
+        self._validate_options()
+        instrumentation = self._instrumentation
+        report = instrumentation.report
+        formatter: ImageFormatter = self._get_formatter()
+
+        """Forming a basic highlighted image"""
+        with instrumentation.stage("detect"):
+            lexer: Lexer = self._get_lexer(content, filename)
+            report.syntax = lexer.name
+        with instrumentation.stage("lex"):
+            tokens = list(lex(content, lexer))
+            report.tokens = len(tokens)
+        if self.workers > 1:
+            return self._compose(self._render_parallel(formatter, tokens, content))
+
+        with instrumentation.stage("layout"):
+            size = formatter.layout(tokens)
+            report.drawables = len(formatter.drawables)
+        self._check_limits(self._get_measurement(size, content))
+        with instrumentation.stage("raster"):
+            basic_image = formatter.rasterize(size)
+        return self._compose(basic_image)
+
+    def _render_parallel(
+        self, formatter: ImageFormatter, tokens: list, content: str
+    ) -> Image.Image:
+        """
+        Rasterising horizontal bands of the highlighted image in worker processes
+        and stitching them together, the result is identical to `ImageFormatter.render`
+        :param formatter: image formatter
+        :type formatter: ImageFormatter
+        :param tokens: ``(tokentype, tokenstring)`` tuples
+        :type tokens: list
+        :param content: source code content
+        :type content: str
+        :return: highlighted image
+        :rtype: Image.Image
+        """
+        from dali_renderer.batch import render_bands
+
+        instrumentation = self._instrumentation
+        lines = list(formatter.iter_lines(tokens))
+        if len(lines) < PARALLEL_MIN_LINES:
+            with instrumentation.stage("layout"):
+                size = formatter.layout(tokens)
+                instrumentation.report.drawables = len(formatter.drawables)
+            self._check_limits(self._get_measurement(size, content))
+            with instrumentation.stage("raster"):
+                return formatter.rasterize(size)
+
+        with instrumentation.stage("layout"):
+            size = formatter.measure(tokens)
+        self._check_limits(self._get_measurement(size, content))
+        width, height = size
+        bands = []
+        for index in range(self.workers):
+            top = height * index // self.workers
+            bottom = height * (index + 1) // self.workers
+            first, last = formatter.get_band_lines(top, bottom)
+            band_lines = [
+                (lineno, [(str(ttype), value) for ttype, value in lines[lineno]])
+                for lineno in range(first, min(last + 1, len(lines)))
+            ]
+            bands.append((band_lines, top, bottom))
+
+        with instrumentation.stage("raster"):
+            im: Image.Image = Image.new("RGBA", size)
+            for (_, top, _), band in zip(
+                bands, render_bands(self._options, bands, size, self.workers)
+            ):
+                im.paste(band, (0, top))
+        return im
+
+    def _compose(self, basic_image: Image.Image) -> Image.Image:
+        """
+        Moving the highlighted image to the wrapper
+        :param basic_image: highlighted image
+        :type basic_image: Image.Image
+        :return: generated image
+        :rtype: Image.Image
+        """
+        width, height = basic_image.size
+
+        """Forming the wrapper"""
+        with self._instrumentation.stage("frame"):
+            background_im: Image.Image = self._get_frame(
+                width + (self.padding * 2), height + (self.padding * 2)
+            )
+        offset = self._get_code_offset()
+
+        """Moving image to wrapper"""
+        with self._instrumentation.stage("paste"):
+            background_im.paste(basic_image, (offset, offset), basic_image)
+        self._instrumentation.report.width, self._instrumentation.report.height = (
+            background_im.size
+        )
+
+        return background_im
+
+    def _get_code_offset(self) -> int:
+        """
+        Get the position of the highlighted code in the generated image
+        :return: offset from the left and the top edge in pixels
+        :rtype: int
+        """
+        return self.padding + (BACKGROUND_PADDING // 2 if self.background else 0)
+
+    def _get_measurement(self, code_size: Tuple[int, int], content: str) -> Measurement:
+        """
+        Predict the size of the final image from the size of the highlighted code
+        :param code_size: size of the highlighted code
+        :type code_size: Tuple[int, int]
+        :param content: source code content
+        :type content: str
+        :return: predicted size
+        :rtype: Measurement
+        """
+        code_width, code_height = code_size
+        width = code_width + self.padding * 2
+        height = code_height + self.padding * 2
+        if self.background:
+            width += BACKGROUND_PADDING
+            height += BACKGROUND_PADDING
+        lines = content.count("\n") + (not content.endswith("\n"))
+        # RGBA highlighted code and frame, the rasterised frame is cached in addition
+        pixels = code_width * code_height + width * height
+        if width * height <= FRAME_CACHE_MAX_PIXELS:
+            pixels += width * height
+        return Measurement(width, height, lines, code_width, code_height, pixels * 4)
+
+    def _check_limits(self, measurement: Measurement) -> None:
+        """
+        Image size limits checking
+        :param measurement: predicted size
+        :type measurement: Measurement
+        :return: None
+
+        :raises: :class:`ImageTooLarge`: the image exceeds the limits
+        """
+        if self.max_lines is not None and measurement.lines > self.max_lines:
+            raise ImageTooLarge(
+                f"{measurement.lines} lines exceed the limit of {self.max_lines} lines"
+            )
+        if self.max_width is not None and measurement.width > self.max_width:
+            raise ImageTooLarge(
+                f"{measurement.width}px width exceeds the limit of {self.max_width}px"
+            )
+        if (
+            self.max_pixels is not None
+            and measurement.width * measurement.height > self.max_pixels
+        ):
+            raise ImageTooLarge(
+                f"{measurement.width}x{measurement.height} image exceeds the limit of {self.max_pixels} pixels"
+            )
+
+    def _validate_options(self) -> None:
+        """
+        Syntax and style checking
+        :return: None
+
+        :raises: :class:`SyntaxNotFound`, :class:`StyleNotFound`
         """
         if self.syntax and not self._is_supported_syntax():
             raise SyntaxNotFound(f"`{self.syntax}` syntax is not supported")
@@ -188,64 +964,66 @@ class Dali:
         if self.style and not self._is_supported_style():
             raise StyleNotFound(f"`{self.style}` style is not supported")
 
-        formatter: ImageFormatter = ImageFormatter(
+    def _get_formatter(self, **options: Union[str, int, None]) -> ImageFormatter:
+        """
+        Create the image formatter
+        :param options: additional `ImageFormatter` options
+        :type options: Union[str, int, None]
+        :return: formatter
+        :rtype: ImageFormatter
+        """
+        return ImageFormatter(
             font_name=self.font_name,
             font_size=self.font_size,
             style=self.style,
             line_number_fg=None,
+            **options,
         )
 
-        """Forming a basic highlighted image"""
-        self.get_supported_lexers()
-        with open(self._input_file, "r") as file_input:
-            content = file_input.read()
-            with open(self._tmp_output_image, "wb") as file_output:
-                """lexer definition"""
-                lexer: Lexer
-                if self.syntax:
-                    lexer = get_lexer_by_name(self.syntax)
-                else:
-                    lexer = guess_lexer(content)
-                file_output.write(highlight(content, lexer, formatter))
-
-        basic_image = Image.open(self._tmp_output_image)
-        self._width, self._height = basic_image.size
-
-        """Forming the svg wrapper"""
-        self.svg: SVGUtils = SVGUtils(
-            BACKGROUND_WRAPPER, get_style_by_name(self.style).background_color
-        )
-        self.svg.set_width(self._width + (self.padding * 2))
-        self.svg.set_height(self._height + (self.padding * 2))
-        if self.border_radius:
-            self.svg.set_rounded_corners(self.border_radius)
-
-        """SVG wrapper to PNG"""
-        if self.background:
-            self.svg.set_additional_background(self.background)
-            self._width = self._width + self.svg.background_padding
-            self._height = self._height + self.svg.background_padding
-            self.padding = self.padding + (self.svg.background_padding // 2)
-
-        if self.window_controls:
-            self.svg.draw_controls()
+    def _get_lexer(self, content: str, filename: str = "") -> Lexer:
+        """
+        Lexer definition
+        :param content: source code content
+        :type content: str
+        :param filename: source code file name used to detect the syntax
+        :type filename: str
+        :return: lexer
+        :rtype: Lexer
+        """
+        if self.syntax:
+            return get_lexer(self.syntax)  # type: ignore
+        return get_lexer(detect_lexer_name(content, filename))  # type: ignore
 
-        self.svg.save(self._tmp_svg_wrapper)
+    @staticmethod
+    def clear_frame_cache() -> None:
+        """
+        Drop the process-wide cache of rasterised frames
+        :return: None
+        """
+        _frame_cache.clear()
 
-        svg2png(
-            url=self._tmp_svg_wrapper,
-            write_to=self._tmp_output_png_wrapper,
-            parent_width=self.svg.width,
-            parent_height=self.svg.height,
+    def _get_frame(self, width: int, height: int) -> Image.Image:
+        """
+        Get the wrapper image, identical frames are rasterised once per process
+        :param width: width of the main rectangle
+        :type width: int
+        :param height: height of the main rectangle
+        :type height: int
+        :return: wrapper image, safe to draw on
+        :rtype: Image.Image
+        """
+        frame_options = (
+            self.frame_backend,
+            get_style_by_name(self.style).background_color,
+            self.border_radius,
+            self.window_controls,
+            self.background,
+            width,
+            height,
         )
-
-        """Moving image to wrapper"""
-        background_im = Image.open(self._tmp_output_png_wrapper)
-        background_im.paste(basic_image, (self.padding, self.padding), basic_image)
-
-        background_im.save(self.output_path, compress_level=0)
-
-        return self.output_path
+        if width * height > FRAME_CACHE_MAX_PIXELS:
+            return _render_frame(*frame_options)
+        return _frame_cache.get(*frame_options).copy()
 
     def _is_supported_syntax(self) -> bool:
         """
@@ -253,7 +1031,7 @@ class Dali:
         :return: check result
         :rtype: bool
         """
-        if self.syntax not in self.get_supported_lexers(True):
+        if self.syntax not in get_lexer_index():
             return False
 
         return True
@@ -269,15 +1047,89 @@ class Dali:
 
         return True
 
-    def _set_file_content(self, content: str) -> None:
+    def _check_code_length(self, code: str) -> None:
+        """
+        Code length checking
+        :param code: source code content
+        :type code: str
+        :return: None
+
+        :raises: :class:`CodeLength`: code is too short
         """
-        Save the content to a file
+        if len(code) <= 10:
+            raise CodeLength(
+                "Code length must be a positive integer and greater than 10"
+            )
+
+    def _get_output_path(self) -> str:
+        """
+        Get the output path to save the image
+        :return: output path
+        :rtype: str
+
+        :raises: :class:`InputNotSpecified`: output path is not set
+        """
+        if not self.output_path:
+            raise InputNotSpecified(
+                "Output path is not specified, use `render_image`, `render_bytes` or `render_to` instead"
+            )
+        return self.output_path
+
+    def _save(self, image: Image.Image, output: Union[str, BinaryIO]) -> None:
+        """
+        Encode the image into a path or a binary file-like object
+        :param image: generated image
+        :type image: Image.Image
+        :param output: path or binary file-like object
+        :type output: Union[str, BinaryIO]
+        :return: None
+        """
+        self._encoder.save(image, output)
+
+    def _write(
+        self, content: str, output: Union[str, BinaryIO], filename: str = ""
+    ) -> None:
+        """
+        Generate and encode the image into a path or a binary file-like object,
+        through the render cache if it's set
         :param content: source code content
         :type content: str
+        :param output: path or binary file-like object
+        :type output: Union[str, BinaryIO]
+        :param filename: source code file name used to detect the syntax
+        :type filename: str
         :return: None
         """
-        with open(self._tmp_content_file, "w") as file:
-            file.write(content)
+        instrumentation = self._instrumentation
+        report = instrumentation.start()
+        data: Optional[bytes] = None
+        key = ""
+        if self.cache is not None:
+            cache_options = dict(self._options)
+            if not self.syntax:
+                # The detected syntax depends on the file name
+                cache_options["filename"] = os.path.basename(filename)
+            with instrumentation.stage("cache"):
+                key = self.cache.get_key(content, cache_options)
+                data = self.cache.get(key)
+            report.cache_hit = data is not None
+
+        if data is None:
+            image = self._generate(content, filename)
+            buffer = BytesIO()
+            with instrumentation.stage("encode"):
+                self._save(image, buffer)
+            data = buffer.getvalue()
+            if self.cache is not None:
+                self.cache.put(key, data)
+        report.output_bytes = len(data)
+
+        if isinstance(output, str):
+            with open(output, "wb") as file_output:
+                file_output.write(data)
+        else:
+            output.write(data)
+        instrumentation.finish()
 
     def _check_output_extension(self) -> bool:
         """
@@ -289,10 +1141,3 @@ class Dali:
             if self.output_path.lower().endswith(ext):
                 return True
         return False
-
-    def __del__(self) -> None:
-        """
-        Delete all temporary files
-        :return: None
-        """
-        shutil.rmtree(self._tmp_dir)
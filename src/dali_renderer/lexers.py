@@ -0,0 +1,276 @@
+import fnmatch
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pygments.lexer import Lexer
+from pygments.lexers import find_lexer_class, get_all_lexers, guess_lexer
+from pygments.modeline import get_filetype_from_buffer
+
+from dali_renderer.config import DETECTION_CACHE_SIZE
+from dali_renderer.config import DETECTION_PREFIX_SIZE
+from dali_renderer.config import LEXER_CACHE_SIZE
+
+SHEBANG_RE = re.compile(r"^#!\s*(\S+)(?:\s+(.*))?")
+EMACS_MODELINE_RES = (
+    re.compile(r"-\*-.*?\bmode:\s*([\w+#-]+)"),
+    re.compile(r"-\*-\s*([\w+#-]+)\s*-\*-"),
+)
+# Interpreters which are not lexer aliases
+INTERPRETERS = {
+    "node": "javascript",
+    "nodejs": "javascript",
+}
+
+
+# Lexers of a file name pattern as `(lexer name, pattern)`
+Candidates = List[Tuple[str, str]]
+
+
+class LexerIndex:
+    """
+    Lookup tables of all builtin and plugin lexers, built once per process.
+    Every lexer name and alias (lower case) and mimetype is mapped to the
+    lexer name, every filename glob to all lexers that claim it, classes
+    are imported on first use.
+    """
+
+    def __init__(self) -> None:
+        self.lexers: Tuple[
+            Tuple[str, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]], ...
+        ] = tuple(get_all_lexers())
+        self.names: Dict[str, str] = {}
+        # Plain file names, ex. `Makefile`
+        self.filenames: Dict[str, Candidates] = {}
+        # Plain `*.ext` patterns by the extension, ex. `.py`
+        self.extensions: Dict[str, Candidates] = {}
+        self.mimetypes: Dict[str, str] = {}
+        # Other globs, matched with fnmatch
+        self._patterns: Candidates = []
+
+        for name, aliases, filenames, mimetypes in self.lexers:
+            self.names.setdefault(name.lower(), name)
+            for alias in aliases:
+                self.names.setdefault(alias.lower(), name)
+            for pattern in filenames:
+                extension = pattern[1:]
+                if not any(c in pattern for c in "*?["):
+                    self.filenames.setdefault(pattern, []).append((name, pattern))
+                elif pattern.startswith("*.") and not any(
+                    c in extension for c in "*?["
+                ):
+                    self.extensions.setdefault(extension, []).append((name, pattern))
+                else:
+                    self._patterns.append((name, pattern))
+            for mimetype in mimetypes:
+                self.mimetypes.setdefault(mimetype, name)
+
+    def __contains__(self, syntax: str) -> bool:
+        return syntax.lower() in self.names
+
+    def get_name(self, syntax: str) -> Optional[str]:
+        """
+        Resolve a lexer name or alias
+        :param syntax: lexer name or alias, ex. `python` or `py`
+        :type syntax: str
+        :return: lexer name or None
+        :rtype: Optional[str]
+        """
+        return self.names.get(syntax.lower())
+
+    def get_candidates(self, filename: str) -> Candidates:
+        """
+        Get all lexers whose filename globs match the file name
+        :param filename: file name or path
+        :type filename: str
+        :return: list of `(lexer name, pattern)`
+        :rtype: Candidates
+        """
+        basename = os.path.basename(filename)
+        candidates: Candidates = list(self.filenames.get(basename, ()))
+        # Every suffix is an extension, ex. `.tar.gz` and `.gz`
+        for position, char in enumerate(basename):
+            if char == ".":
+                candidates.extend(self.extensions.get(basename[position:], ()))
+        for name, pattern in self._patterns:
+            if fnmatch.fnmatchcase(basename, pattern):
+                candidates.append((name, pattern))
+        return candidates
+
+    def get_name_for_filename(self, filename: str, code: str = "") -> Optional[str]:
+        """
+        Resolve a lexer by the file name. When several lexers claim the file
+        name, the one with the best rating wins the same way as in
+        `pygments.lexers.get_lexer_for_filename`: by `analyse_text` of the
+        code, or by the lexer priority without the code
+        :param filename: file name or path
+        :type filename: str
+        :param code: beginning of the source code used to rate ambiguous lexers
+        :type code: str
+        :return: lexer name or None
+        :rtype: Optional[str]
+        """
+        candidates = self.get_candidates(filename)
+        if not candidates:
+            return None
+        if all(name == candidates[0][0] for name, _ in candidates):
+            return candidates[0][0]
+        return max(candidates, key=lambda candidate: _rate(candidate, code))[0]
+
+    def get_name_for_mimetype(self, mimetype: str) -> Optional[str]:
+        """
+        Resolve a lexer by the mimetype
+        :param mimetype: mimetype, ex. `text/x-python`
+        :type mimetype: str
+        :return: lexer name or None
+        :rtype: Optional[str]
+        """
+        return self.mimetypes.get(mimetype)
+
+
+def _rate(candidate: Tuple[str, str], code: str) -> Tuple[float, str]:
+    """
+    Rate a lexer of a file name, explicit file names get a bonus
+    :param candidate: `(lexer name, pattern)`
+    :type candidate: Tuple[str, str]
+    :param code: beginning of the source code or empty string
+    :type code: str
+    :return: rating and the class name to break ties
+    :rtype: Tuple[float, str]
+    """
+    name, pattern = candidate
+    lexer_class = get_lexer_class(name)
+    bonus = 0.5 if "*" not in pattern else 0
+    if code:
+        return lexer_class.analyse_text(code) + bonus, lexer_class.__name__
+    return lexer_class.priority + bonus, lexer_class.__name__
+
+
+@lru_cache(maxsize=None)
+def get_lexer_index() -> LexerIndex:
+    """
+    Get the process-wide lexer index
+    :return: lexer index
+    :rtype: LexerIndex
+    """
+    return LexerIndex()
+
+
+@lru_cache(maxsize=None)
+def get_lexer_class(name: str) -> Type[Lexer]:
+    """
+    Import the lexer class by the lexer name
+    :param name: lexer name from the index
+    :type name: str
+    :return: lexer class
+    :rtype: Type[Lexer]
+    """
+    return find_lexer_class(name)
+
+
+@lru_cache(maxsize=LEXER_CACHE_SIZE)
+def _get_lexer(name: str, options: Tuple[Tuple[str, Any], ...]) -> Lexer:
+    return get_lexer_class(name)(**dict(options))
+
+
+def get_lexer(syntax: str, **options: Any) -> Optional[Lexer]:
+    """
+    Get a shared lexer instance by the lexer name or alias
+    :param syntax: lexer name or alias
+    :type syntax: str
+    :param options: lexer options
+    :type options: Any
+    :return: lexer instance or None if the syntax is not supported
+    :rtype: Optional[Lexer]
+    """
+    name = get_lexer_index().get_name(syntax)
+    if name is None:
+        return None
+    return _get_lexer(name, tuple(sorted(options.items())))
+
+
+def _get_name_from_shebang(line: str) -> Optional[str]:
+    """
+    Resolve a lexer by the interpreter of the shebang line
+    :param line: first line of the source code
+    :type line: str
+    :return: lexer name or None
+    :rtype: Optional[str]
+    """
+    match = SHEBANG_RE.match(line)
+    if not match:
+        return None
+    interpreter = os.path.basename(match.group(1))
+    if interpreter == "env" and match.group(2):
+        arguments = [arg for arg in match.group(2).split() if not arg.startswith("-")]
+        if not arguments:
+            return None
+        interpreter = os.path.basename(arguments[0])
+    index = get_lexer_index()
+    # python3.11 -> python
+    for candidate in (interpreter, interpreter.rstrip("0123456789.-")):
+        candidate = INTERPRETERS.get(candidate, candidate)
+        name = index.get_name(candidate)
+        if name is not None:
+            return name
+    return None
+
+
+def _get_name_from_modeline(head: str, tail: str) -> Optional[str]:
+    """
+    Resolve a lexer by a vim or emacs modeline
+    :param head: beginning of the source code
+    :type head: str
+    :param tail: end of the source code
+    :type tail: str
+    :return: lexer name or None
+    :rtype: Optional[str]
+    """
+    index = get_lexer_index()
+    for buffer in (head, tail):
+        filetype = get_filetype_from_buffer(buffer)
+        if filetype and index.get_name(filetype):
+            return index.get_name(filetype)
+    for line in head.splitlines()[:2]:
+        for modeline_re in EMACS_MODELINE_RES:
+            match = modeline_re.search(line)
+            if match and index.get_name(match.group(1)):
+                return index.get_name(match.group(1))
+    return None
+
+
+@lru_cache(maxsize=DETECTION_CACHE_SIZE)
+def _guess_lexer_name(prefix: str) -> str:
+    """
+    Guess the lexer by the content, memoised by the content prefix
+    :param prefix: beginning of the source code
+    :type prefix: str
+    :return: lexer name
+    :rtype: str
+    """
+    return guess_lexer(prefix).name
+
+
+def detect_lexer_name(content: str, filename: str = "") -> str:
+    """
+    Detect the lexer of the source code by the file name, the shebang line,
+    a modeline and only then by guessing on the beginning of the content
+    :param content: source code
+    :type content: str
+    :param filename: file name or path of the source code, if known
+    :type filename: str
+    :return: lexer name
+    :rtype: str
+    """
+    name: Optional[str] = None
+    head = content[:DETECTION_PREFIX_SIZE]
+    if filename:
+        name = get_lexer_index().get_name_for_filename(filename, head)
+    if name is None:
+        name = _get_name_from_shebang(head.split("\n", 1)[0])
+    if name is None:
+        name = _get_name_from_modeline(head, content[-DETECTION_PREFIX_SIZE:])
+    if name is None:
+        name = _guess_lexer_name(head)
+    return name
@@ -0,0 +1,471 @@
+import os
+from io import BytesIO
+from os import PathLike
+from typing import Any, BinaryIO, List, Optional, Tuple, Union
+
+from PIL import Image, ImageChops
+from pygments import lex
+from pygments.lexer import Lexer
+
+from dali_renderer.dali import CodeLength
+from dali_renderer.dali import Dali
+from dali_renderer.dali import EncoderOptionError
+from dali_renderer.dali import InputNotSpecified
+from dali_renderer.renders.animation import AnimationEncoder, AnimationFrame, Box
+from dali_renderer.renders.animation import get_animation_format_for_path, get_union
+from dali_renderer.renders.DaliImageFormatter import ImageFormatter
+from dali_renderer.renders.encoders import get_format_for_path
+
+
+class Renderer(Dali):
+    """
+    Rendering session with fixed options, which are validated once and the
+    fonts, the token styles and the lexer of the syntax are loaded when the
+    session is created. Renders don't change the session, so one session
+    renders any number of snippets. A session is not thread-safe, use one
+    session per thread.
+    :param options: `Dali` keyword arguments except `output_path`
+    :type options: Any
+
+    :raises: :class:`SyntaxNotFound`, :class:`StyleNotFound`
+    """
+
+    def __init__(self, **options: Any) -> None:
+        super().__init__(**options)
+        self._validate_options()
+        self._formatter: ImageFormatter = super()._get_formatter()
+        if self.syntax:
+            self._get_lexer("")
+
+    def render(
+        self,
+        code: str,
+        output: Union[str, PathLike, BinaryIO, None] = None,
+        filename: str = "",
+    ) -> Optional[bytes]:
+        """
+        Generation an image from a string of source code
+        :param code: string of source code
+        :type code: str
+        :param output: path to save the image or writable binary file-like object,
+            the encoded image is returned if it's not set
+        :type output: Union[str, PathLike, BinaryIO, None]
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :return: encoded image or None if the output is set
+        :rtype: Optional[bytes]
+
+        :raises: :class:`InputNotSpecified`: output path has no valid extension
+        :raises: :class:`EncoderOptionError`: output path extension doesn't match the output format
+        """
+        if output is None:
+            return self.render_bytes(code, filename)
+        if not isinstance(output, (str, PathLike)):
+            self.render_to(code, output, filename)
+            return None
+
+        path = os.fspath(output)
+        image_format = get_format_for_path(path)  # type: ignore
+        if image_format is None:
+            raise InputNotSpecified(
+                f"The given output filename `{path}` doesn't have a valid extension"
+            )
+        if image_format != self.output_format:
+            raise EncoderOptionError(
+                f"The output filename `{path}` doesn't match the `{self.output_format}` output format"
+            )
+        self._check_code_length(code)
+        self._write(code, path, filename)  # type: ignore
+        return None
+
+    def render_typing(
+        self,
+        code: str,
+        output: Union[str, PathLike, BinaryIO, None] = None,
+        filename: str = "",
+        animation_format: str = "",
+        chars_per_frame: int = 2,
+        frame_duration: int = 40,
+        hold: int = 2000,
+        loop: int = 0,
+    ) -> Optional[bytes]:
+        """
+        Generation an animation of the source code being typed. The code is
+        rendered once and every frame reveals the boxes of the next characters
+        of the rendered image, whitespace is revealed with the next character
+        :param code: string of source code
+        :type code: str
+        :param output: path to save the animation or writable binary file-like object,
+            the encoded animation is returned if it's not set
+        :type output: Union[str, PathLike, BinaryIO, None]
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :param animation_format: `gif`, `apng` or `webp`, default is chosen by the
+            extension of the output path or `gif`
+        :type animation_format: str
+        :param chars_per_frame: characters revealed by every frame
+        :type chars_per_frame: int
+        :param frame_duration: display time of every frame in milliseconds
+        :type frame_duration: int
+        :param hold: display time of the complete code in milliseconds
+        :type hold: int
+        :param loop: number of loops, `0` loops forever
+        :type loop: int
+        :return: encoded animation or None if the output is set
+        :rtype: Optional[bytes]
+        """
+        self._check_code_length(code)
+        if chars_per_frame <= 0:
+            raise CodeLength("Characters per frame must be a positive integer")
+        encoder = self._get_animation_encoder(output, animation_format, loop)
+        self._instrumentation.start()
+        formatter: ImageFormatter = self._formatter
+        lines, code_image = self._rasterize_lines(code, filename)
+        start = self._compose(
+            Image.new("RGBA", code_image.size, formatter.background_color)
+        )
+        end = self._compose(code_image)
+
+        offset = self._get_code_offset()
+        frames: List[AnimationFrame] = []
+        box: Optional[Box] = None
+        # Characters in the box and the first frame of the line, the boxes don't span lines
+        characters = line_start = 0
+        for char, cell in formatter.iter_cells(lines, code_image.size):
+            box = get_union(box, cell)
+            if char == "\n":
+                if not characters and len(frames) > line_start:
+                    # Only whitespace after the last frame of the line
+                    frames[-1] = frames[-1]._replace(
+                        box=get_union(frames[-1].box, _move(box, offset))
+                    )
+                else:
+                    frames.append(AnimationFrame(_move(box, offset), frame_duration))
+                box, characters, line_start = None, 0, len(frames)
+            elif not char.isspace():
+                characters += 1
+                if characters >= chars_per_frame and box[2] > box[0]:
+                    frames.append(AnimationFrame(_move(box, offset), frame_duration))
+                    box, characters = None, 0
+        frames[-1] = frames[-1]._replace(duration=hold)
+        return self._save_animation(encoder, output, start, end, frames, frame_duration)
+
+    def render_diff(
+        self,
+        before: str,
+        after: str,
+        output: Union[str, PathLike, BinaryIO, None] = None,
+        filename: str = "",
+        animation_format: str = "",
+        lines_per_frame: int = 1,
+        frame_duration: int = 80,
+        hold: int = 1500,
+        loop: int = 0,
+    ) -> Optional[bytes]:
+        """
+        Generation an animation from one version of the source code to another.
+        Both versions are rendered once with the same size and the frames
+        replace the changed lines from the top to the bottom
+        :param before: string of the source code shown first
+        :type before: str
+        :param after: string of the source code shown last
+        :type after: str
+        :param output: path to save the animation or writable binary file-like object,
+            the encoded animation is returned if it's not set
+        :type output: Union[str, PathLike, BinaryIO, None]
+        :param filename: optional file name of the source code used to detect the syntax
+        :type filename: str
+        :param animation_format: `gif`, `apng` or `webp`, default is chosen by the
+            extension of the output path or `gif`
+        :type animation_format: str
+        :param lines_per_frame: changed lines replaced by every frame
+        :type lines_per_frame: int
+        :param frame_duration: display time of every frame in milliseconds
+        :type frame_duration: int
+        :param hold: display time of both versions in milliseconds
+        :type hold: int
+        :param loop: number of loops, `0` loops forever
+        :type loop: int
+        :return: encoded animation or None if the output is set
+        :rtype: Optional[bytes]
+        """
+        self._check_code_length(before)
+        self._check_code_length(after)
+        if lines_per_frame <= 0:
+            raise CodeLength("Lines per frame must be a positive integer")
+        encoder = self._get_animation_encoder(output, animation_format, loop)
+        self._instrumentation.start()
+        formatter: ImageFormatter = self._formatter
+        before_lines, before_image = self._rasterize_lines(before, filename)
+        after_lines, after_image = self._rasterize_lines(after, filename)
+        size = (
+            max(before_image.width, after_image.width),
+            max(before_image.height, after_image.height),
+        )
+        images = []
+        for code_image in (before_image, after_image):
+            # The smaller image is extended with the background
+            extended = Image.new("RGBA", size, formatter.background_color)
+            extended.paste(code_image, (0, 0))
+            images.append(self._compose(extended))
+        start, end = images
+
+        offset = self._get_code_offset()
+        frames: List[AnimationFrame] = []
+        box: Optional[Box] = None
+        changed = 0
+        for top, bottom in formatter.get_line_slabs(
+            max(len(before_lines), len(after_lines)), size[1]
+        ):
+            slab = _move((0, top, size[0], bottom), offset)
+            difference = (
+                ImageChops.difference(start.crop(slab), end.crop(slab))
+                .convert("RGB")
+                .getbbox()
+            )
+            if difference is None:
+                continue
+            box = get_union(box, _move(difference, slab[:2]))
+            changed += 1
+            if changed % lines_per_frame == 0:
+                frames.append(AnimationFrame(box, frame_duration))
+                box = None
+        if box is not None:
+            frames.append(AnimationFrame(box, frame_duration))
+        if frames:
+            frames[-1] = frames[-1]._replace(duration=hold)
+        return self._save_animation(encoder, output, start, end, frames, hold)
+
+    def _get_animation_encoder(
+        self,
+        output: Union[str, PathLike, BinaryIO, None],
+        animation_format: str,
+        loop: int,
+    ) -> AnimationEncoder:
+        """
+        Create the encoder of the format by the argument or the output path
+        :param output: path or binary file-like object or None
+        :type output: Union[str, PathLike, BinaryIO, None]
+        :param animation_format: format or empty string
+        :type animation_format: str
+        :param loop: number of loops
+        :type loop: int
+        :return: animation encoder
+        :rtype: AnimationEncoder
+
+        :raises: :class:`InputNotSpecified`: output path has no valid extension
+        :raises: :class:`EncoderOptionError`: output path extension doesn't match the format
+        """
+        animation_format = animation_format.lower()
+        if isinstance(output, (str, PathLike)):
+            path = os.fspath(output)
+            path_format = get_animation_format_for_path(path)  # type: ignore
+            if path_format is None:
+                raise InputNotSpecified(
+                    f"The given output filename `{path}` doesn't have a valid extension"
+                )
+            if animation_format and animation_format != path_format:
+                raise EncoderOptionError(
+                    f"The output filename `{path}` doesn't match the `{animation_format}` animation format"
+                )
+            animation_format = path_format
+        return AnimationEncoder(animation_format or "gif", loop)
+
+    def _rasterize_lines(
+        self, content: str, filename: str = ""
+    ) -> Tuple[List[list], Image.Image]:
+        """
+        Render the highlighted code of an animation
+        :param content: source code content
+        :type content: str
+        :param filename: source code file name used to detect the syntax
+        :type filename: str
+        :return: tokens of every line and the highlighted image
+        :rtype: Tuple[List[list], Image.Image]
+        """
+        instrumentation = self._instrumentation
+        report = instrumentation.report
+        formatter: ImageFormatter = self._formatter
+        with instrumentation.stage("detect"):
+            lexer: Lexer = self._get_lexer(content, filename)
+            report.syntax = lexer.name
+        with instrumentation.stage("lex"):
+            tokens = list(lex(content, lexer))
+            report.tokens += len(tokens)
+        with instrumentation.stage("layout"):
+            size = formatter.layout(tokens)
+            report.drawables += len(formatter.drawables)
+        self._check_limits(self._get_measurement(size, content))
+        with instrumentation.stage("raster"):
+            return list(formatter.iter_lines(tokens)), formatter.rasterize(size)
+
+    def _save_animation(
+        self,
+        encoder: AnimationEncoder,
+        output: Union[str, PathLike, BinaryIO, None],
+        start: Image.Image,
+        end: Image.Image,
+        frames: List[AnimationFrame],
+        start_duration: int,
+    ) -> Optional[bytes]:
+        """
+        Encode the animation into the output
+        :param encoder: animation encoder
+        :type encoder: AnimationEncoder
+        :param output: path or binary file-like object, the encoded animation is returned if it's not set
+        :type output: Union[str, PathLike, BinaryIO, None]
+        :param start: first frame
+        :type start: Image.Image
+        :param end: image after the last frame
+        :type end: Image.Image
+        :param frames: frames after the first frame
+        :type frames: List[AnimationFrame]
+        :param start_duration: display time of the first frame in milliseconds
+        :type start_duration: int
+        :return: encoded animation or None if the output is set
+        :rtype: Optional[bytes]
+        """
+        instrumentation = self._instrumentation
+        buffer = BytesIO()
+        with instrumentation.stage("encode"):
+            encoder.save(buffer, start, end, frames, start_duration)
+        data = buffer.getvalue()
+        instrumentation.report.output_bytes = len(data)
+        if isinstance(output, (str, PathLike)):
+            with open(output, "wb") as file_output:
+                file_output.write(data)
+        elif output is not None:
+            output.write(data)
+        instrumentation.finish()
+        return data if output is None else None
+
+    def _get_formatter(self, **options: Union[str, int, None]) -> ImageFormatter:
+        """
+        Get the formatter of the session
+        :param options: additional `ImageFormatter` options, a new formatter is created if they are set
+        :type options: Union[str, int, None]
+        :return: formatter
+        :rtype: ImageFormatter
+        """
+        if options:
+            return super()._get_formatter(**options)
+        return self._formatter
+
+
+def _move(box: Box, offset: Union[int, Tuple[int, ...]]) -> Box:
+    x, y = (offset, offset) if isinstance(offset, int) else offset
+    return box[0] + x, box[1] + y, box[2] + x, box[3] + y
+
+
+class IncrementalRenderer(Renderer):
+    """
+    Rendering session for live previews of a source code being edited.
+    The lines of tokens, the frame and the image of the last render are kept,
+    the next render re-lexes the code, compares it line by line with the last
+    render and rasterises only the rows of the changed lines. It falls back to
+    a full render when the size of the image changes. The images are identical
+    to the images of `Renderer`.
+    :param options: `Dali` keyword arguments except `output_path` and `workers`
+    :type options: Any
+    """
+
+    def __init__(self, **options: Any) -> None:
+        super().__init__(**options)
+        # Tokens of every line, the frame and the image of the last render
+        self._lines: List[list] = []
+        self._size: Tuple[int, int] = (0, 0)
+        self._frame: Optional[Image.Image] = None
+        self._image: Optional[Image.Image] = None
+        # Number of rows rasterised by the last render
+        self.dirty_rows: int = 0
+
+    def reset(self) -> None:
+        """
+        Drop the last render, the next render is a full render
+        :return: None
+        """
+        self._lines = []
+        self._size = (0, 0)
+        self._frame = None
+        self._image = None
+
+    def _generate(self, content: str, filename: str = "") -> Image.Image:
+        """
+        Incremental counterpart of `Dali._generate`
+        :param content: source code content
+        :type content: str
+        :param filename: source code file name used to detect the syntax
+        :type filename: str
+        :return: generated image
+        :rtype: Image.Image
+        """
+        instrumentation = self._instrumentation
+        report = instrumentation.report
+        formatter: ImageFormatter = self._formatter
+
+        with instrumentation.stage("detect"):
+            lexer: Lexer = self._get_lexer(content, filename)
+            report.syntax = lexer.name
+        with instrumentation.stage("lex"):
+            tokens = list(lex(content, lexer))
+            report.tokens = len(tokens)
+            lines = list(formatter.iter_lines(tokens))
+        with instrumentation.stage("layout"):
+            size = formatter.measure(tokens)
+        self._check_limits(self._get_measurement(size, content))
+
+        if self._image is None or size != self._size:
+            self.reset()
+            with instrumentation.stage("layout"):
+                formatter.layout(tokens)
+                report.drawables = len(formatter.drawables)
+            with instrumentation.stage("raster"):
+                code_image = formatter.rasterize(size)
+            image = self._compose(code_image)
+            self._frame = self._get_frame(
+                size[0] + (self.padding * 2), size[1] + (self.padding * 2)
+            )
+            self._image, self._lines, self._size = image, lines, size
+            self.dirty_rows = size[1]
+            return image.copy()
+
+        bands = self._get_dirty_bands(lines, size[1])
+        offset = self._get_code_offset()
+        with instrumentation.stage("raster"):
+            for top, bottom in bands:
+                first, last = formatter.get_band_lines(top, bottom)
+                band_lines = [
+                    (lineno, lines[lineno])
+                    for lineno in range(first, min(last + 1, len(lines)))
+                ]
+                band = formatter.render_rows(band_lines, size, top, bottom)
+                report.drawables += len(formatter.drawables)
+                box = (offset, offset + top, offset + size[0], offset + bottom)
+                region = self._frame.crop(box)  # type: ignore
+                region.paste(band, (0, 0), band)
+                self._image.paste(region, box[:2])
+        self._lines = lines
+        self.dirty_rows = sum(bottom - top for top, bottom in bands)
+        report.width, report.height = self._image.size
+        return self._image.copy()
+
+    def _get_dirty_bands(self, lines: List[list], height: int) -> List[Tuple[int, int]]:
+        """
+        Get the rows of the lines changed since the last render
+        :param lines: tokens of every line
+        :type lines: List[list]
+        :param height: height of the highlighted code
+        :type height: int
+        :return: `(top, bottom)` of the changed rows, without overlaps
+        :rtype: List[Tuple[int, int]]
+        """
+        bands: List[Tuple[int, int]] = []
+        for lineno, line in enumerate(lines):
+            if lineno < len(self._lines) and line == self._lines[lineno]:
+                continue
+            top, bottom = self._formatter.get_line_rows(lineno, height)
+            if bands and top <= bands[-1][1]:
+                bands[-1] = (bands[-1][0], bottom)
+            else:
+                bands.append((top, bottom))
+        return bands
@@ -1,9 +1,12 @@
 import os
-from typing import Union
+import string
+from functools import lru_cache
+from typing import Dict, Union
 
 from PIL import ImageFont
 
 from dali_renderer.config import FONTS_PATH
+from dali_renderer.config import FONT_CACHE_SIZE
 
 STYLES = {
     "NORMAL": ["", "Regular", "Medium"],
@@ -13,13 +16,112 @@ STYLES = {
 }
 
 
+# Characters checked to verify that the font has a single advance width
+MONOSPACE_PROBE = "".join(
+    char for char in string.printable if char not in string.whitespace or char == " "
+)
+
+
 class FontNotFound(Exception):
     """When there are no usable fonts specified"""
 
 
+@lru_cache(maxsize=None)
+def _get_font_files(name: str) -> Dict[str, str]:
+    """
+    Scan the font directory once per process
+    :param name: font name
+    :type name: str
+    :return: mapping of the font style name to the font path
+    :rtype: Dict[str, str]
+
+    :raises: :class:`FontNotFound`: font not found or doesn't exist
+    """
+    font_dir_path = os.path.join(FONTS_PATH, name)
+    font_files: Dict[str, str] = {}
+    try:
+        for file in sorted(os.listdir(font_dir_path)):
+            font_path = os.path.join(font_dir_path, file)
+            font = ImageFont.truetype(font_path)
+            try:
+                font_name, font_style = font.getname()
+            except OSError:
+                raise FontNotFound(f"No usable fonts named: {name}")
+            if font_style is not None:
+                font_files.setdefault(font_style, font_path)
+    except FileNotFoundError:
+        raise FontNotFound(f"No usable fonts named: {name}")
+    return font_files
+
+
+@lru_cache(maxsize=None)
+def _get_style_path(name: str, style: str) -> Union[str, None]:
+    """
+    Resolve the font path for one of the `STYLES` keys
+    :param name: font name
+    :type name: str
+    :param style: style key - const. STYLES
+    :type style: str
+    :return: Full font path or None
+    :rtype: Union[str, None]
+    """
+    font_files = _get_font_files(name)
+    for style_name in STYLES[style]:
+        if style_name in font_files:
+            return font_files[style_name]
+    return None
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _load_font(name: str, style: str, size: int) -> Union[ImageFont.FreeTypeFont, None]:
+    """
+    Load the font object, shared between all managers of the process
+    :param name: font name
+    :type name: str
+    :param style: style key - const. STYLES
+    :type style: str
+    :param size: font size
+    :type size: int
+    :return: font object or None if the style is not available
+    :rtype: Union[ImageFont.FreeTypeFont, None]
+    """
+    path = _get_style_path(name, style)
+    if path is None:
+        return None
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def _get_advance_table(name: str, size: int) -> Dict[str, float]:
+    """
+    Per-codepoint advance widths of the normal font, shared by all managers
+    :param name: font name
+    :type name: str
+    :param size: font size
+    :type size: int
+    :return: mutable mapping of the character to its advance width
+    :rtype: Dict[str, float]
+    """
+    return {}
+
+
+def _get_advance(font: ImageFont.FreeTypeFont, char: str) -> float:
+    """
+    Get the advance width of a single character
+    :param font: font object
+    :type font: ImageFont.FreeTypeFont
+    :param char: character
+    :type char: str
+    :return: advance width in pixels
+    :rtype: float
+    """
+    return font.getlength(char)
+
+
 class DaliFontManager:
     """
     Manages a set of fonts: normal, italic, bold, etc...
+    Font files and font objects are cached process-wide.
     """
 
     def __init__(self, font_name: str, font_size: int = 14) -> None:
@@ -29,6 +131,24 @@ class DaliFontManager:
         self.font_size: int = font_size
         self.fonts: dict = {}
         self._create()
+        self._advances: Dict[str, float] = _get_advance_table(
+            self.font_name, self.font_size
+        )
+        self.monospace_width: Union[int, None] = self._get_monospace_width()
+
+    @staticmethod
+    def clear_cache() -> None:
+        """
+        Drop the process-wide font caches and the token styles that hold the fonts
+        :return: None
+        """
+        from dali_renderer.renders.token_styles import get_token_styles
+
+        get_token_styles.cache_clear()
+        _get_advance_table.cache_clear()
+        _load_font.cache_clear()
+        _get_style_path.cache_clear()
+        _get_font_files.cache_clear()
 
     def _get_font_path(self, name: str, style_name: str) -> Union[str, None]:
         """
@@ -42,46 +162,71 @@ class DaliFontManager:
 
         :raises: :class:`FontNotFound`: font not found or doesn't exist
         """
-        font_dir_path = os.path.join(FONTS_PATH, name)
-        try:
-            for file in os.listdir(font_dir_path):
-                font = ImageFont.truetype(os.path.join(font_dir_path, file))
-                try:
-                    font_name, font_style = font.getname()
-                except OSError:
-                    raise FontNotFound(f"No usable fonts named: {self.font_name}")
-                if font_style == style_name:
-                    font_path = os.path.join(font_dir_path, file)
-                    if os.path.exists(font_path):
-                        return font_path
-            return None
-        except FileNotFoundError:
-            raise FontNotFound(f"No usable fonts named: {self.font_name}")
+        return _get_font_files(name).get(style_name)
 
     def _create(self) -> None:
         """
-        Dictionary generation with font style paths
+        Dictionary generation with font style objects
 
         :return: None
         """
-        for name in STYLES["NORMAL"]:
-            path = self._get_font_path(self.font_name, name)
-            if path is not None:
-                self.fonts["NORMAL"] = ImageFont.truetype(path, self.font_size)
-                break
-        else:
+        font = _load_font(self.font_name, "NORMAL", self.font_size)
+        if font is None:
             raise FontNotFound(f"No usable fonts named: {self.font_name}")
+        self.fonts["NORMAL"] = font
         for style in ("ITALIC", "BOLD", "BOLDITALIC"):
-            for stylename in STYLES[style]:
-                path = self._get_font_path(self.font_name, stylename)
-                if path is not None:
-                    self.fonts[style] = ImageFont.truetype(path, self.font_size)
-                    break
+            font = _load_font(self.font_name, style, self.font_size)
+            if font is not None:
+                self.fonts[style] = font
+            elif style == "BOLDITALIC":
+                self.fonts[style] = self.fonts["BOLD"]
             else:
-                if style == "BOLDITALIC":
-                    self.fonts[style] = self.fonts["BOLD"]
-                else:
-                    self.fonts[style] = self.fonts["NORMAL"]
+                self.fonts[style] = self.fonts["NORMAL"]
+
+    def _get_monospace_width(self) -> Union[int, None]:
+        """
+        Verify that all printable ASCII characters share one integer advance,
+        the advances are measured once per process
+        :return: advance width or None for proportional fonts
+        :rtype: Union[int, None]
+        """
+        font = self.fonts["NORMAL"]
+        advances = self._advances
+        widths = set()
+        for char in MONOSPACE_PROBE:
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = _get_advance(font, char)
+            widths.add(advance)
+        if len(widths) != 1:
+            return None
+        width = widths.pop()
+        if width != int(width):
+            return None
+        return int(width)
+
+    def get_text_width(self, text: str) -> int:
+        """
+        Get the text advance width without running the text layout.
+        ASCII text in a monospace font is measured as the number of characters
+        multiplied by the advance width, other text is summed up from the
+        per-codepoint advance table.
+        """
+        if self.monospace_width is not None and text.isascii():
+            return len(text) * self.monospace_width
+        width = 0.0
+        for char in text:
+            width += self.get_advance(char)
+        return int(width)
+
+    def get_advance(self, char: str) -> float:
+        """
+        Get the advance width of a character from the per-codepoint advance table
+        """
+        advance = self._advances.get(char)
+        if advance is None:
+            advance = self._advances[char] = _get_advance(self.fonts["NORMAL"], char)
+        return advance
 
     def get_char_size(self) -> tuple:
         """
@@ -1,4 +1,6 @@
-from typing import Tuple, Union, Iterator
+import logging
+from collections import deque
+from typing import BinaryIO, Iterable, List, Tuple, Union, Iterator
 
 try:
     from PIL import Image, ImageDraw, ImageFont  # noqa
@@ -9,7 +11,11 @@ except ImportError:
 from pygments.formatter import Formatter
 from pygments.util import get_bool_opt, get_int_opt, get_list_opt, get_choice_opt
 
-from dali_renderer.renders.DaliFontManager import DaliFontManager
+from dali_renderer.renders.DaliFontManager import MONOSPACE_PROBE, DaliFontManager
+from dali_renderer.renders.drawables import Drawables
+from dali_renderer.renders.token_styles import TokenStyles, get_token_styles
+
+logger = logging.getLogger(__name__)
 
 
 class PilNotAvailable(ImportError):
@@ -127,6 +133,12 @@ class ImageFormatter(Formatter):
         Radius of rounded corners. 0 to disable
 
         Default: 10
+
+    `image_width`
+        The minimum width of the image in pixels, used to give a set of images
+        the same width.
+
+        Default: 0
     """
 
     # Required by the pygments mapper
@@ -149,7 +161,6 @@ class ImageFormatter(Formatter):
         Formatter.__init__(self, **options)  # type: ignore
         self.encoding: str = "latin1"  # let pygments.format() do the right thing
         # Read the style
-        self.styles: dict = dict(self.style)
         self.background_color: str
         if self.style.background_color is None:
             self.background_color = "#fff"
@@ -165,11 +176,16 @@ class ImageFormatter(Formatter):
         )
         self.image_pad: int = get_int_opt(options, "image_pad", 10)
         self.line_pad: int = get_int_opt(options, "line_pad", 2)
+        self.image_width: int = get_int_opt(options, "image_width", 0)
         # The fonts
         self.fontsize: int = get_int_opt(options, "font_size", 14)
         self.fonts: DaliFontManager = DaliFontManager(options.get("font_name", ""), self.fontsize)  # type: ignore
         # noinspection PyTupleAssignmentBalance
         self.fontw, self.fonth = self.fonts.get_char_size()
+        # Font and colours of every token type, shared by the formatters of the style and font
+        self.token_styles: TokenStyles = get_token_styles(
+            self.style, options.get("font_name", ""), self.fontsize  # type: ignore
+        )
         # Line number options
         self.line_number_fg: str = options.get("line_number_fg", "#886")  # type: ignore
         self.line_number_bg: str = options.get("line_number_bg", "#eed")  # type: ignore
@@ -200,7 +216,9 @@ class ImageFormatter(Formatter):
             except ValueError:
                 pass
         self.hl_color: str = options.get("hl_color", self.style.highlight_color) or "#f90"  # type: ignore
-        self.drawables: list = []
+        self.drawables: Drawables = Drawables()
+        # Number of token fragments before merging, `drawables` holds the draw calls
+        self.fragments: int = 0
 
     def get_style_defs(self, arg: str = "") -> None:
         raise NotImplementedError(
@@ -244,38 +262,12 @@ class ImageFormatter(Formatter):
         """
         return self.image_pad, self._get_line_y(lineno)
 
-    def _get_text_color(self, style: dict) -> str:
-        """
-        Get the correct color for the token from the style.
-        """
-        if style["color"] is not None:
-            fill = "#" + style["color"]
-        else:
-            fill = "#000"
-        return fill
-
-    def _get_text_bg_color(self, style: dict) -> str:
-        """
-        Get the correct background color for the token from the style.
-        """
-        if style["bgcolor"] is not None:
-            bg_color = "#" + style["bgcolor"]
-        else:
-            bg_color = None
-        return bg_color
-
-    def _get_style_font(self, style: dict) -> ImageFont.FreeTypeFont:
-        """
-        Get the correct font for the style.
-        """
-        return self.fonts.get_font(style["bold"], style["italic"])
-
     def _get_image_size(self, maxlinelength: int, maxlineno: int) -> Tuple[int, int]:
         """
         Get the required image size.
         """
         return (
-            self._get_char_x(maxlinelength) + self.image_pad,
+            max(self._get_char_x(maxlinelength) + self.image_pad, self.image_width),
             self._get_line_y(maxlineno + 0) + self.image_pad,
         )
 
@@ -299,23 +291,43 @@ class ImageFormatter(Formatter):
         text_fg: str,
         text_bg: Union[str, None],
     ) -> None:
-        self.drawables.append((pos, text, font, text_fg, text_bg))
+        line = self.drawables.add_line(text)
+        self.drawables.add(
+            pos[0],
+            pos[1],
+            line,
+            0,
+            len(text),
+            self.drawables.get_style_id((font, text_fg, text_bg)),
+        )
 
-    def _create_drawables(self, tokensource: Iterator) -> None:
+    def _create_drawables(self, tokensource: Iterable, lineno: int = 0) -> None:
         """
-        Create drawables for the token content.
+        Create drawables for the token content, starting at line ``lineno``.
+
+        With a monospace font, adjacent fragments of a line which share the
+        font and colours are merged into a single drawable, and whitespace
+        fragments (no ink) are merged into their neighbours. The fragments of
+        a line are concatenated into one text, drawables are ranges of it.
         """
-        lineno: int
         charno: int
         maxcharno: int
-        lineno = charno = maxcharno = 0
+        charno = maxcharno = 0
         maxlinelength: int
         linelength: int
         maxlinelength = linelength = 0
+        coalesce: bool = self.fonts.monospace_width is not None
+        drawables: Drawables = self.drawables
+        styles = drawables.styles
+        token_styles: TokenStyles = self.token_styles
+        # Fragments of the current line and their total length
+        parts: list = []
+        offset: int = 0
+        # [x, y, start, end, style id, whitespace only] of the drawable being merged
+        pending: Union[list, None] = None
+        self.fragments = 0
         for ttype, value in tokensource:
-            while ttype not in self.styles:
-                ttype = ttype.parent
-            style = self.styles[ttype]
+            style_id = drawables.get_style_id(token_styles[ttype])
             # TODO: make sure tab expansion happens earlier in the chain.  It
             # really ought to be done on the input, as to do it right here is
             # quite complex.
@@ -325,35 +337,74 @@ class ImageFormatter(Formatter):
             for i, line in enumerate(lines):
                 temp = line.rstrip("\n")
                 if temp:
-                    self._draw_text(
-                        self._get_text_pos(linelength, lineno),
-                        temp,
-                        font=self._get_style_font(style),
-                        text_fg=self._get_text_color(style),
-                        text_bg=self._get_text_bg_color(style),
-                    )
-                    # noinspection PyTupleAssignmentBalance
-                    temp_width, _ = self.fonts.get_text_size(temp)
-                    linelength += temp_width
+                    self.fragments += 1
+                    end = offset + len(temp)
+                    if pending is not None:
+                        no_bg = (
+                            styles[style_id][2] is None
+                            and styles[pending[4]][2] is None
+                        )
+                        if coalesce and (
+                            pending[4] == style_id or (no_bg and temp.isspace())
+                        ):
+                            pending[3] = end
+                            pending[5] = pending[5] and temp.isspace()
+                        elif coalesce and no_bg and pending[5]:
+                            pending[3:] = [end, style_id, temp.isspace()]
+                        else:
+                            # Without a monospace font every fragment is drawn on its own
+                            drawables.add(
+                                pending[0],
+                                pending[1],
+                                len(drawables.texts),
+                                *pending[2:5],
+                            )
+                            pending = None
+                    if pending is None:
+                        x, y = self._get_text_pos(linelength, lineno)
+                        pending = [x, y, offset, end, style_id, temp.isspace()]
+                    parts.append(temp)
+                    offset = end
+                    linelength += self.fonts.get_text_width(temp)
                     maxlinelength = max(maxlinelength, linelength)
                     charno += len(temp)
                     maxcharno = max(maxcharno, charno)
                 if line.endswith("\n"):
+                    if pending is not None:
+                        drawables.add(
+                            pending[0], pending[1], len(drawables.texts), *pending[2:5]
+                        )
+                        pending = None
+                    if parts:
+                        drawables.add_line("".join(parts))
+                        parts = []
+                        offset = 0
                     # add a line for each extra line in the value
                     linelength = 0
                     charno = 0
                     lineno += 1
+        if pending is not None:
+            drawables.add(pending[0], pending[1], len(drawables.texts), *pending[2:5])
+        if parts:
+            drawables.add_line("".join(parts))
+        logger.debug(
+            "%d token fragments merged into %d drawables",
+            self.fragments,
+            len(self.drawables),
+        )
         self.maxlinelength = maxlinelength
         self.maxcharno = maxcharno
         self.maxlineno = lineno
 
-    def _draw_line_numbers(self) -> None:
+    def _draw_line_numbers(self, start: int = 0, stop: Union[int, None] = None) -> None:
         """
-        Create drawables for the line numbers.
+        Create drawables for the line numbers of lines ``start`` to ``stop``.
         """
         if not self.line_numbers:
             return
-        for p in range(self.maxlineno):
+        if stop is None:
+            stop = self.maxlineno
+        for p in range(start, min(stop, self.maxlineno)):
             n = p + self.line_number_start
             if (n % self.line_number_step) == 0:
                 self._draw_linenumber(p, n)
@@ -373,26 +424,239 @@ class ImageFormatter(Formatter):
         draw.line([(rectw, 0), (rectw, recth)], fill=self.line_number_fg)
         del draw
 
-    def format(self, tokensource: Iterator, outfile: str) -> None:
+    def format(self, tokensource: Iterator, outfile: Union[str, BinaryIO]) -> None:
         """
         Format ``tokensource``, an iterable of ``(tokentype, tokenstring)``
         tuples and write it into ``outfile``.
+        """
+        im: Image.Image = self.render(tokensource)
+        im.save(outfile, self.image_format.upper(), quality=100)
+
+    def render(self, tokensource: Iterator) -> Image.Image:
+        """
+        Render ``tokensource`` into an in-memory image.
 
         This implementation calculates where it should draw each token on the
         pixmap, then calculates the required pixmap size and draws the items.
+        :param tokensource: iterable of ``(tokentype, tokenstring)`` tuples
+        :type tokensource: Iterator
+        :return: rendered image
+        :rtype: Image.Image
+        """
+        return self.rasterize(self.layout(tokensource))
+
+    def layout(self, tokensource: Iterable) -> Tuple[int, int]:
+        """
+        Create the drawables of ``tokensource``, the first half of `render`
+        :param tokensource: iterable of ``(tokentype, tokenstring)`` tuples
+        :type tokensource: Iterable
+        :return: size of the image
+        :rtype: Tuple[int, int]
         """
+        self.drawables = Drawables()
         self._create_drawables(tokensource)
         self._draw_line_numbers()
-        width: int
-        height: int
-        width, height = self._get_image_size(self.maxlinelength, self.maxlineno)
+        return self._get_image_size(self.maxlinelength, self.maxlineno)
 
+    def rasterize(self, size: Tuple[int, int]) -> Image.Image:
+        """
+        Draw the drawables created by `layout`, the second half of `render`
+        :param size: size of the image
+        :type size: Tuple[int, int]
+        :return: rendered image
+        :rtype: Image.Image
+        """
         im: Image.Image = Image.new(
             "RGBA",
-            (width, height),
+            size,
             self.background_color,
         )
+        self._paint(im)
+
+        return im
 
+    def measure(self, tokensource: Iterable) -> Tuple[int, int]:
+        """
+        Run the layout of ``tokensource`` without creating drawables.
+        :param tokensource: iterable of ``(tokentype, tokenstring)`` tuples
+        :type tokensource: Iterable
+        :return: size of the image
+        :rtype: Tuple[int, int]
+        """
+        lineno = linelength = maxlinelength = 0
+        for ttype, value in tokensource:
+            for line in value.expandtabs(4).splitlines(True):
+                temp = line.rstrip("\n")
+                if temp:
+                    linelength += self.fonts.get_text_width(temp)
+                    maxlinelength = max(maxlinelength, linelength)
+                if line.endswith("\n"):
+                    linelength = 0
+                    lineno += 1
+        self.maxlinelength = maxlinelength
+        self.maxlineno = lineno
+        return self._get_image_size(maxlinelength, lineno)
+
+    def iter_bands(
+        self,
+        tokensource: Iterable,
+        size: Tuple[int, int],
+        band_height: int,
+        first_row: int = 0,
+    ) -> Iterator[Image.Image]:
+        """
+        Render ``tokensource`` as horizontal bands of ``band_height`` rows,
+        only the lines of the current band are kept in memory.
+
+        The image size has to be known in advance, see `measure`. The first
+        band starts at ``first_row``, which can be negative to align the bands
+        with an enclosing image, rows outside of the image are transparent.
+        :param tokensource: iterable of ``(tokentype, tokenstring)`` tuples
+        :type tokensource: Iterable
+        :param size: size of the whole image
+        :type size: Tuple[int, int]
+        :param band_height: rows per band
+        :type band_height: int
+        :param first_row: first row of the first band
+        :type first_row: int
+        :return: `RGBA` bands
+        :rtype: Iterator[Image.Image]
+        """
+        height = size[1]
+        lines = enumerate(self.iter_lines(tokensource))
+        window: deque = deque()
+        next_lineno = 0
+        for top in range(first_row, height, band_height):
+            bottom = min(top + band_height, height)
+            first, last = self.get_band_lines(top, bottom)
+            while next_lineno <= last:
+                line = next(lines, None)
+                if line is None:
+                    break
+                window.append(line)
+                next_lineno += 1
+            while window and window[0][0] < first:
+                window.popleft()
+            yield self.render_rows(window, size, top, bottom)
+
+    def get_band_lines(self, top: int, bottom: int) -> Tuple[int, int]:
+        """
+        Get the first and the last line drawn into the rows ``top`` to ``bottom``.
+        The line above the rows is included, its descenders can reach into them.
+        """
+        line_height = self._get_line_height()
+        first = max(0, (top - self.image_pad) // line_height - 1)
+        last = (bottom - 1 - self.image_pad) // line_height
+        return first, last
+
+    def get_line_rows(self, lineno: int, height: int) -> Tuple[int, int]:
+        """
+        Get the rows a line can draw into, from the top of the line to the
+        bottom of the next line, its descenders can reach into it.
+        The first and the last line include the image padding.
+        """
+        top = self._get_line_y(lineno) if lineno else 0
+        bottom = self._get_line_y(lineno + 2)
+        if bottom > height - self.image_pad:
+            bottom = height
+        return top, bottom
+
+    def get_line_slabs(self, lines: int, height: int) -> List[Tuple[int, int]]:
+        """
+        Split the rows of the image into one slab of rows per line. The slabs
+        start at the top of the ink of their line, so the descenders of a line
+        stay in its slab, and together they cover all rows of the image.
+        """
+        ink_top = int(self.fonts.get_font(False, False).getbbox(MONOSPACE_PROBE)[1])
+        tops = [0] + [self._get_line_y(lineno) + ink_top for lineno in range(1, lines)]
+        return list(zip(tops, tops[1:] + [height]))
+
+    def iter_cells(
+        self, lines: List[list], size: Tuple[int, int]
+    ) -> Iterator[Tuple[str, Tuple[int, int, int, int]]]:
+        """
+        Split the image into the boxes of the characters of ``lines``, as
+        returned by `iter_lines`, every line ends with a line break. The boxes
+        of the first character and of the line break of a line reach the
+        edges of the image, so together the boxes cover the whole image.
+        """
+        width, height = size
+        for (top, bottom), line in zip(self.get_line_slabs(len(lines), height), lines):
+            left = linelength = 0
+            for ttype, value in line:
+                text = value.expandtabs(4).rstrip("\n")
+                # The advances are summed up, so every box costs one lookup
+                advance = 0.0
+                for char in text:
+                    advance += self.fonts.get_advance(char)
+                    right = self._get_char_x(linelength + int(advance))
+                    yield char, (left, top, right, bottom)
+                    left = right
+                linelength += self.fonts.get_text_width(text)
+            yield "\n", (left, top, width, bottom)
+
+    def render_rows(
+        self,
+        lines: Iterable[Tuple[int, list]],
+        size: Tuple[int, int],
+        top: int,
+        bottom: int,
+    ) -> Image.Image:
+        """
+        Render the rows ``top`` to ``bottom`` of the image.
+        :param lines: ``(lineno, tokens)`` of the lines from `get_band_lines`,
+            tokens as returned by `iter_lines`
+        :type lines: Iterable[Tuple[int, list]]
+        :param size: size of the whole image
+        :type size: Tuple[int, int]
+        :param top: first row, can be negative
+        :type top: int
+        :param bottom: row after the last row
+        :type bottom: int
+        :return: `RGBA` band, rows outside of the image are transparent
+        :rtype: Image.Image
+        """
+        width, height = size
+        first, last = self.get_band_lines(top, bottom)
+        self.drawables = Drawables()
+        for lineno, tokens in lines:
+            if first <= lineno <= last:
+                self._create_drawables(tokens, lineno)
+        self.maxlineno = (height - self.image_pad * 2) // self._get_line_height()
+        self._draw_line_numbers(first, last + 1)
+
+        im: Image.Image = Image.new("RGBA", (width, bottom - top), (0, 0, 0, 0))
+        im.paste(
+            self.background_color, (0, max(0, -top), width, min(bottom, height) - top)
+        )
+        self._paint(im, top)
+        return im
+
+    def iter_lines(self, tokensource: Iterable) -> Iterator[list]:
+        """
+        Split ``tokensource`` into lists of tokens for every line, the last
+        token of a line ends with a line break.
+        """
+        line: list = []
+        for ttype, value in tokensource:
+            start = 0
+            end = value.find("\n")
+            while end != -1:
+                line.append((ttype, value[start : end + 1]))
+                yield line
+                line = []
+                start = end + 1
+                end = value.find("\n", start)
+            if start < len(value):
+                line.append((ttype, value[start:]))
+        if line:
+            yield line
+
+    def _paint(self, im: Image.Image, y_offset: int = 0) -> None:
+        """
+        Paint the highlighted lines and the drawables on the image, which
+        starts at the row ``y_offset`` of the whole image.
+        """
         draw: ImageDraw.ImageDraw = ImageDraw.Draw(im)
 
         # self._paint_line_number_bg(im)
@@ -403,17 +667,25 @@ class ImageFormatter(Formatter):
             recth: int = self._get_line_height()
             rectw: int = im.size[0] - x
             for linenumber in self.hl_lines:
-                y = self._get_line_y(linenumber - 1)
+                y = self._get_line_y(linenumber - 1) - y_offset
                 draw.rectangle([(x, y), (x + rectw, y + recth)], fill=self.hl_color)  # type: ignore
-        for pos, value, font, text_fg, text_bg in self.drawables:
-            if text_bg:
-                text_size: Tuple[int, int] = draw.textsize(text=value, font=font)
-                # noinspection PyTypeChecker
-                draw.rectangle(
-                    [pos[0], pos[1], pos[0] + text_size[0], pos[1] + text_size[1]],  # type: ignore
-                    fill=text_bg,
-                )
-
-            draw.text((pos[0], pos[1]), value, font=font, fill=text_fg)
-
-        im.save(outfile, self.image_format.upper(), quality=100)
+        drawables: Drawables = self.drawables
+        texts = drawables.texts
+        styles = drawables.styles
+        for x, y, line, start, end, style_id in zip(
+            drawables.x,
+            drawables.y,
+            drawables.line,
+            drawables.start,
+            drawables.end,
+            drawables.style,
+        ):
+            font, text_fg, text_bg = styles[style_id]
+            value = texts[line][start:end]
+            y -= y_offset
+            if text_bg is not None:
+                # The right and bottom edges of the text box, `textsize` was removed in Pillow 10
+                right, bottom = font.getbbox(value)[2:]
+                draw.rectangle([x, y, x + right, y + bottom], fill=text_bg)  # type: ignore
+
+            draw.text((x, y), value, font=font, fill=text_fg)
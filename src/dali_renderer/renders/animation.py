@@ -0,0 +1,369 @@
+import logging
+import struct
+import zlib
+from io import BytesIO
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from PIL import GifImagePlugin, Image, features
+
+from dali_renderer.renders.encoders import JPEG_MATTE
+from dali_renderer.renders.encoders import EncoderNotAvailable
+from dali_renderer.renders.encoders import EncoderOptionError
+from dali_renderer.renders.png import PNG_SIGNATURE
+
+logger = logging.getLogger(__name__)
+
+ANIMATION_EXTENSIONS: Dict[str, str] = {
+    ".gif": "gif",
+    ".apng": "apng",
+    ".png": "apng",
+    ".webp": "webp",
+}
+ANIMATION_MIMETYPES: Dict[str, str] = {
+    "gif": "image/gif",
+    "apng": "image/apng",
+    "webp": "image/webp",
+}
+# Pillow features required by the animation formats
+ANIMATION_FEATURES: Dict[str, str] = {"webp": "webp"}
+# Bit depth 8, color type 3 (palette), deflate, adaptive filtering, no interlace
+PNG_PALETTE_HEADER = (8, 3, 0, 0, 0)
+# fcTL dispose op `none` and blend op `source`: a frame replaces its rectangle
+APNG_DISPOSE_NONE = 0
+APNG_BLEND_SOURCE = 0
+# GIF disposal method 1: the frame is left in place for the next frame
+GIF_DISPOSAL_NONE = 1
+# VP8X flags and the ANMF flag `do not blend`, the frames are not disposed
+WEBP_ANIMATION = 0x02
+WEBP_ALPHA = 0x10
+WEBP_NO_BLEND = 0x02
+WEBP_IMAGE_CHUNKS = (b"ALPH", b"VP8 ", b"VP8L")
+
+# `Image.Quantize.FASTOCTREE`, the enum was added in Pillow 9.1
+QUANTIZE_FAST_OCTREE = 2
+
+# (left, top, right, bottom)
+Box = Tuple[int, int, int, int]
+
+
+class AnimationFrame(NamedTuple):
+    """
+    Update of the animation canvas
+    :param box: dirty rectangle, copied from the end image of the animation
+    :param duration: display time of the frame in milliseconds
+    """
+
+    box: Box
+    duration: int
+
+
+def get_animation_format_for_path(path: str) -> Optional[str]:
+    """
+    Get the animation format by the file extension
+    :param path: output file path
+    :type path: str
+    :return: format name or None if the extension is not supported
+    :rtype: Optional[str]
+    """
+    for extension, animation_format in ANIMATION_EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return animation_format
+    return None
+
+
+def get_union(first: Optional[Box], second: Box) -> Box:
+    """
+    Get the bounding box of two boxes
+    :param first: box or None
+    :type first: Optional[Box]
+    :param second: box
+    :type second: Box
+    :return: bounding box
+    :rtype: Box
+    """
+    if first is None:
+        return second
+    return (
+        min(first[0], second[0]),
+        min(first[1], second[1]),
+        max(first[2], second[2]),
+        max(first[3], second[3]),
+    )
+
+
+def quantize(
+    start: Image.Image, end: Image.Image, matte: str = ""
+) -> Tuple[Image.Image, Image.Image]:
+    """
+    Convert the start and the end image of an animation to one shared palette,
+    so the frames are crops of the end image without quantizing every frame
+    :param start: `RGBA` start image
+    :type start: Image.Image
+    :param end: `RGBA` end image of the same size
+    :type end: Image.Image
+    :param matte: color to composite the images onto, the alpha is kept if it's not set
+    :type matte: str
+    :return: `P` images
+    :rtype: Tuple[Image.Image, Image.Image]
+    """
+    width, height = end.size
+    stacked = Image.new("RGBA", (width, height * 2))
+    stacked.paste(start, (0, 0))
+    stacked.paste(end, (0, height))
+    if matte:
+        stacked = Image.alpha_composite(
+            Image.new("RGBA", stacked.size, matte), stacked
+        ).convert("RGB")
+    palette_image = stacked.quantize(256, QUANTIZE_FAST_OCTREE)
+    return palette_image.crop((0, 0, width, height)), palette_image.crop(
+        (0, height, width, height * 2)
+    )
+
+
+class AnimationEncoder:
+    """
+    Encodes animations from a start image and the frames that copy dirty
+    rectangles of the end image onto the canvas, the cost depends on the
+    size of the rectangles and not on the number of frames.
+    WebP animations are lossless. GIF and APNG frames share one palette of
+    256 colors (see `quantize`), so their pixels differ from `render_image`
+    by up to ~30 per channel. GIF has no partial transparency, so without
+    a background the antialiased rounded corners are opaque or transparent
+    :param animation_format: `gif`, `apng` or `webp`
+    :type animation_format: str
+    :param loop: number of loops, `0` loops forever
+    :type loop: int
+
+    :raises: :class:`EncoderOptionError`: unknown format
+    :raises: :class:`EncoderNotAvailable`: the installed Pillow has no codec of the format
+    """
+
+    def __init__(self, animation_format: str, loop: int = 0) -> None:
+        if animation_format not in ANIMATION_MIMETYPES:
+            raise EncoderOptionError(
+                f"`{animation_format}` animation format is not supported"
+            )
+        feature = ANIMATION_FEATURES.get(animation_format)
+        if feature is not None and not features.check(feature):
+            raise EncoderNotAvailable(
+                f"Pillow is built without `{animation_format}` support"
+            )
+        if loop < 0:
+            raise EncoderOptionError(
+                f"Number of loops must be a positive integer, given value is {loop}"
+            )
+        self.animation_format: str = animation_format
+        self.loop: int = loop
+
+    @property
+    def mimetype(self) -> str:
+        """
+        Get the MIME type of the animation format
+        :return: MIME type
+        :rtype: str
+        """
+        return ANIMATION_MIMETYPES[self.animation_format]
+
+    def save(
+        self,
+        file_object: BinaryIO,
+        start: Image.Image,
+        end: Image.Image,
+        frames: Sequence[AnimationFrame],
+        start_duration: int,
+    ) -> None:
+        """
+        Encode the animation into a binary file-like object
+        :param file_object: writable binary file-like object
+        :type file_object: BinaryIO
+        :param start: `RGBA` first frame
+        :type start: Image.Image
+        :param end: `RGBA` image after the last frame
+        :type end: Image.Image
+        :param frames: frames after the first frame, without empty boxes
+        :type frames: Sequence[AnimationFrame]
+        :param start_duration: display time of the first frame in milliseconds
+        :type start_duration: int
+        :return: None
+        """
+        logger.debug(
+            "%d frames, %d of %d pixels changed",
+            len(frames) + 1,
+            sum(
+                (right - left) * (bottom - top)
+                for (left, top, right, bottom), _ in frames
+            ),
+            end.width * end.height * len(frames),
+        )
+        if self.animation_format == "gif":
+            self._save_gif(file_object, start, end, frames, start_duration)
+        elif self.animation_format == "apng":
+            self._save_apng(file_object, start, end, frames, start_duration)
+        else:
+            self._save_webp(file_object, start, end, frames, start_duration)
+
+    def _save_gif(
+        self,
+        file_object: BinaryIO,
+        start: Image.Image,
+        end: Image.Image,
+        frames: Sequence[AnimationFrame],
+        start_duration: int,
+    ) -> None:
+        # GIF has no partial transparency, the images are composited onto the matte
+        start, end = quantize(start, end, JPEG_MATTE)
+        header, _ = GifImagePlugin.getheader(start, info={"loop": self.loop})
+        file_object.write(b"".join(header))
+        params = {"duration": start_duration, "disposal": GIF_DISPOSAL_NONE}
+        file_object.write(b"".join(GifImagePlugin.getdata(start, (0, 0), **params)))
+        for box, duration in frames:
+            params = {"duration": duration, "disposal": GIF_DISPOSAL_NONE}
+            file_object.write(
+                b"".join(GifImagePlugin.getdata(end.crop(box), box[:2], **params))
+            )
+        file_object.write(b";")
+
+    def _save_apng(
+        self,
+        file_object: BinaryIO,
+        start: Image.Image,
+        end: Image.Image,
+        frames: Sequence[AnimationFrame],
+        start_duration: int,
+    ) -> None:
+        start, end = quantize(start, end)
+        palette = _get_rgba_palette(end)
+        alpha = bytes(palette[3::4]).rstrip(b"\xff")
+
+        file_object.write(PNG_SIGNATURE)
+        _write_chunk(
+            file_object, b"IHDR", struct.pack(">II5B", *end.size, *PNG_PALETTE_HEADER)
+        )
+        _write_chunk(
+            file_object, b"acTL", struct.pack(">II", len(frames) + 1, self.loop)
+        )
+        _write_chunk(
+            file_object,
+            b"PLTE",
+            bytes(value for i, value in enumerate(palette) if i % 4 != 3),
+        )
+        if alpha:
+            _write_chunk(file_object, b"tRNS", alpha)
+
+        sequence = 0
+        _write_chunk(
+            file_object,
+            b"fcTL",
+            _get_frame_control(sequence, (0, 0) + end.size, start_duration),
+        )
+        _write_chunk(file_object, b"IDAT", _compress_rows(start))
+        sequence += 1
+        for box, duration in frames:
+            _write_chunk(
+                file_object, b"fcTL", _get_frame_control(sequence, box, duration)
+            )
+            data = struct.pack(">I", sequence + 1) + _compress_rows(end.crop(box))
+            _write_chunk(file_object, b"fdAT", data)
+            sequence += 2
+        _write_chunk(file_object, b"IEND", b"")
+
+    def _save_webp(
+        self,
+        file_object: BinaryIO,
+        start: Image.Image,
+        end: Image.Image,
+        frames: Sequence[AnimationFrame],
+        start_duration: int,
+    ) -> None:
+        # The frames are lossless still images of the rectangles in ANMF chunks
+        width, height = end.size
+        chunks = [_get_webp_frame((0, 0) + end.size, start, start_duration)]
+        for (left, top, right, bottom), duration in frames:
+            # The offsets of a WebP frame are even
+            box = (left - left % 2, top - top % 2, right, bottom)
+            chunks.append(_get_webp_frame(box, end.crop(box), duration))
+        data = b"".join(
+            [
+                b"WEBP",
+                _get_riff_chunk(
+                    b"VP8X",
+                    bytes([WEBP_ANIMATION | WEBP_ALPHA, 0, 0, 0])
+                    + _pack_uint24(width - 1, height - 1),
+                ),
+                _get_riff_chunk(b"ANIM", struct.pack("<IH", 0, self.loop)),
+            ]
+            + chunks
+        )
+        file_object.write(b"RIFF" + struct.pack("<I", len(data)) + data)
+
+
+def _get_rgba_palette(image: Image.Image) -> List[int]:
+    try:
+        return image.getpalette("RGBA") or []
+    except TypeError:
+        # Pillow < 9.1 returns only the RGB palette, the alpha is kept by the core image
+        return list(image.im.getpalette("RGBA", "RGBA"))
+
+
+def _write_chunk(file_object: BinaryIO, chunk_type: bytes, data: bytes) -> None:
+    file_object.write(struct.pack(">I", len(data)))
+    file_object.write(chunk_type)
+    file_object.write(data)
+    file_object.write(struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+
+def _get_frame_control(sequence: int, box: Box, duration: int) -> bytes:
+    left, top, right, bottom = box
+    return struct.pack(
+        ">IIIIIHHBB",
+        sequence,
+        right - left,
+        bottom - top,
+        left,
+        top,
+        duration,
+        1000,
+        APNG_DISPOSE_NONE,
+        APNG_BLEND_SOURCE,
+    )
+
+
+def _compress_rows(image: Image.Image) -> bytes:
+    data = image.tobytes()
+    width = image.width
+    # Every row starts with the filter type, 0 is `None`
+    rows = b"".join(
+        b"\x00" + data[offset : offset + width] for offset in range(0, len(data), width)
+    )
+    return zlib.compress(rows, 9)
+
+
+def _pack_uint24(*values: int) -> bytes:
+    return b"".join(struct.pack("<I", value)[:3] for value in values)
+
+
+def _get_riff_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    # Chunks of an odd size are padded
+    return chunk_type + struct.pack("<I", len(data)) + data + b"\x00" * (len(data) % 2)
+
+
+def _get_webp_frame(box: Box, image: Image.Image, duration: int) -> bytes:
+    buffer = BytesIO()
+    image.save(buffer, "WEBP", lossless=True)
+    data = buffer.getvalue()
+    # The image chunks of the still WebP after the RIFF header
+    offset = 12
+    image_chunks = []
+    while offset < len(data):
+        size = struct.unpack("<I", data[offset + 4 : offset + 8])[0]
+        chunk_end = offset + 8 + size + size % 2
+        if data[offset : offset + 4] in WEBP_IMAGE_CHUNKS:
+            image_chunks.append(data[offset:chunk_end])
+        offset = chunk_end
+    left, top, right, bottom = box
+    header = _pack_uint24(
+        left // 2, top // 2, right - left - 1, bottom - top - 1, duration
+    )
+    return _get_riff_chunk(
+        b"ANMF", header + bytes([WEBP_NO_BLEND]) + b"".join(image_chunks)
+    )
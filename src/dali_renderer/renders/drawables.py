@@ -0,0 +1,90 @@
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+# (font, text fg, text bg or None) of a drawable, the colours are strings or RGBA tuples
+Style = Tuple[Any, Any, Optional[Any]]
+
+
+class Drawables:
+    """
+    Struct-of-arrays storage of the draw calls. The text of every line is
+    kept in one string, a drawable is its position, the line, the start and
+    end offsets in the line text and the index of its style in a table of
+    interned styles, so no objects are created per drawable
+    """
+
+    def __init__(self) -> None:
+        self.x: array = array("i")
+        self.y: array = array("i")
+        self.line: array = array("i")
+        self.start: array = array("i")
+        self.end: array = array("i")
+        self.style: array = array("i")
+        # Text of every line
+        self.texts: List[str] = []
+        self.styles: List[Style] = []
+        self._style_ids: Dict[Style, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def get_style_id(self, style: Style) -> int:
+        """
+        Intern a style
+        :param style: font, text color and text background color or None
+        :type style: Style
+        :return: index of the style in `styles`
+        :rtype: int
+        """
+        style_id = self._style_ids.get(style)
+        if style_id is None:
+            style_id = self._style_ids[style] = len(self.styles)
+            self.styles.append(style)
+        return style_id
+
+    def add_line(self, text: str) -> int:
+        """
+        Add the text of a line
+        :param text: text of all drawables of the line
+        :type text: str
+        :return: index of the line in `texts`
+        :rtype: int
+        """
+        self.texts.append(text)
+        return len(self.texts) - 1
+
+    def add(
+        self, x: int, y: int, line: int, start: int, end: int, style_id: int
+    ) -> None:
+        """
+        Add a drawable
+        :param x: x position
+        :type x: int
+        :param y: y position
+        :type y: int
+        :param line: index of the line text
+        :type line: int
+        :param start: start offset in the line text
+        :type start: int
+        :param end: end offset in the line text
+        :type end: int
+        :param style_id: index of the style
+        :type style_id: int
+        :return: None
+        """
+        self.x.append(x)
+        self.y.append(y)
+        self.line.append(line)
+        self.start.append(start)
+        self.end.append(end)
+        self.style.append(style_id)
+
+    def get_text(self, index: int) -> str:
+        """
+        Get the text of a drawable
+        :param index: index of the drawable
+        :type index: int
+        :return: text
+        :rtype: str
+        """
+        return self.texts[self.line[index]][self.start[index] : self.end[index]]
@@ -0,0 +1,164 @@
+import logging
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, Optional, Union
+
+from PIL import Image, ImageColor, features
+
+logger = logging.getLogger(__name__)
+
+# Output format by the file extension
+FORMAT_EXTENSIONS = {
+    ".png": "png",
+    ".webp": "webp",
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".avif": "avif",
+}
+FORMAT_MIMETYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "avif": "image/avif",
+}
+# Pillow codec required by the output format
+FORMAT_FEATURES = {
+    "webp": "webp",
+    "jpeg": "jpg",
+    "avif": "avif",
+}
+# Pillow does not expose the PNG row filters, the profiles choose the zlib
+# level and strategy instead: `Z_RLE` suits the large flat areas of a render
+PNG_PROFILES: Dict[str, Dict[str, Any]] = {
+    "fast": {"compress_level": 1, "compress_type": zlib.Z_RLE},
+    "balanced": {"compress_level": 6, "compress_type": zlib.Z_DEFAULT_STRATEGY},
+    "smallest": {
+        "compress_level": 9,
+        "compress_type": zlib.Z_DEFAULT_STRATEGY,
+        "optimize": True,
+    },
+}
+DEFAULT_QUALITY = {
+    "jpeg": 90,
+    "avif": 80,
+}
+# JPEG has no alpha channel, transparent corners are flattened onto this color
+JPEG_MATTE = "#ffffff"
+
+
+class EncoderNotAvailable(Exception):
+    pass
+
+
+class EncoderOptionError(Exception):
+    pass
+
+
+def get_format_for_path(path: str) -> Optional[str]:
+    """
+    Get the output format by the file extension
+    :param path: output file path
+    :type path: str
+    :return: format name or None if the extension is not supported
+    :rtype: Optional[str]
+    """
+    for extension, image_format in FORMAT_EXTENSIONS.items():
+        if path.lower().endswith(extension):
+            return image_format
+    return None
+
+
+def is_format_available(image_format: str) -> bool:
+    """
+    Check if the installed Pillow is built with the codec of the format
+    :param image_format: format name
+    :type image_format: str
+    :return: check result
+    :rtype: bool
+    """
+    feature = FORMAT_FEATURES.get(image_format)
+    return feature is None or bool(features.check(feature))
+
+
+class ImageEncoder:
+    """
+    Encodes rendered images into one of the output formats
+    :param image_format: `png`, `webp`, `jpeg` or `avif`
+    :type image_format: str
+    :param png_profile: PNG speed/size profile `fast`, `balanced` or `smallest`
+    :type png_profile: str
+    :param quality: lossy quality from 1 to 100, for WebP ``None`` means lossless
+    :type quality: Optional[int]
+    """
+
+    def __init__(
+        self,
+        image_format: str = "png",
+        png_profile: str = "fast",
+        quality: Optional[int] = None,
+    ) -> None:
+        if image_format not in FORMAT_EXTENSIONS.values():
+            raise EncoderOptionError(f"`{image_format}` output format is not supported")
+        if not is_format_available(image_format):
+            raise EncoderNotAvailable(
+                f"`{image_format}` output format is not supported by the installed Pillow"
+            )
+        if png_profile not in PNG_PROFILES:
+            raise EncoderOptionError(f"`{png_profile}` PNG profile is not supported")
+        if quality is not None and not 1 <= quality <= 100:
+            raise EncoderOptionError(
+                f"Quality must be from 1 to 100. Given value is {quality}"
+            )
+
+        self.image_format: str = image_format
+        self.png_profile: str = png_profile
+        self.quality: Optional[int] = quality
+        # Duration of the last `save` call in seconds
+        self.encode_time: float = 0.0
+
+    @property
+    def compress_level(self) -> int:
+        """
+        Get the zlib level of the PNG profile, used by the streaming encoder
+        :return: compression level
+        :rtype: int
+        """
+        return PNG_PROFILES[self.png_profile]["compress_level"]
+
+    def get_save_options(self) -> Dict[str, Any]:
+        """
+        Get the `Image.save` keyword arguments of the format
+        :return: save options
+        :rtype: Dict[str, Any]
+        """
+        if self.image_format == "png":
+            return dict(PNG_PROFILES[self.png_profile])
+        if self.image_format == "webp":
+            if self.quality is None:
+                return {"lossless": True, "quality": 100, "method": 4}
+            return {"quality": self.quality, "method": 4}
+        return {"quality": self.quality or DEFAULT_QUALITY[self.image_format]}
+
+    def save(self, image: Image.Image, output: Union[str, BinaryIO]) -> None:
+        """
+        Encode the image into a path or a binary file-like object
+        :param image: `RGBA` image
+        :type image: Image.Image
+        :param output: path or binary file-like object
+        :type output: Union[str, BinaryIO]
+        :return: None
+        """
+        start = time.perf_counter()
+        if self.image_format == "jpeg":
+            flattened = Image.new("RGB", image.size, ImageColor.getrgb(JPEG_MATTE))
+            flattened.paste(image, (0, 0), image)
+            image = flattened
+        image.save(output, format=self.image_format.upper(), **self.get_save_options())
+        self.encode_time = time.perf_counter() - start
+        logger.debug(
+            "%dx%d image encoded as %s in %.1f ms",
+            image.width,
+            image.height,
+            self.image_format,
+            self.encode_time * 1000,
+        )
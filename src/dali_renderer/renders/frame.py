@@ -0,0 +1,260 @@
+import re
+from functools import lru_cache
+from typing import Iterator, Tuple
+
+from PIL import Image, ImageColor, ImageDraw
+
+# Supersampling factor of the anti-aliased masks
+MASK_SCALE = 4
+BACKGROUND_PADDING = 200
+CONTROL_RADIUS = 10
+# (cx, cy, fill) of the close, hide and maximize window controls
+WINDOW_CONTROLS = (
+    (35, 32, "#ff5d57"),
+    (70, 32, "#ffbc30"),
+    (105, 32, "#27c93f"),
+)
+CONTROLS_BOTTOM = max(cy for _, cy, _ in WINDOW_CONTROLS) + CONTROL_RADIUS
+
+# The enums were added in Pillow 9.1 and replace the module constants removed in Pillow 10
+try:
+    Resampling = Image.Resampling
+    Transpose = Image.Transpose
+except AttributeError:  # Pillow < 9.1
+    Resampling = Transpose = Image  # type: ignore
+
+
+class SizeError(Exception):
+    pass
+
+
+class UnknownColor(Exception):
+    pass
+
+
+def validate_color(color: str) -> bool:
+    """
+    Validate color hex string
+    :param color: color in hex format
+    :type color: str
+    :return: check result
+    :rtype: bool
+
+    :raises: :class:`UnknownColor`: color is not a valid hex string
+    """
+    if not color or not re.match(r"^#(?:[0-9a-fA-F]{3}){1,2}$", color):
+        raise UnknownColor(f"Please, set a valid color in hex format (Value: {color})")
+
+    return True
+
+
+@lru_cache(maxsize=32)
+def _get_corner_mask(radius: int) -> Image.Image:
+    """
+    Anti-aliased mask of the top left rounded corner
+    :param radius: radius in pixels
+    :type radius: int
+    :return: `L` mode mask with the size of the radius
+    :rtype: Image.Image
+    """
+    size = radius * MASK_SCALE
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size * 2 - 1, size * 2 - 1), fill=255)
+    return mask.resize((radius, radius), Resampling.BOX)
+
+
+@lru_cache(maxsize=8)
+def _get_circle_mask(radius: int) -> Image.Image:
+    """
+    Anti-aliased mask of a circle
+    :param radius: radius in pixels
+    :type radius: int
+    :return: `L` mode mask with the size of the diameter
+    :rtype: Image.Image
+    """
+    size = radius * 2 * MASK_SCALE
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size - 1, size - 1), fill=255)
+    return mask.resize((radius * 2, radius * 2), Resampling.BOX)
+
+
+class FrameCompositor:
+    """
+    Draws the image frame (rounded rectangle, additional background and window
+    controls) directly with Pillow primitives
+    :param background: Frame color in hex format
+    :type background: str
+    :param border_radius: Border radius in pixels, 0 to disable
+    :type border_radius: int
+    :param window_controls: Set to draw window controls
+    :type window_controls: bool
+    :param additional_background: Color of the additional background around of the frame
+    :type additional_background: str
+    """
+
+    def __init__(
+        self,
+        background: str,
+        border_radius: int = 0,
+        window_controls: bool = False,
+        additional_background: str = "",
+    ) -> None:
+        validate_color(background)
+        if additional_background:
+            validate_color(additional_background)
+        if border_radius < 0:
+            raise SizeError(f"{border_radius} must be a positive integer or zero")
+
+        self.background: str = background
+        self.border_radius: int = border_radius
+        self.window_controls: bool = window_controls
+        self.additional_background: str = additional_background
+
+    @property
+    def background_padding(self) -> int:
+        """
+        Get the additional background padding
+        :return: padding in pixels or zero without additional background
+        :rtype: int
+        """
+        return BACKGROUND_PADDING if self.additional_background else 0
+
+    def get_size(self, width: int, height: int) -> Tuple[int, int]:
+        """
+        Get the size of the rendered frame
+        :param width: width of the main rectangle
+        :type width: int
+        :param height: height of the main rectangle
+        :type height: int
+        :return: width and height of the frame image
+        :rtype: Tuple[int, int]
+        """
+        return width + self.background_padding, height + self.background_padding
+
+    def render(self, width: int, height: int) -> Image.Image:
+        """
+        Render the frame
+        :param width: width of the main rectangle
+        :type width: int
+        :param height: height of the main rectangle
+        :type height: int
+        :return: `RGBA` frame image
+        :rtype: Image.Image
+        """
+        if width <= 0 or height <= 0:
+            raise SizeError(
+                f"{width}x{height} must be a positive integers and greater than zero"
+            )
+
+        offset = self.background_padding // 2
+        mask = self._get_rect_mask(width, height)
+        if self.additional_background:
+            frame = Image.new(
+                "RGBA", self.get_size(width, height), self.additional_background
+            )
+            frame.paste(
+                ImageColor.getrgb(self.background),
+                (offset, offset, offset + width, offset + height),
+                mask,
+            )
+        else:
+            frame = Image.new("RGBA", (width, height), self.background)
+            frame.putalpha(mask)
+
+        if self.window_controls:
+            circle = _get_circle_mask(CONTROL_RADIUS)
+            for cx, cy, fill in WINDOW_CONTROLS:
+                x = offset + cx - CONTROL_RADIUS
+                y = offset + cy - CONTROL_RADIUS
+                frame.paste(
+                    ImageColor.getrgb(fill),
+                    (x, y, x + circle.width, y + circle.height),
+                    circle,
+                )
+
+        return frame
+
+    def iter_bands(
+        self, width: int, height: int, band_height: int
+    ) -> Iterator[Image.Image]:
+        """
+        Render the frame as horizontal bands of ``band_height`` rows.
+
+        Only the top and bottom rows of the frame differ, so a frame with the
+        same width and a short height is rendered once and the middle rows
+        are repeated.
+        :param width: width of the main rectangle
+        :type width: int
+        :param height: height of the main rectangle
+        :type height: int
+        :param band_height: rows per band
+        :type band_height: int
+        :return: `RGBA` bands
+        :rtype: Iterator[Image.Image]
+        """
+        offset = self.background_padding // 2
+        total_width, total_height = self.get_size(width, height)
+        head = offset + max(self.border_radius, CONTROLS_BOTTOM) + 1
+        tail = offset + self.border_radius + 1
+        if head + tail + 1 >= total_height:
+            frame = self.render(width, height)
+            for top in range(0, total_height, band_height):
+                yield frame.crop(
+                    (0, top, total_width, min(top + band_height, total_height))
+                )
+            return
+
+        frame = self.render(width, head + tail + 1 - offset * 2)
+        middle = frame.crop((0, head, total_width, head + 1))
+        body_bottom = total_height - tail
+        for top in range(0, total_height, band_height):
+            bottom = min(top + band_height, total_height)
+            band = Image.new("RGBA", (total_width, bottom - top))
+            if top < head:
+                band.paste(frame.crop((0, top, total_width, min(bottom, head))), (0, 0))
+            body_top, body_end = max(top, head), min(bottom, body_bottom)
+            if body_top < body_end:
+                band.paste(
+                    middle.resize(
+                        (total_width, body_end - body_top), Resampling.NEAREST
+                    ),
+                    (0, body_top - top),
+                )
+            if bottom > body_bottom:
+                tail_top = max(top, body_bottom)
+                band.paste(
+                    frame.crop(
+                        (
+                            0,
+                            tail_top - body_bottom + head + 1,
+                            total_width,
+                            bottom - body_bottom + head + 1,
+                        )
+                    ),
+                    (0, tail_top - top),
+                )
+            yield band
+
+    def _get_rect_mask(self, width: int, height: int) -> Image.Image:
+        """
+        Build the mask of the main rectangle with rounded corners
+        :param width: width in pixels
+        :type width: int
+        :param height: height in pixels
+        :type height: int
+        :return: `L` mode mask
+        :rtype: Image.Image
+        """
+        mask = Image.new("L", (width, height), 255)
+        radius = min(self.border_radius, width // 2, height // 2)
+        if not radius:
+            return mask
+
+        corner = _get_corner_mask(radius)
+        mask.paste(corner, (0, 0))
+        mask.paste(corner.transpose(Transpose.FLIP_LEFT_RIGHT), (width - radius, 0))
+        mask.paste(corner.transpose(Transpose.FLIP_TOP_BOTTOM), (0, height - radius))
+        mask.paste(
+            corner.transpose(Transpose.ROTATE_180), (width - radius, height - radius)
+        )
+        return mask
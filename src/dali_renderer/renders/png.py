@@ -0,0 +1,99 @@
+import struct
+import zlib
+from typing import BinaryIO
+
+from PIL import Image
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Bit depth 8, color type 6 (RGBA), deflate, adaptive filtering, no interlace
+PNG_RGBA_HEADER = (8, 6, 0, 0, 0)
+
+
+class PNGStreamError(Exception):
+    pass
+
+
+class PNGStreamWriter:
+    """
+    Incremental PNG encoder, the image is written as a sequence of `RGBA` row
+    bands and only the current band is kept in memory
+    :param file_object: writable binary file-like object
+    :type file_object: BinaryIO
+    :param width: image width in pixels
+    :type width: int
+    :param height: image height in pixels
+    :type height: int
+    :param compress_level: zlib compression level from 0 to 9
+    :type compress_level: int
+    """
+
+    def __init__(
+        self, file_object: BinaryIO, width: int, height: int, compress_level: int = 6
+    ) -> None:
+        if width <= 0 or height <= 0:
+            raise PNGStreamError(
+                f"{width}x{height} must be a positive integers and greater than zero"
+            )
+
+        self.file_object: BinaryIO = file_object
+        self.width: int = width
+        self.height: int = height
+        self.rows: int = 0
+        # Size of the written PNG data in bytes
+        self.bytes_written: int = 0
+        self._compressor = zlib.compressobj(compress_level)
+
+        self.file_object.write(PNG_SIGNATURE)
+        self.bytes_written += len(PNG_SIGNATURE)
+        self._write_chunk(
+            b"IHDR", struct.pack(">II5B", width, height, *PNG_RGBA_HEADER)
+        )
+
+    def write(self, band: Image.Image) -> None:
+        """
+        Append the rows of the band to the image
+        :param band: `RGBA` band with the width of the image
+        :type band: Image.Image
+        :return: None
+        """
+        if band.mode != "RGBA" or band.width != self.width:
+            raise PNGStreamError(
+                f"The band must be an RGBA image {self.width} pixels wide"
+            )
+        if self.rows + band.height > self.height:
+            raise PNGStreamError(f"The image is only {self.height} rows high")
+
+        stride = self.width * 4
+        data = band.tobytes()
+        # Every row starts with the filter type, 0 is `None`
+        rows = b"".join(
+            b"\x00" + data[offset : offset + stride]
+            for offset in range(0, len(data), stride)
+        )
+        self._write_data(self._compressor.compress(rows))
+        self.rows += band.height
+
+    def close(self) -> None:
+        """
+        Write the rest of the compressed data and the end of the image
+        :return: None
+        """
+        if self.rows != self.height:
+            raise PNGStreamError(f"{self.rows} of {self.height} rows were written")
+
+        self._write_data(self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_data(self, data: bytes) -> None:
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        # Length, type and CRC take 12 bytes
+        self.bytes_written += len(data) + 12
+        self.file_object.write(struct.pack(">I", len(data)))
+        self.file_object.write(chunk_type)
+        self.file_object.write(data)
+        self.file_object.write(
+            struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+        )
@@ -1,17 +1,23 @@
-import re
 from os import PathLike
 from typing import Union
 
 from bs4 import BeautifulSoup
 from bs4.element import Tag, NavigableString
 
+try:
+    from cairosvg import svg2png
 
-class SizeError(Exception):
-    pass
+    cairosvg_available = True
+except (ImportError, OSError):  # OSError: the cairo library is not installed
+    cairosvg_available = False
 
+from dali_renderer.renders.frame import SizeError  # noqa: F401
+from dali_renderer.renders.frame import UnknownColor  # noqa: F401
+from dali_renderer.renders.frame import validate_color
 
-class UnknownColor(Exception):
-    pass
+
+class CairoSVGNotAvailable(ImportError):
+    """When CairoSVG or the cairo library is not available"""
 
 
 class SVGUtils:
@@ -158,9 +164,11 @@ class SVGUtils:
         close_control = self._soup.new_tag(
             "circle",
             attrs={
-                "cx": (35 + (self._background_padding // 2))
-                if self._additional_background
-                else 35,
+                "cx": (
+                    (35 + (self._background_padding // 2))
+                    if self._additional_background
+                    else 35
+                ),
                 "cy": (
                     32 + (self._background_padding // 2)
                     if self._additional_background
@@ -173,9 +181,11 @@ class SVGUtils:
         hide_control = self._soup.new_tag(
             "circle",
             attrs={
-                "cx": (70 + (self._background_padding // 2))
-                if self._additional_background
-                else 70,
+                "cx": (
+                    (70 + (self._background_padding // 2))
+                    if self._additional_background
+                    else 70
+                ),
                 "cy": (
                     32 + (self._background_padding // 2)
                     if self._additional_background
@@ -188,9 +198,11 @@ class SVGUtils:
         maximize_control = self._soup.new_tag(
             "circle",
             attrs={
-                "cx": (105 + (self._background_padding // 2))
-                if self._additional_background
-                else 105,
+                "cx": (
+                    (105 + (self._background_padding // 2))
+                    if self._additional_background
+                    else 105
+                ),
                 "cy": (
                     32 + (self._background_padding // 2)
                     if self._additional_background
@@ -217,6 +229,22 @@ class SVGUtils:
         with open(path, "w") as file:
             file.write(self.get_content)
 
+    def to_png(self) -> bytes:
+        """
+        Rasterise the edited file
+        :return: PNG image
+        :rtype: bytes
+        """
+        if not cairosvg_available:
+            raise CairoSVGNotAvailable(
+                "CairoSVG and the cairo library are required for the svg frame backend"
+            )
+        return svg2png(
+            bytestring=self.get_content.encode("utf-8"),
+            parent_width=self.width,
+            parent_height=self.height,
+        )
+
     def _set_background_color(self) -> None:
         self._rect.attrs["style"] = f"fill: {self.background}"  # type: ignore
 
@@ -226,9 +254,4 @@ class SVGUtils:
         :param color:
         :return:
         """
-        if not re.match(r"^#(?:[0-9a-fA-F]{3}){1,2}$", color):
-            raise UnknownColor(
-                f"Please, set a valid color in hex format (Value: {color})"
-            )
-
-        return True
+        return validate_color(color)
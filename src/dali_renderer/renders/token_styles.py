@@ -0,0 +1,69 @@
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple, Type
+
+from PIL import ImageColor
+from pygments.style import Style
+from pygments.token import _TokenType
+
+from dali_renderer.config import TOKEN_STYLES_CACHE_SIZE
+from dali_renderer.renders.DaliFontManager import DaliFontManager
+
+RGBA = Tuple[int, int, int, int]
+# (font, text fg, text bg or None) of a token type
+TokenStyle = Tuple[Any, RGBA, Optional[RGBA]]
+DEFAULT_TEXT_COLOR = "#000"
+
+
+def _to_rgba(color: str) -> RGBA:
+    return ImageColor.getcolor(color, "RGBA")  # type: ignore
+
+
+class TokenStyles(Dict[_TokenType, TokenStyle]):
+    """
+    Resolved render style of every token type of a Pygments style. Token types
+    without an own style inherit the style of the parent, they are resolved
+    on the first lookup
+    :param style: Pygments style class
+    :type style: Type[Style]
+    :param fonts: font manager
+    :type fonts: DaliFontManager
+    """
+
+    def __init__(self, style: Type[Style], fonts: DaliFontManager) -> None:
+        super().__init__()
+        self._styles: Dict[_TokenType, dict] = dict(style)  # type: ignore
+        for ttype, token_style in self._styles.items():
+            color = (
+                "#" + token_style["color"]
+                if token_style["color"]
+                else DEFAULT_TEXT_COLOR
+            )
+            bg_color = "#" + token_style["bgcolor"] if token_style["bgcolor"] else None
+            self[ttype] = (
+                fonts.get_font(token_style["bold"], token_style["italic"]),
+                _to_rgba(color),
+                _to_rgba(bg_color) if bg_color else None,
+            )
+
+    def __missing__(self, ttype: _TokenType) -> TokenStyle:
+        parent = ttype
+        while parent not in self._styles:
+            parent = parent.parent
+        token_style = self[ttype] = self[parent]
+        return token_style
+
+
+@lru_cache(maxsize=TOKEN_STYLES_CACHE_SIZE)
+def get_token_styles(style: Type[Style], font_name: str, font_size: int) -> TokenStyles:
+    """
+    Get the process-wide token styles of a Pygments style and a font
+    :param style: Pygments style class
+    :type style: Type[Style]
+    :param font_name: font name
+    :type font_name: str
+    :param font_size: font size in pixels
+    :type font_size: int
+    :return: token styles
+    :rtype: TokenStyles
+    """
+    return TokenStyles(style, DaliFontManager(font_name, font_size))
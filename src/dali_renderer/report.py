@@ -0,0 +1,143 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Sequence
+
+
+class RenderReport:
+    """
+    Wall time of every stage and the sizes of a render. The stages are
+    `detect` (lexer lookup or guessing), `lex`, `layout` (drawables), `raster`
+    (text drawing), `frame` (wrapper rasterisation), `paste`, `encode`, `cache`
+    (render cache lookup) and `stream` (band rendering of a streamed image)
+    """
+
+    def __init__(self) -> None:
+        # Seconds by the stage name in the order of the stages
+        self.stages: Dict[str, float] = {}
+        self.syntax: str = ""
+        self.tokens: int = 0
+        self.drawables: int = 0
+        self.width: int = 0
+        self.height: int = 0
+        self.output_bytes: int = 0
+        self.cache_hit: bool = False
+
+    @property
+    def total(self) -> float:
+        """
+        Get the wall time of all stages
+        :return: seconds
+        :rtype: float
+        """
+        return sum(self.stages.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the report as a JSON serializable dictionary
+        :return: report
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "stages": dict(self.stages),
+            "total": self.total,
+            "syntax": self.syntax,
+            "tokens": self.tokens,
+            "drawables": self.drawables,
+            "width": self.width,
+            "height": self.height,
+            "output_bytes": self.output_bytes,
+            "cache_hit": self.cache_hit,
+        }
+
+    def __repr__(self) -> str:
+        stages = ", ".join(
+            f"{name}={duration * 1000:.1f}ms" for name, duration in self.stages.items()
+        )
+        return f"RenderReport({self.width}x{self.height}, {self.output_bytes} bytes, {stages})"
+
+
+class RenderHook:
+    """
+    Base class of the render instrumentation callbacks, override the methods
+    to forward the stages to a tracing system
+    """
+
+    def on_stage_start(self, stage: str, report: RenderReport) -> None:
+        """
+        Called before a stage
+        :param stage: stage name
+        :type stage: str
+        :param report: report of the current render
+        :type report: RenderReport
+        :return: None
+        """
+
+    def on_stage_end(self, stage: str, duration: float, report: RenderReport) -> None:
+        """
+        Called after a stage, also if the stage raised an exception
+        :param stage: stage name
+        :type stage: str
+        :param duration: wall time of the stage in seconds
+        :type duration: float
+        :param report: report of the current render
+        :type report: RenderReport
+        :return: None
+        """
+
+    def on_report(self, report: RenderReport) -> None:
+        """
+        Called after a successful render
+        :param report: complete report
+        :type report: RenderReport
+        :return: None
+        """
+
+
+class Instrumentation:
+    """
+    Times the stages of a render into a report and calls the hooks
+    :param hooks: render hooks
+    :type hooks: Sequence[RenderHook]
+    """
+
+    def __init__(self, hooks: Sequence[RenderHook] = ()) -> None:
+        self.hooks: Sequence[RenderHook] = hooks
+        self.report: RenderReport = RenderReport()
+
+    def start(self) -> RenderReport:
+        """
+        Start the report of a new render
+        :return: new report
+        :rtype: RenderReport
+        """
+        self.report = RenderReport()
+        return self.report
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[RenderReport]:
+        """
+        Time a stage, repeated stages are summed up
+        :param name: stage name
+        :type name: str
+        :return: report of the current render
+        :rtype: Iterator[RenderReport]
+        """
+        report = self.report
+        for hook in self.hooks:
+            hook.on_stage_start(name, report)
+        start = time.perf_counter()
+        try:
+            yield report
+        finally:
+            duration = time.perf_counter() - start
+            report.stages[name] = report.stages.get(name, 0.0) + duration
+            for hook in self.hooks:
+                hook.on_stage_end(name, duration, report)
+
+    def finish(self) -> None:
+        """
+        Pass the complete report to the hooks
+        :return: None
+        """
+        for hook in self.hooks:
+            hook.on_report(self.report)
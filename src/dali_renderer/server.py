@@ -0,0 +1,356 @@
+import json
+import logging
+import os
+import socketserver
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+from dali_renderer.__about__ import __version__
+from dali_renderer.aio import _render_bytes
+from dali_renderer.batch import _warm_up
+from dali_renderer.config import DEFAULT_FONT
+from dali_renderer.config import SERVER_HOST
+from dali_renderer.config import SERVER_MAX_LINES
+from dali_renderer.config import SERVER_MAX_PIXELS
+from dali_renderer.config import SERVER_MAX_REQUEST_SIZE
+from dali_renderer.config import SERVER_PORT
+from dali_renderer.config import SERVER_QUEUE_SIZE
+from dali_renderer.renders.encoders import FORMAT_MIMETYPES
+
+logger = logging.getLogger(__name__)
+
+# `Dali` options accepted in a render request
+REQUEST_OPTIONS = (
+    "syntax",
+    "style",
+    "font",
+    "padding",
+    "font_size",
+    "border_radius",
+    "window_controls",
+    "background",
+    "frame_backend",
+    "output_format",
+    "png_profile",
+    "quality",
+    "max_pixels",
+    "max_lines",
+)
+
+# Sent with the responses to the requests whose body isn't read, `send_header`
+# closes the connection after the response
+CLOSE_HEADERS = {"Connection": "close"}
+
+
+class ServerBusy(Exception):
+    pass
+
+
+class BadRenderRequest(Exception):
+    pass
+
+
+class RenderService:
+    """
+    Pool of warm render worker processes shared by the server listeners.
+    Up to ``queue_size`` requests are rendered or wait for a worker,
+    the others are rejected right away
+    :param workers: number of worker processes, default is the number of CPUs
+    :type workers: Optional[int]
+    :param queue_size: maximum number of accepted requests
+    :type queue_size: int
+    :param fonts: fonts to preload in every worker
+    :type fonts: Tuple[str, ...]
+    :param max_pixels: `max_pixels` of the requests which don't set a lower one
+    :type max_pixels: int
+    :param max_lines: `max_lines` of the requests which don't set a lower one
+    :type max_lines: int
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        queue_size: int = SERVER_QUEUE_SIZE,
+        fonts: Tuple[str, ...] = (DEFAULT_FONT,),
+        max_pixels: int = SERVER_MAX_PIXELS,
+        max_lines: int = SERVER_MAX_LINES,
+    ) -> None:
+        self.workers: int = workers or os.cpu_count() or 1
+        self.queue_size: int = queue_size
+        self.max_pixels: int = max_pixels
+        self.max_lines: int = max_lines
+        self.rendered: int = 0
+        self.rejected: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._slots: threading.BoundedSemaphore = threading.BoundedSemaphore(queue_size)
+        self._fonts: Tuple[str, ...] = fonts
+        self._executor: ProcessPoolExecutor = self._create_executor()
+
+    def warm_up(self) -> None:
+        """
+        Start all worker processes before the first request
+        :return: None
+        """
+        wait([self._executor.submit(os.getpid) for _ in range(self.workers)])
+
+    def render(self, request: Dict[str, Any]) -> Tuple[bytes, str]:
+        """
+        Render a request
+        :param request: `{"code": ..., "filename": ..., "options": {...}}`
+        :type request: Dict[str, Any]
+        :return: encoded image and its mimetype
+        :rtype: Tuple[bytes, str]
+
+        :raises: :class:`BadRenderRequest`, :class:`ServerBusy`
+        """
+        code = request.get("code")
+        filename = request.get("filename") or ""
+        options = request.get("options") or {}
+        if (
+            not isinstance(code, str)
+            or not isinstance(filename, str)
+            or not isinstance(options, dict)
+        ):
+            raise BadRenderRequest(
+                "`code` and `filename` must be strings and `options` an object"
+            )
+        unknown = set(options) - set(REQUEST_OPTIONS)
+        if unknown:
+            raise BadRenderRequest(f"Unknown options: {', '.join(sorted(unknown))}")
+        options = dict(options)
+        for name, server_limit in (
+            ("max_pixels", self.max_pixels),
+            ("max_lines", self.max_lines),
+        ):
+            limit = options.setdefault(name, server_limit)
+            if (
+                not isinstance(limit, int)
+                or isinstance(limit, bool)
+                or not 0 < limit <= server_limit
+            ):
+                raise BadRenderRequest(
+                    f"`{name}` must be an integer from 1 to {server_limit}"
+                )
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ServerBusy(f"{self.queue_size} requests are already queued")
+        executor = self._executor
+        try:
+            data = executor.submit(
+                _render_bytes, options, None, code, filename
+            ).result()
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise ServerBusy("A render worker died, the workers are restarted")
+        finally:
+            self._slots.release()
+        with self._lock:
+            self.rendered += 1
+        return data, FORMAT_MIMETYPES[(options.get("output_format") or "png").lower()]
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": __version__,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "max_pixels": self.max_pixels,
+            "max_lines": self.max_lines,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+        }
+
+    def close(self) -> None:
+        """
+        Stop the worker processes
+        :return: None
+        """
+        self._executor.shutdown()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """
+        Create the pool of the worker processes
+        :return: process pool
+        :rtype: ProcessPoolExecutor
+        """
+        return ProcessPoolExecutor(
+            self.workers, initializer=_warm_up, initargs=(self._fonts,)
+        )
+
+    def _restart(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Replace a broken pool, requests which failed in the same pool replace it once
+        :param executor: broken pool
+        :type executor: ProcessPoolExecutor
+        :return: None
+        """
+        with self._lock:
+            if self._executor is not executor:
+                return
+            logger.warning("A render worker died, restarting the workers")
+            self._executor = self._create_executor()
+        executor.shutdown(wait=False)
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    `POST /render` with a JSON request returns the image, `GET /health`
+    returns the service statistics
+    """
+
+    server_version = f"dali/{__version__}"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path != "/health":
+            self._send_error(404, f"{self.path} not found")
+            return
+        self._send(200, "application/json", json.dumps(self.server.service.stats).encode())  # type: ignore
+
+    def do_POST(self) -> None:
+        if self.path != "/render":
+            # The body isn't read, so the connection can't be reused
+            self._send_error(404, f"{self.path} not found", CLOSE_HEADERS)
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_error(
+                400, "Content-Length must be a non-negative integer", CLOSE_HEADERS
+            )
+            return
+        if length > SERVER_MAX_REQUEST_SIZE:
+            self._send_error(
+                413,
+                f"Requests are limited to {SERVER_MAX_REQUEST_SIZE} bytes",
+                CLOSE_HEADERS,
+            )
+            return
+        try:
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise BadRenderRequest("The request must be a JSON object")
+            data, mimetype = self.server.service.render(request)  # type: ignore
+        except ServerBusy as error:
+            self._send_error(503, str(error), {"Retry-After": "1"})
+        except (ValueError, BadRenderRequest) as error:
+            self._send_error(400, str(error))
+        except Exception as error:
+            # Dali option and source code errors
+            self._send_error(422, f"{type(error).__name__}: {error}")
+        else:
+            self._send(200, mimetype, data)
+
+    def _send(
+        self,
+        status: int,
+        content_type: str,
+        body: bytes,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(
+        self, status: int, message: str, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        self._send(
+            status, "application/json", json.dumps({"error": message}).encode(), headers
+        )
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Unix socket clients have no address
+        logger.info(format, *args)
+
+
+class HTTPRenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: RenderService) -> None:
+        super().__init__(address, RenderRequestHandler)
+        self.service: RenderService = service
+
+
+class UnixRenderServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: RenderService) -> None:
+        if os.path.exists(path):
+            # Stale socket of a previous server
+            os.unlink(path)
+        super().__init__(path, RenderRequestHandler)
+        self.service: RenderService = service
+
+    def server_close(self) -> None:
+        super().server_close()
+        if os.path.exists(self.server_address):  # type: ignore
+            os.unlink(self.server_address)  # type: ignore
+
+
+def serve(
+    host: str = SERVER_HOST,
+    port: Optional[int] = SERVER_PORT,
+    unix_socket: str = "",
+    workers: Optional[int] = None,
+    queue_size: int = SERVER_QUEUE_SIZE,
+    max_pixels: int = SERVER_MAX_PIXELS,
+    max_lines: int = SERVER_MAX_LINES,
+) -> None:
+    """
+    Run the render server until it's interrupted
+    :param host: HTTP host
+    :type host: str
+    :param port: HTTP port, None to listen only on the Unix socket
+    :type port: Optional[int]
+    :param unix_socket: path of the Unix socket, empty to listen only on HTTP
+    :type unix_socket: str
+    :param workers: number of worker processes, default is the number of CPUs
+    :type workers: Optional[int]
+    :param queue_size: maximum number of accepted requests
+    :type queue_size: int
+    :param max_pixels: maximum `max_pixels` of a request
+    :type max_pixels: int
+    :param max_lines: maximum `max_lines` of a request
+    :type max_lines: int
+    :return: None
+    """
+    service = RenderService(
+        workers, queue_size, max_pixels=max_pixels, max_lines=max_lines
+    )
+    service.warm_up()
+    servers: list = []
+    if port is not None:
+        servers.append(HTTPRenderServer((host, port), service))
+        logger.info("Listening on http://%s:%d", host, servers[-1].server_address[1])
+    if unix_socket:
+        servers.append(UnixRenderServer(unix_socket, service))
+        logger.info("Listening on %s", unix_socket)
+
+    threads = [
+        threading.Thread(target=server.serve_forever, daemon=True) for server in servers
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        service.close()
@@ -26,3 +26,29 @@ def test_get_font():
     assert type(font.get_font(True, False)) == FreeTypeFont
     assert type(font.get_font(False, True)) == FreeTypeFont
     assert type(font.get_font(True, True)) == FreeTypeFont
+
+
+def test_fonts_are_cached():
+    DaliFontManager.clear_cache()
+    first = DaliFontManager(font_name="Hack", font_size=21)
+    second = DaliFontManager(font_name="Hack", font_size=21)
+    assert first.fonts["NORMAL"] is second.fonts["NORMAL"]
+    assert first.fonts["BOLD"] is second.fonts["BOLD"]
+
+
+def test_font_cache_keyed_by_size():
+    small = DaliFontManager(font_name="Hack", font_size=14)
+    large = DaliFontManager(font_name="Hack", font_size=21)
+    assert small.fonts["NORMAL"] is not large.fonts["NORMAL"]
+
+
+def test_monospace_width():
+    for font_name in ("Hack", "Fira", "Inconsolata", "JetBrains"):
+        font = DaliFontManager(font_name=font_name, font_size=21)
+        assert font.monospace_width == font.get_char_size()[0]
+
+
+def test_text_width_matches_text_size():
+    font = DaliFontManager(font_name="Hack", font_size=21)
+    for text in ("dali", "    ", "def main():", "ünïcödé → 中文"):
+        assert font.get_text_width(text) == font.get_text_size(text)[0]
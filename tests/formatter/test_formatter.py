@@ -1,10 +1,93 @@
 from pygments import highlight
 from pygments.lexers import PythonLexer
+from pygments.token import Name
 
 
+from dali_renderer.renders.DaliFontManager import DaliFontManager
 from dali_renderer.renders.DaliImageFormatter import ImageFormatter
 
 
 def test_gen_default_formatter():
     formatter = ImageFormatter(font_name="Hack", font_size=21)
     assert type(highlight("", PythonLexer(), formatter)) == bytes
+
+
+def test_coalesce_same_style_runs():
+    formatter = ImageFormatter(font_name="Hack", font_size=21, line_numbers=False)
+    formatter.render(PythonLexer().get_tokens("value = first + second\n"))
+    assert formatter.fragments > len(formatter.drawables)
+    drawables = formatter.drawables
+    assert (
+        "".join(drawables.get_text(i) for i in range(len(drawables)))
+        == "value = first + second"
+    )
+    assert drawables.texts == ["value = first + second"]
+
+
+def test_coalesce_keeps_lines_apart():
+    formatter = ImageFormatter(font_name="Hack", font_size=21, line_numbers=False)
+    formatter.render(PythonLexer().get_tokens("a = 1\nb = 2\n"))
+    assert len(set(formatter.drawables.y)) == 2
+    assert formatter.drawables.texts == ["a = 1", "b = 2"]
+
+
+def test_proportional_font_keeps_all_fragments():
+    formatter = ImageFormatter(font_name="Hack", font_size=21, line_numbers=False)
+    formatter.fonts.monospace_width = None
+    formatter.render(PythonLexer().get_tokens("def foo(a, b):\n    return a + b\n"))
+    drawables = formatter.drawables
+    assert drawables.texts == ["def foo(a, b):", "    return a + b"]
+    assert len(drawables) == formatter.fragments
+    assert [drawables.get_text(i) for i in range(len(drawables))][:4] == [
+        "def",
+        " ",
+        "foo",
+        "(",
+    ]
+    for line, text in enumerate(drawables.texts):
+        assert (
+            "".join(
+                drawables.get_text(i)
+                for i in range(len(drawables))
+                if drawables.line[i] == line
+            )
+            == text
+        )
+
+
+def test_text_background():
+    # The strings of the `colorful` style have a background color
+    formatter = ImageFormatter(
+        font_name="Hack", font_size=21, style="colorful", line_numbers=False
+    )
+    im = formatter.render(PythonLexer().get_tokens('value = "text"\n'))
+    assert (255, 240, 240, 255) in {style[2] for style in formatter.drawables.styles}
+    assert (255, 240, 240, 255) in {
+        color for _, color in im.getcolors(im.width * im.height)
+    }
+
+
+def test_token_styles():
+    first = ImageFormatter(font_name="Hack", font_size=21)
+    second = ImageFormatter(font_name="Hack", font_size=21)
+    assert first.token_styles is second.token_styles
+    assert (
+        ImageFormatter(font_name="Hack", font_size=22).token_styles
+        is not first.token_styles
+    )
+    # Token types without an own style resolve to the parent style
+    assert (
+        first.token_styles[Name.Function.Magic.Custom]
+        == first.token_styles[Name.Function.Magic]
+    )
+    font, text_fg, text_bg = first.token_styles[Name.Function]
+    assert len(text_fg) == 4
+    assert text_bg is None
+
+
+def test_clear_cache_drops_token_styles():
+    first = ImageFormatter(font_name="Hack", font_size=21)
+    DaliFontManager.clear_cache()
+    second = ImageFormatter(font_name="Hack", font_size=21)
+    assert second.token_styles is not first.token_styles
+    assert second.token_styles[Name.Function][0] is second.fonts.get_font(False, False)
@@ -0,0 +1,32 @@
+from dali_renderer.renders.frame import FrameCompositor
+
+
+def test_default_frame():
+    frame = FrameCompositor(background="#282c34").render(500, 300)
+    assert frame.size == (500, 300)
+    assert frame.mode == "RGBA"
+    assert frame.getpixel((0, 0)) == (40, 44, 52, 255)
+
+
+def test_rounded_corners():
+    frame = FrameCompositor(background="#282c34", border_radius=20).render(500, 300)
+    assert frame.getpixel((0, 0))[3] == 0
+    assert frame.getpixel((499, 299))[3] == 0
+    assert frame.getpixel((250, 150)) == (40, 44, 52, 255)
+
+
+def test_additional_background():
+    frame = FrameCompositor(
+        background="#282c34", border_radius=20, additional_background="#ffffff"
+    ).render(500, 300)
+    assert frame.size == (700, 500)
+    assert frame.getpixel((0, 0)) == (255, 255, 255, 255)
+    assert frame.getpixel((100, 100)) == (255, 255, 255, 255)
+    assert frame.getpixel((350, 250)) == (40, 44, 52, 255)
+
+
+def test_window_controls():
+    frame = FrameCompositor(background="#282c34", window_controls=True).render(500, 300)
+    assert frame.getpixel((35, 32)) == (255, 93, 87, 255)
+    assert frame.getpixel((70, 32)) == (255, 188, 48, 255)
+    assert frame.getpixel((105, 32)) == (39, 201, 63, 255)
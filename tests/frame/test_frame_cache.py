@@ -0,0 +1,46 @@
+from dali_renderer import Dali
+from dali_renderer.dali import _frame_cache
+
+CODE = "def main():\n    return 'dali'\n"
+
+
+def test_identical_frames_are_cached():
+    Dali.clear_frame_cache()
+    d = Dali(syntax="python", window_controls=True)
+    first = d.render_image(CODE)
+    d = Dali(syntax="python", window_controls=True)
+    second = d.render_image(CODE)
+    stats = _frame_cache.stats()
+    assert stats.misses == 1
+    assert stats.hits == 1
+    assert first.tobytes() == second.tobytes()
+
+
+def test_cached_frame_is_not_modified():
+    Dali.clear_frame_cache()
+    d = Dali(syntax="python", border_radius=0)
+    image = d.render_image(CODE)
+    frame = d._get_frame(*image.size)
+    assert len(set(frame.getdata())) == 1
+
+
+def test_frame_cache_size_is_bounded():
+    Dali.clear_frame_cache()
+    max_size = _frame_cache.max_size
+    d = Dali(syntax="python")
+    _frame_cache.max_size = len(d._get_frame(404, 300).tobytes()) * 2
+    Dali.clear_frame_cache()
+    try:
+        for width in range(400, 405):
+            d._get_frame(width, 300)
+        stats = _frame_cache.stats()
+        assert stats.entries == 2
+        assert stats.size <= _frame_cache.max_size
+        # The least recently used frames are dropped
+        d._get_frame(404, 300)
+        assert _frame_cache.stats().hits == 1
+        d._get_frame(400, 300)
+        assert _frame_cache.stats().misses == 6
+    finally:
+        _frame_cache.max_size = max_size
+        Dali.clear_frame_cache()
@@ -0,0 +1,37 @@
+from dali_renderer import Dali
+from dali_renderer import FrameBackendNotFound
+from dali_renderer.renders.frame import FrameCompositor
+from dali_renderer.renders.frame import SizeError
+from dali_renderer.renders.frame import UnknownColor
+
+
+def test_frame_unknown_color():
+    try:
+        FrameCompositor(background="#test")
+        assert False
+    except UnknownColor:
+        assert True
+
+
+def test_frame_unknown_additional_background():
+    try:
+        FrameCompositor(background="#fff", additional_background="#test")
+        assert False
+    except UnknownColor:
+        assert True
+
+
+def test_frame_size_error():
+    try:
+        FrameCompositor(background="#fff").render(0, 100)
+        assert False
+    except SizeError:
+        assert True
+
+
+def test_unknown_frame_backend():
+    try:
+        Dali(frame_backend="invalid")
+        assert False
+    except FrameBackendNotFound:
+        assert True
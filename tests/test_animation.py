@@ -0,0 +1,128 @@
+from io import BytesIO
+
+from PIL import Image, ImageChops, ImageSequence, features
+
+from dali_renderer import CodeLength, EncoderOptionError, InputNotSpecified, Renderer
+
+CODE = "def main():\n    return 'dali'\n\n\nprint(main())\n"
+BEFORE = "def main():\n    return 'dali'\n\nprint(main())\n"
+AFTER = "def main():\n    return 'renderer'\n\nprint(main())\n"
+FORMATS = ["gif", "apng"] + (["webp"] if features.check("webp") else [])
+
+
+def _get_frames(data):
+    with Image.open(BytesIO(data)) as animation:
+        return [frame.convert("RGBA") for frame in ImageSequence.Iterator(animation)]
+
+
+def test_typing_formats():
+    renderer = Renderer(syntax="python")
+    size = renderer.render_image(CODE).size
+    for animation_format in FORMATS:
+        with Image.open(
+            BytesIO(renderer.render_typing(CODE, animation_format=animation_format))
+        ) as animation:
+            assert animation.size == size
+            assert animation.n_frames > 1
+
+
+def test_typing_frames():
+    if not features.check("webp"):
+        return
+    renderer = Renderer(syntax="python", background="#576574")
+    frames = _get_frames(renderer.render_typing(CODE, animation_format="webp"))
+    assert (
+        ImageChops.difference(
+            frames[-1], renderer.render_image(CODE).convert("RGBA")
+        ).getbbox()
+        is None
+    )
+    # Every frame reveals more of the code
+    first_frame = frames[0].tobytes()
+    assert all(frame.tobytes() != first_frame for frame in frames[1:])
+
+
+def test_palette_frames():
+    # The shared palette of GIF and APNG changes the colors slightly
+    for animation_format, background in (
+        ("apng", ""),
+        ("apng", "#576574"),
+        ("gif", "#576574"),
+    ):
+        renderer = Renderer(
+            syntax="python", background=background, window_controls=True
+        )
+        for data, code in (
+            (renderer.render_typing(CODE, animation_format=animation_format), CODE),
+            (
+                renderer.render_diff(BEFORE, AFTER, animation_format=animation_format),
+                AFTER,
+            ),
+        ):
+            difference = ImageChops.difference(
+                _get_frames(data)[-1], renderer.render_image(code).convert("RGBA")
+            )
+            assert max(high for _, high in difference.getextrema()) <= 32
+
+
+def test_typing_chars_per_frame():
+    renderer = Renderer(syntax="python")
+    frames = len(_get_frames(renderer.render_typing(CODE, chars_per_frame=1)))
+    assert len(_get_frames(renderer.render_typing(CODE, chars_per_frame=4))) < frames
+    assert (
+        len(_get_frames(renderer.render_typing(CODE, chars_per_frame=1000)))
+        == len(CODE.splitlines()) + 1
+    )
+
+
+def test_diff_frames():
+    if not features.check("webp"):
+        return
+    renderer = Renderer(syntax="python", background="#576574")
+    frames = _get_frames(renderer.render_diff(BEFORE, AFTER, animation_format="webp"))
+    assert len(frames) == 2
+    assert (
+        ImageChops.difference(
+            frames[0], renderer.render_image(BEFORE).convert("RGBA")
+        ).getbbox()
+        is None
+    )
+    assert (
+        ImageChops.difference(
+            frames[-1], renderer.render_image(AFTER).convert("RGBA")
+        ).getbbox()
+        is None
+    )
+
+
+def test_animation_outputs(tmp_path):
+    renderer = Renderer(syntax="python")
+    data = renderer.render_typing(CODE)
+    assert data[:6] == b"GIF89a"
+    path = tmp_path / "typing.gif"
+    assert renderer.render_typing(CODE, path) is None
+    assert path.read_bytes() == data
+    buffer = BytesIO()
+    renderer.render_diff(BEFORE, AFTER, buffer, animation_format="apng")
+    with Image.open(buffer) as animation:
+        assert animation.format == "PNG"
+        assert animation.n_frames == 2
+
+
+def test_animation_errors(tmp_path):
+    renderer = Renderer(syntax="python")
+    for kwargs, error in (
+        ({"output": tmp_path / "typing.jpg"}, InputNotSpecified),
+        (
+            {"output": tmp_path / "typing.gif", "animation_format": "webp"},
+            EncoderOptionError,
+        ),
+        ({"animation_format": "mp4"}, EncoderOptionError),
+        ({"chars_per_frame": 0}, CodeLength),
+        ({"loop": -1}, EncoderOptionError),
+    ):
+        try:
+            renderer.render_typing(CODE, **kwargs)
+            assert False
+        except error:
+            assert True
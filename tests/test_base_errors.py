@@ -94,7 +94,7 @@ def test_invalid_style():
 
 def test_invalid_output_extension():
     try:
-        Dali("./main.jpeg")
+        Dali("./main.gif")
         assert False
     except InputNotSpecified:
         assert True
@@ -0,0 +1,129 @@
+import os
+import tempfile
+
+from PIL import Image
+
+from dali_renderer.build import MANIFEST_NAME, build, iter_sources
+from dali_renderer.cli import main
+
+CODE = "def main():\n    return 'dali'\n"
+
+
+def write(path, content=CODE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as file:
+        file.write(content)
+
+
+def test_incremental_build():
+    with tempfile.TemporaryDirectory() as directory:
+        sources = os.path.join(directory, "src")
+        output = os.path.join(directory, "out")
+        write(os.path.join(sources, "main.py"))
+        write(os.path.join(sources, "package", "module.py"))
+        write(os.path.join(sources, "package", "other.py"))
+
+        report = build([sources], output, {"syntax": "python"}, workers=1)
+        assert (report.rendered, report.skipped, report.removed, report.failed) == (
+            3,
+            0,
+            0,
+            [],
+        )
+        assert (
+            Image.open(os.path.join(output, "package", "module.py.png")).format == "PNG"
+        )
+        assert os.path.exists(os.path.join(output, MANIFEST_NAME))
+
+        report = build([sources], output, {"syntax": "python"}, workers=1)
+        assert (report.rendered, report.skipped) == (0, 3)
+
+        write(os.path.join(sources, "main.py"), CODE * 2)
+        os.unlink(os.path.join(sources, "package", "other.py"))
+        report = build([sources], output, {"syntax": "python"}, workers=1)
+        assert (report.rendered, report.skipped, report.removed) == (1, 1, 1)
+        assert not os.path.exists(os.path.join(output, "package", "other.py.png"))
+
+        # New options render everything and remove the outputs of the previous format
+        report = build(
+            [sources], output, {"syntax": "python", "output_format": "webp"}, workers=1
+        )
+        assert (report.rendered, report.skipped, report.removed) == (2, 0, 2)
+        assert sorted(os.listdir(os.path.join(output, "package"))) == ["module.py.webp"]
+
+
+def test_touched_source_is_hashed():
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "main.py")
+        output = os.path.join(directory, "out")
+        write(source)
+        build([source], output, workers=1)
+        os.utime(source, (0, 0))
+        report = build([source], output, workers=1)
+        assert (report.rendered, report.skipped) == (0, 1)
+
+
+def test_glob_sources():
+    with tempfile.TemporaryDirectory() as directory:
+        write(os.path.join(directory, "a", "main.py"))
+        write(os.path.join(directory, "a", "b", "module.py"))
+        write(os.path.join(directory, "a", "b", "notes.txt"))
+        write(os.path.join(directory, "a", ".hidden", "secret.py"))
+        pattern = os.path.join(directory, "a", "**", "*.py")
+        assert sorted(relative for _, relative in iter_sources([pattern])) == [
+            os.path.join("b", "module.py"),
+            "main.py",
+        ]
+
+
+def test_cli_render():
+    with tempfile.TemporaryDirectory() as directory:
+        write(os.path.join(directory, "main.py"))
+        write(os.path.join(directory, "short.py"), "a = 1\n")
+        output = os.path.join(directory, "out")
+        for _ in range(2):
+            # The short source is skipped, the output directory is skipped on reruns
+            assert (
+                main(
+                    ["render", directory, "-o", output, "-j", "1", "--syntax", "python"]
+                )
+                == 0
+            )
+            assert sorted(os.listdir(output)) == [MANIFEST_NAME, "main.py.png"]
+        # A given source is always rendered
+        short = os.path.join(directory, "short.py")
+        assert main(["render", short, "-o", output, "-j", "1"]) == 1
+
+
+def test_non_source_files_are_skipped():
+    with tempfile.TemporaryDirectory() as directory:
+        sources = os.path.join(directory, "src")
+        output = os.path.join(directory, "out")
+        write(os.path.join(sources, "package", "module.py"))
+        write(os.path.join(sources, "package", "__init__.py"), "")
+        write(os.path.join(sources, "data.unknown-extension"))
+        with open(os.path.join(sources, "image.py"), "wb") as file:
+            file.write(b"\x89PNG\r\n\x1a\n\0\0\0\rIHDR" * 4)
+        with open(os.path.join(sources, "latin1.py"), "wb") as file:
+            file.write("name = 'caf\xe9'\n".encode("latin-1"))
+        assert [relative for _, relative in iter_sources([sources])] == [
+            os.path.join("package", "module.py")
+        ]
+        report = build([sources], output, workers=1)
+        assert (report.rendered, report.failed) == (1, [])
+        report = build([sources], output, workers=1)
+        assert (report.rendered, report.skipped, report.failed) == (0, 1, [])
+
+
+def test_output_conflict():
+    with tempfile.TemporaryDirectory() as directory:
+        first = os.path.join(directory, "a", "x.py")
+        second = os.path.join(directory, "b", "x.py")
+        write(first)
+        write(second)
+        output = os.path.join(directory, "out")
+        report = build([first, second], output, workers=1)
+        assert report.rendered == 1
+        assert len(report.failed) == 1
+        assert report.failed[0][0] == second
+        assert first in report.failed[0][1]
@@ -0,0 +1,88 @@
+from io import BytesIO
+
+from PIL import Image
+
+from dali_renderer import Dali, EncoderOptionError, InputNotSpecified
+from dali_renderer.renders.encoders import is_format_available
+
+CODE = "def main():\n    return 'dali'\n" * 10
+
+
+def test_format_by_extension():
+    assert Dali("image.webp").output_format == "webp"
+    assert Dali("image.JPG").output_format == "jpeg"
+    assert Dali("image.png").output_format == "png"
+    assert Dali().output_format == "png"
+
+
+def test_encode_formats():
+    for image_format in ("png", "webp", "jpeg", "avif"):
+        if not is_format_available(image_format):
+            continue
+        dali = Dali(syntax="python", output_format=image_format)
+        image = Image.open(BytesIO(dali.render_bytes(CODE)))
+        assert image.format == image_format.upper()
+        assert image.size == dali.render_image(CODE).size
+        assert dali.encode_time > 0
+
+
+def test_lossless_webp():
+    dali = Dali(syntax="python", output_format="webp")
+    image = Image.open(BytesIO(dali.render_bytes(CODE))).convert("RGBA")
+    expected = dali.render_image(CODE)
+    # The color of fully transparent pixels is not kept
+    matte = Image.new("RGBA", image.size, "#ffffff")
+    assert (
+        Image.alpha_composite(matte, image).tobytes()
+        == Image.alpha_composite(matte, expected).tobytes()
+    )
+
+
+def test_png_profiles():
+    expected = Dali(syntax="python").render_image(CODE).tobytes()
+    sizes = []
+    for profile in ("fast", "balanced", "smallest"):
+        data = Dali(syntax="python", png_profile=profile).render_bytes(CODE)
+        assert Image.open(BytesIO(data)).tobytes() == expected
+        sizes.append(len(data))
+    assert sizes[2] <= sizes[0]
+
+
+def test_unknown_encoder_options():
+    try:
+        Dali(output_format="bmp")
+        assert False
+    except EncoderOptionError:
+        assert True
+
+    try:
+        Dali(png_profile="tiny")
+        assert False
+    except EncoderOptionError:
+        assert True
+
+    try:
+        Dali(quality=0)
+        assert False
+    except EncoderOptionError:
+        assert True
+
+    try:
+        Dali("image.gif")
+        assert False
+    except InputNotSpecified:
+        assert True
+
+    try:
+        Dali("image.webp", output_format="png")
+        assert False
+    except EncoderOptionError:
+        assert True
+
+
+def test_stream_png_only():
+    try:
+        Dali(output_format="webp").render_stream(CODE, BytesIO())
+        assert False
+    except EncoderOptionError:
+        assert True
@@ -0,0 +1,44 @@
+import os
+from io import BytesIO
+
+from PIL import Image
+
+from dali_renderer import Dali
+from dali_renderer import InputNotSpecified
+from .config import SOURCES_FILES_PATH
+
+
+def get_code():
+    with open(os.path.join(SOURCES_FILES_PATH, "source_mini.py"), "r") as file:
+        code = file.read()
+    return code
+
+
+def test_render_image():
+    d = Dali(syntax="python")
+    image = d.render_image(get_code())
+    assert isinstance(image, Image.Image)
+    assert image.size[0] > 0 and image.size[1] > 0
+
+
+def test_render_bytes():
+    d = Dali(syntax="python", window_controls=True, background="#ff9ff3")
+    data = d.render_bytes(get_code())
+    assert data.startswith(b"\x89PNG")
+
+
+def test_render_to_file_object():
+    d = Dali(syntax="python")
+    buffer = BytesIO()
+    d.render_to(get_code(), buffer)
+    buffer.seek(0)
+    assert Image.open(buffer).format == "PNG"
+
+
+def test_from_string_without_output_path():
+    d = Dali()
+    try:
+        d.from_string(get_code())
+        assert False
+    except InputNotSpecified:
+        assert True
@@ -0,0 +1,90 @@
+from pygments.lexers import PythonLexer, get_all_lexers, get_lexer_for_filename
+
+from dali_renderer import Dali
+from dali_renderer.lexers import _guess_lexer_name
+from dali_renderer.lexers import detect_lexer_name
+from dali_renderer.lexers import get_lexer
+from dali_renderer.lexers import get_lexer_index
+
+
+def test_index_contains_all_lexers():
+    index = get_lexer_index()
+    for name, aliases, _, _ in get_all_lexers():
+        assert name in index
+        for alias in aliases:
+            assert alias in index
+
+
+def test_get_lexer_by_name_and_alias():
+    assert isinstance(get_lexer("python"), PythonLexer)
+    assert isinstance(get_lexer("py"), PythonLexer)
+    assert get_lexer("Python") is get_lexer("py")
+    assert get_lexer("invalid_syntax") is None
+
+
+def test_get_lexer_options():
+    assert get_lexer("python", stripnl=False) is not get_lexer("python")
+    assert get_lexer("python", stripnl=False) is get_lexer("python", stripnl=False)
+
+
+def test_lookup_by_filename_and_mimetype():
+    index = get_lexer_index()
+    assert index.get_name_for_filename("/tmp/main.py") == "Python"
+    assert index.get_name_for_filename("Makefile") == "Makefile"
+    assert index.get_name_for_filename("main.unknown-extension") is None
+    assert index.get_name_for_mimetype("text/x-python") == "Python"
+
+
+def test_syntax_alias_is_supported():
+    d = Dali(syntax="py")
+    assert d.render_bytes("def main():\n    return 'dali'\n").startswith(b"\x89PNG")
+
+
+def test_detect_by_filename():
+    assert detect_lexer_name("x = 1", "main.rs") == "Rust"
+    assert detect_lexer_name("x = 1", "Makefile") == "Makefile"
+
+
+def test_detect_ambiguous_extensions():
+    perl = "#!/usr/bin/perl\nuse strict;\nmy $name = 'dali';\n"
+    objective_c = (
+        "#import <Foundation/Foundation.h>\n@interface Dali : NSObject\n@end\n"
+    )
+    matlab = "function y = f(x)\n  % dali\n  y = x;\nend\n"
+    sql = "SELECT name FROM renders WHERE id = 1;\n"
+    assert detect_lexer_name(perl, "main.pl") == "Perl"
+    assert detect_lexer_name(objective_c, "main.m") == "Objective-C"
+    assert detect_lexer_name(matlab, "main.m") == "Matlab"
+    assert detect_lexer_name(sql, "query.sql") != "SQL+Jinja"
+    for code, filename in (
+        (perl, "main.pl"),
+        (objective_c, "main.m"),
+        (matlab, "main.m"),
+        (sql, "query.sql"),
+        ("", "query.sql"),
+    ):
+        assert (
+            get_lexer_index().get_name_for_filename(filename, code)
+            == get_lexer_for_filename(filename, code).name
+        )
+
+
+def test_detect_by_shebang():
+    assert detect_lexer_name("#!/usr/bin/env python3\nx = 1\n") == "Python"
+    assert detect_lexer_name("#!/usr/bin/python3.11\nx = 1\n") == "Python"
+    assert detect_lexer_name("#!/bin/sh\necho dali\n") == "Bash"
+    assert detect_lexer_name("#!/usr/bin/env node\nlet x = 1;\n") == "JavaScript"
+
+
+def test_detect_by_modeline():
+    assert detect_lexer_name("puts 1\n# vim: set ft=ruby:\n") == "Ruby"
+    assert detect_lexer_name("// -*- mode: c++ -*-\nint x;\n") == "C++"
+
+
+def test_guess_is_memoised():
+    _guess_lexer_name.cache_clear()
+    code = "<?php echo 'dali'; ?>\n"
+    first = detect_lexer_name(code)
+    second = detect_lexer_name(code)
+    assert first == second
+    assert _guess_lexer_name.cache_info().hits == 1
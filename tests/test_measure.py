@@ -0,0 +1,55 @@
+from io import BytesIO
+
+from dali_renderer import Dali, ImageTooLarge
+
+CODE = "def main():\n    return 'dali'\n" * 10
+
+
+def test_measure_matches_render():
+    for options in (
+        {},
+        {"window_controls": True},
+        {"background": "#576574", "padding": 20},
+    ):
+        measurement = Dali(syntax="python", **options).measure(CODE)
+        image = Dali(syntax="python", **options).render_image(CODE)
+        assert (measurement.width, measurement.height) == image.size
+        assert measurement.lines == 20
+        assert measurement.memory >= image.width * image.height * 4
+
+
+def test_measure_lines():
+    assert Dali(syntax="python").measure("print('dali')").lines == 1
+    assert Dali(syntax="python").measure("print('dali')\nprint(1)\n").lines == 2
+
+
+def test_size_limits():
+    measurement = Dali(syntax="python").measure(CODE)
+    limits = (
+        {"max_lines": 19},
+        {"max_width": measurement.width - 1},
+        {"max_pixels": measurement.width * measurement.height - 1},
+    )
+    for limit in limits:
+        for render in ("measure", "render_image", "render_bytes"):
+            try:
+                getattr(Dali(syntax="python", **limit), render)(CODE)
+                assert False
+            except ImageTooLarge:
+                assert True
+
+    dali = Dali(
+        syntax="python",
+        max_lines=20,
+        max_width=measurement.width,
+        max_pixels=measurement.width * measurement.height,
+    )
+    assert dali.render_image(CODE).size == (measurement.width, measurement.height)
+
+
+def test_stream_size_limit():
+    try:
+        Dali(syntax="python", max_lines=10).render_stream(CODE, BytesIO())
+        assert False
+    except ImageTooLarge:
+        assert True
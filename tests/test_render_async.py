@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dali_renderer import AsyncRenderer, ConcurrencyError, Dali, SyntaxNotFound
+from dali_renderer import aio
+
+CODE = "def main():\n    return 'dali'\n" * 10
+
+
+def test_render_async():
+    dali = Dali(syntax="python", output_format="webp")
+
+    async def main():
+        return await dali.render_async(CODE)
+
+    assert asyncio.run(main()) == dali.render_bytes(CODE)
+
+
+def test_render_async_does_not_block_loop():
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.001)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await Dali(syntax="python").render_async(CODE * 20)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 0
+
+
+def test_concurrency_limit():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+    render_bytes = aio._render_bytes
+
+    def slow_render(*args):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return b""
+
+    async def main():
+        renderer = AsyncRenderer(ThreadPoolExecutor(8), max_concurrency=2)
+        dali = Dali(syntax="python")
+        await asyncio.gather(
+            *(dali.render_async(CODE, renderer=renderer) for _ in range(6))
+        )
+
+    aio._render_bytes = slow_render
+    try:
+        asyncio.run(main())
+    finally:
+        aio._render_bytes = render_bytes
+    assert peak == 2
+
+
+def test_cancel_waiting_render():
+    async def main():
+        renderer = AsyncRenderer(max_concurrency=1)
+        dali = Dali(syntax="python")
+        first = asyncio.ensure_future(dali.render_async(CODE, renderer=renderer))
+        second = asyncio.ensure_future(dali.render_async(CODE, renderer=renderer))
+        await asyncio.sleep(0)
+        second.cancel()
+        await first
+        try:
+            await second
+            assert False
+        except asyncio.CancelledError:
+            assert True
+
+    asyncio.run(main())
+
+
+def test_async_errors():
+    try:
+        AsyncRenderer(max_concurrency=0)
+        assert False
+    except ConcurrencyError:
+        assert True
+
+    try:
+        asyncio.run(Dali(syntax="unknown-syntax").render_async(CODE))
+        assert False
+    except SyntaxNotFound:
+        assert True
@@ -0,0 +1,87 @@
+import os
+import tempfile
+
+from dali_renderer import Dali, RenderCache
+from dali_renderer.renders.DaliImageFormatter import ImageFormatter
+
+CODE = "def main():\n    return 'dali'\n" * 10
+
+
+def test_cache_hit_skips_render():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory)
+        expected = Dali(syntax="python").render_bytes(CODE)
+        assert Dali(syntax="python", cache=cache).render_bytes(CODE) == expected
+
+        render = ImageFormatter.render
+        ImageFormatter.render = None
+        try:
+            assert Dali(syntax="python", cache=cache).render_bytes(CODE) == expected
+        finally:
+            ImageFormatter.render = render
+
+        stats = cache.stats
+        assert (stats.hits, stats.misses, stats.entries, stats.size) == (
+            1,
+            1,
+            1,
+            len(expected),
+        )
+
+
+def test_cache_key_options():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory)
+        Dali(syntax="python", cache=cache).render_bytes(CODE)
+        Dali(syntax="python", style="monokai", cache=cache).render_bytes(CODE)
+        Dali(syntax="python", output_format="webp", cache=cache).render_bytes(CODE)
+        Dali(syntax="python", cache=cache).render_bytes(CODE + "\n")
+        assert cache.stats.misses == 4
+        assert cache.stats.entries == 4
+
+
+def test_cache_from_string():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(os.path.join(directory, "cache"))
+        output = os.path.join(directory, "image.png")
+        for _ in range(2):
+            Dali(output, syntax="python", cache=cache).from_string(CODE)
+        with open(output, "rb") as file:
+            assert file.read() == Dali(syntax="python").render_bytes(CODE)
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_cache_lru_eviction():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory, max_entries=2)
+        for mtime, key in enumerate(("a1", "b2")):
+            cache.put(key, key.encode())
+            os.utime(cache._get_path(key), (mtime, mtime))
+        assert cache.get("a1") == b"a1"
+        cache.put("c3", b"c3")
+        assert cache.get("b2") is None
+        assert cache.get("a1") == b"a1"
+        assert cache.get("c3") == b"c3"
+
+        size_limited = RenderCache(directory, max_size=2)
+        size_limited.evict()
+        assert size_limited.stats.entries == 1
+
+        cache.clear()
+        assert cache.stats == (0, 0, 0, 0)
+
+
+def test_cache_put_counts_without_scanning():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = RenderCache(directory, max_entries=5)
+        scan = cache._scan
+        scans = []
+        cache._scan = lambda: scans.append(1) or scan()
+        for index in range(5):
+            cache.put(f"{index:02}", b"image")
+        cache.put("00", b"new image")
+        assert len(scans) == 1
+        assert (cache._entries, cache._size) == (5, 29)
+        cache.put("05", b"image")
+        assert len(scans) == 2
+        assert cache.stats.entries == 5
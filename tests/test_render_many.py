@@ -0,0 +1,56 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from dali_renderer import Dali
+from dali_renderer import StyleNotFound
+from .config import RESOURCES_FILES_PATH
+from .config import SOURCES_FILES_PATH
+
+CODE = "def main():\n    return 'dali'\n"
+
+
+def get_jobs():
+    return [
+        (CODE, None, {"syntax": "python"}),
+        (Path(SOURCES_FILES_PATH, "source_mini.py"), None, {"syntax": "python"}),
+        (CODE, None, {"syntax": "python", "style": "invalid-style"}),
+    ]
+
+
+def test_render_many_in_process():
+    results = sorted(Dali.render_many(get_jobs(), workers=1))
+    assert results[0].output.startswith(b"\x89PNG")
+    assert results[1].output.startswith(b"\x89PNG")
+    assert results[2].output is None
+    assert isinstance(results[2].error, StyleNotFound)
+
+
+def test_render_many_with_workers():
+    output_path = os.path.join(RESOURCES_FILES_PATH, "test_batch_image.png")
+    jobs = get_jobs() + [(CODE, output_path, {"window_controls": True})]
+    results = sorted(Dali.render_many(jobs, workers=2))
+    assert [result.position for result in results] == [0, 1, 2, 3]
+    assert results[0].error is None
+    assert isinstance(results[2].error, StyleNotFound)
+    assert results[3].output == output_path
+    assert os.path.exists(output_path)
+    os.unlink(output_path)
+
+
+class WorkerCrash:
+    """Kills the worker process that receives the job"""
+
+    def __reduce__(self):
+        return os._exit, (1,)
+
+
+def test_render_many_worker_crash():
+    jobs = [(CODE, None, {"syntax": "python"}) for _ in range(20)]
+    jobs[1] = (WorkerCrash(), None, {})
+    results = sorted(Dali.render_many(jobs, workers=2))
+    assert [result.position for result in results] == list(range(20))
+    assert isinstance(results[1].error, BrokenProcessPool)
+    # The jobs after the crash run in a new pool
+    assert results[-1].error is None
+    assert results[-1].output.startswith(b"\x89PNG")
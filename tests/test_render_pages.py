@@ -0,0 +1,50 @@
+from io import BytesIO
+
+from PIL import Image
+
+from dali_renderer import Dali, ImageTooLarge
+
+CODE = "".join(
+    f"def function_{i}(argument):\n    return argument * {i}\n" for i in range(40)
+)
+
+
+def open_pages(pages):
+    return [Image.open(BytesIO(page)) for page in pages]
+
+
+def test_render_pages():
+    pages = open_pages(
+        Dali(syntax="python").render_pages(CODE, lines_per_page=30, workers=1)
+    )
+    assert len(pages) == 3
+    assert len({page.width for page in pages}) == 1
+    assert pages[0].height == pages[1].height > pages[2].height
+
+
+def test_render_pages_with_workers():
+    d = Dali(syntax="python", window_controls=True)
+    expected = d.render_pages(CODE, lines_per_page=25, workers=1)
+    assert d.render_pages(CODE, lines_per_page=25, workers=2) == expected
+
+
+def test_single_page_matches_render_image():
+    d = Dali(syntax="python")
+    page = open_pages(d.render_pages(CODE, lines_per_page=1000, workers=1))[0]
+    assert page.tobytes() == d.render_image(CODE).tobytes()
+
+
+def test_render_pages_limits():
+    page = open_pages(Dali(syntax="python").render_pages(CODE, lines_per_page=30))[0]
+    for limit in (
+        {"max_lines": 79},
+        {"max_width": page.width - 1},
+        {"max_pixels": page.width * page.height - 1},
+    ):
+        try:
+            Dali(syntax="python", **limit).render_pages(CODE, lines_per_page=30)
+            assert False
+        except ImageTooLarge:
+            assert True
+    limit = {"max_lines": 80, "max_pixels": page.width * page.height}
+    assert len(Dali(syntax="python", **limit).render_pages(CODE, 30, workers=1)) == 3
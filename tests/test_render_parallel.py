@@ -0,0 +1,36 @@
+from dali_renderer import Dali
+from dali_renderer.batch import get_pool, shutdown_pools
+from dali_renderer.config import PARALLEL_MIN_LINES
+
+CODE = "".join(
+    f"def function_{i}(argument):  # comment {i}\n    return argument * {i}\n"
+    for i in range(PARALLEL_MIN_LINES // 2 + 7)
+)
+
+
+def test_parallel_bands_match_serial():
+    options = {"syntax": "python", "window_controls": True}
+    expected = Dali(**options).render_image(CODE)
+    image = Dali(workers=3, **options).render_image(CODE)
+    assert image.size == expected.size
+    assert image.tobytes() == expected.tobytes()
+
+
+def test_parallel_small_image():
+    code = "def main():\n    return 'dali'\n"
+    expected = Dali(syntax="python").render_image(code)
+    assert (
+        Dali(syntax="python", workers=2).render_image(code).tobytes()
+        == expected.tobytes()
+    )
+
+
+def test_parallel_pool_is_reused():
+    dali = Dali(syntax="python", workers=2)
+    dali.render_image(CODE)
+    pool = get_pool(2)
+    assert dali.render_image(CODE).tobytes() == dali.render_image(CODE).tobytes()
+    assert get_pool(2) is pool
+    shutdown_pools()
+    assert get_pool(2) is not pool
+    shutdown_pools()
@@ -0,0 +1,69 @@
+import tempfile
+from io import BytesIO
+
+from PIL import Image
+
+from dali_renderer import Dali, RenderCache, RenderHook
+
+CODE = "def main():\n    return 'dali'\n" * 10
+
+
+class RecordingHook(RenderHook):
+    def __init__(self):
+        self.events = []
+        self.reports = []
+
+    def on_stage_start(self, stage, report):
+        self.events.append(("start", stage))
+
+    def on_stage_end(self, stage, duration, report):
+        assert duration >= 0
+        self.events.append(("end", stage))
+
+    def on_report(self, report):
+        self.reports.append(report)
+
+
+def test_render_report():
+    data, report = Dali(window_controls=True).render_with_report(CODE, "main.py")
+    assert list(report.stages) == [
+        "detect",
+        "lex",
+        "layout",
+        "raster",
+        "frame",
+        "paste",
+        "encode",
+    ]
+    assert report.total == sum(report.stages.values())
+    assert report.syntax == "Python"
+    assert report.tokens > 0
+    assert 0 < report.drawables < report.tokens
+    assert (report.width, report.height) == Image.open(BytesIO(data)).size
+    assert report.output_bytes == len(data)
+    assert report.to_dict()["cache_hit"] is False
+
+
+def test_render_hooks():
+    hook = RecordingHook()
+    dali = Dali(syntax="python", hooks=[hook])
+    dali.render_image(CODE)
+    assert hook.events[:2] == [("start", "detect"), ("end", "detect")]
+    assert ("end", "paste") in hook.events
+    assert ("start", "encode") not in hook.events
+    assert hook.reports == [dali.last_report]
+
+    dali.render_stream(CODE, BytesIO())
+    assert list(hook.reports[-1].stages) == ["detect", "layout", "stream"]
+    assert hook.reports[-1].output_bytes > 0
+
+
+def test_report_cache_hit():
+    with tempfile.TemporaryDirectory() as directory:
+        dali = Dali(syntax="python", cache=RenderCache(directory))
+        data, report = dali.render_with_report(CODE)
+        assert not report.cache_hit
+        cached, report = dali.render_with_report(CODE)
+        assert cached == data
+        assert report.cache_hit
+        assert list(report.stages) == ["cache"]
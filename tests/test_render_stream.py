@@ -0,0 +1,73 @@
+from io import BytesIO
+
+from PIL import Image
+
+from dali_renderer import Dali, EncoderOptionError, ImageTooLarge
+from dali_renderer.renders.png import PNGStreamError
+from dali_renderer.renders.png import PNGStreamWriter
+
+CODE = "".join(
+    f"def function_{i}(argument):\n    return argument * {i}\n" for i in range(40)
+)
+
+
+def render_stream(band_height, **options):
+    buffer = BytesIO()
+    Dali(syntax="python", **options).render_stream(
+        CODE, buffer, band_height=band_height
+    )
+    buffer.seek(0)
+    image = Image.open(buffer)
+    image.load()
+    return image
+
+
+def test_stream_matches_render_image():
+    expected = Dali(syntax="python").render_image(CODE)
+    for band_height in (16, 100, 4096):
+        assert render_stream(band_height).tobytes() == expected.tobytes()
+
+
+def test_stream_with_frame_options():
+    options = {"window_controls": True, "background": "#576574", "border_radius": 20}
+    expected = Dali(syntax="python", **options).render_image(CODE)
+    image = render_stream(64, **options)
+    assert image.size == expected.size
+    assert image.tobytes() == expected.tobytes()
+
+
+def test_stream_from_file_checks_before_writing(tmp_path):
+    source = tmp_path / "source.py"
+    source.write_text(CODE)
+    existing = tmp_path / "existing.png"
+    existing.write_bytes(b"previous image")
+    for output, options, error in (
+        (existing, {"max_lines": 5}, ImageTooLarge),
+        (tmp_path / "image.png", {"max_lines": 5}, ImageTooLarge),
+        (tmp_path / "image.webp", {}, EncoderOptionError),
+    ):
+        try:
+            Dali(str(output), syntax="python", **options).from_file(
+                str(source), stream=True
+            )
+            assert False
+        except error:
+            assert True
+    assert existing.read_bytes() == b"previous image"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "existing.png",
+        "source.py",
+    ]
+    Dali(str(existing), syntax="python").from_file(str(source), stream=True)
+    assert existing.read_bytes().startswith(b"\x89PNG")
+
+
+def test_png_stream_writer_rows():
+    buffer = BytesIO()
+    writer = PNGStreamWriter(buffer, 10, 4)
+    writer.write(Image.new("RGBA", (10, 3), "#ff0000"))
+    try:
+        writer.close()
+        assert False
+    except PNGStreamError:
+        assert True
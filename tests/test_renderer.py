@@ -0,0 +1,113 @@
+import os
+from io import BytesIO
+
+from dali_renderer import (
+    Dali,
+    EncoderOptionError,
+    IncrementalRenderer,
+    InputNotSpecified,
+    Renderer,
+    StyleNotFound,
+)
+
+CODE = "def main():\n    return 'dali'\n"
+OTHER_CODE = "import os\n\nprint(os.getcwd())\n"
+
+
+def test_render_matches_dali():
+    for options in (
+        {},
+        {"window_controls": True},
+        {"background": "#576574", "padding": 20},
+    ):
+        renderer = Renderer(syntax="python", **options)
+        for code in (CODE, OTHER_CODE, CODE):
+            assert renderer.render(code) == Dali(
+                syntax="python", **options
+            ).render_bytes(code)
+
+
+def test_dali_reuse():
+    dali = Dali(syntax="python", background="#576574")
+    assert dali.render_bytes(CODE) == dali.render_bytes(CODE)
+    assert dali.padding == 50
+
+
+def test_render_outputs(tmp_path):
+    renderer = Renderer(syntax="python")
+    data = renderer.render(CODE)
+    path = tmp_path / "image.png"
+    assert renderer.render(CODE, path) is None
+    assert path.read_bytes() == data
+    assert renderer.render(CODE, os.path.join(tmp_path, "other.png")) is None
+    buffer = BytesIO()
+    renderer.render(CODE, buffer)
+    assert buffer.getvalue() == data
+
+
+def test_render_output_errors(tmp_path):
+    renderer = Renderer(syntax="python")
+    for path, error in (
+        ("image.gif", InputNotSpecified),
+        ("image.webp", EncoderOptionError),
+    ):
+        try:
+            renderer.render(CODE, tmp_path / path)
+            assert False
+        except error:
+            assert True
+    assert not os.listdir(tmp_path)
+
+
+def test_invalid_options():
+    try:
+        Renderer(style="not-a-style")
+        assert False
+    except StyleNotFound:
+        assert True
+
+
+def test_session_state():
+    renderer = Renderer(syntax="python")
+    formatter = renderer._get_formatter()
+    renderer.render(CODE)
+    drawables = len(formatter.drawables)
+    renderer.render(CODE)
+    assert renderer._get_formatter() is formatter
+    assert len(formatter.drawables) == drawables
+
+
+def test_incremental_matches_full_render():
+    lines = [f"value_{i} = 'dali'  # comment {i}" for i in range(30)]
+    edits = (
+        (3, 'value_3 = "dali"  # comment 3'),
+        (0, "value_0 = 'ilad'  # comment 0"),
+        (29, "value_29 = 'dali' # comment 29"),
+        (10, "value_10 = 'dali'  # much longer comment 10, the image is wider"),
+    )
+    for options in ({}, {"background": "#576574", "window_controls": True}):
+        incremental = IncrementalRenderer(syntax="python", **options)
+        full = Renderer(syntax="python", **options)
+        incremental.render_image("\n".join(lines))
+        for lineno, line in edits:
+            lines[lineno] = line
+            code = "\n".join(lines)
+            assert (
+                incremental.render_image(code).tobytes()
+                == full.render_image(code).tobytes()
+            )
+            assert incremental.render(code) == full.render(code)
+
+
+def test_incremental_dirty_rows():
+    code = "".join(f"value_{i} = 'dali'\n" for i in range(30))
+    renderer = IncrementalRenderer(syntax="python")
+    image = renderer.render_image(code)
+    assert renderer.dirty_rows == image.height - 100
+    renderer.render_image(code.replace("value_12 = 'dali'", "value_12 = 'ilad'"))
+    assert 0 < renderer.dirty_rows < image.height // 10
+    renderer.render_image(code.replace("value_12 = 'dali'", "value_12 = 'ilad'"))
+    assert renderer.dirty_rows == 0
+    renderer.reset()
+    renderer.render_image(code)
+    assert renderer.dirty_rows == image.height - 100
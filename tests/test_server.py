@@ -0,0 +1,150 @@
+import os
+import tempfile
+import threading
+from http.client import HTTPConnection
+
+from dali_renderer import Dali, ImageTooLarge
+from dali_renderer.client import RenderClient, RenderServerBusy, RenderServerError
+from dali_renderer.cli import get_parser
+from dali_renderer.server import BadRenderRequest, HTTPRenderServer, RenderService
+from dali_renderer.server import ServerBusy
+from dali_renderer.server import UnixRenderServer
+
+CODE = "def main():\n    return 'dali'\n" * 10
+
+
+def start(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_render_server():
+    service = RenderService(workers=1, queue_size=1)
+    service.warm_up()
+    with tempfile.TemporaryDirectory() as directory:
+        http_server = HTTPRenderServer(("127.0.0.1", 0), service)
+        unix_server = UnixRenderServer(os.path.join(directory, "dali.sock"), service)
+        start(http_server)
+        start(unix_server)
+        try:
+            http_client = RenderClient(
+                f"http://127.0.0.1:{http_server.server_address[1]}"
+            )
+            unix_client = RenderClient(unix_socket=unix_server.server_address)
+
+            assert http_client.render(CODE, syntax="python") == Dali(
+                syntax="python"
+            ).render_bytes(CODE)
+            options = {
+                "syntax": "python",
+                "output_format": "webp",
+                "window_controls": True,
+            }
+            assert unix_client.render(CODE, **options) == Dali(**options).render_bytes(
+                CODE
+            )
+
+            try:
+                http_client.render(CODE, syntax="unknown-syntax")
+                assert False
+            except RenderServerError as error:
+                assert "SyntaxNotFound" in str(error)
+
+            try:
+                http_client.render(CODE, output_path="image.png")
+                assert False
+            except RenderServerError as error:
+                assert "output_path" in str(error)
+
+            # Occupy the only slot of the queue
+            service._slots.acquire()
+            try:
+                unix_client.render(CODE, syntax="python")
+                assert False
+            except RenderServerBusy:
+                assert True
+            finally:
+                service._slots.release()
+
+            health = http_client.health()
+            assert (health["rendered"], health["rejected"]) == (2, 1)
+        finally:
+            for server in (http_server, unix_server):
+                server.shutdown()
+                server.server_close()
+            service.close()
+        assert not os.path.exists(os.path.join(directory, "dali.sock"))
+
+
+def test_render_service_restarts_broken_workers():
+    service = RenderService(workers=1)
+    request = {"code": CODE, "options": {"syntax": "python"}}
+    try:
+        # Kill the only worker
+        service._executor.submit(os._exit, 1)
+        try:
+            service.render(request)
+            assert False
+        except ServerBusy:
+            assert True
+        data, mimetype = service.render(request)
+        assert data == Dali(syntax="python").render_bytes(CODE)
+        assert mimetype == "image/png"
+    finally:
+        service.close()
+
+
+def test_render_service_limits():
+    service = RenderService(workers=1, max_pixels=100_000, max_lines=5)
+    try:
+        for options, error in (
+            ({"syntax": "python"}, ImageTooLarge),
+            ({"syntax": "python", "max_lines": 100}, BadRenderRequest),
+            ({"syntax": "python", "max_pixels": "all"}, BadRenderRequest),
+        ):
+            try:
+                service.render({"code": CODE, "options": options})
+                assert False
+            except error:
+                assert True
+        data, _ = service.render({"code": "print('dali')\n", "options": {}})
+        assert data == Dali().render_bytes("print('dali')\n")
+    finally:
+        service.close()
+
+
+def test_render_server_content_length():
+    service = RenderService(workers=1)
+    server = HTTPRenderServer(("127.0.0.1", 0), service)
+    start(server)
+    try:
+        for length in ("-1", "dali"):
+            connection = HTTPConnection(
+                "127.0.0.1", server.server_address[1], timeout=5
+            )
+            connection.putrequest("POST", "/render")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+            response = connection.getresponse()
+            assert response.status == 400
+            assert response.getheader("Connection") == "close"
+            connection.close()
+        # The body of a request to an unknown path isn't read
+        connection = HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+        connection.request("POST", "/unknown", body=b"{}" * 1000)
+        response = connection.getresponse()
+        assert response.status == 404
+        assert response.getheader("Connection") == "close"
+        connection.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
+
+
+def test_serve_arguments():
+    args = get_parser().parse_args(
+        ["serve", "--unix-socket", "/tmp/dali.sock", "--workers", "2"]
+    )
+    assert (args.port, args.unix_socket, args.workers) == (None, "/tmp/dali.sock", 2)